@@ -0,0 +1,60 @@
+# avatar_benchmark.py
+"""
+프로필 아바타 렌더링 마이크로 벤치마크
+
+- 폰트 로드 + 렌더링 (캐시 도입 전 매 호출 비용)
+- 렌더링만 (폰트는 프로세스 시작 시 로드)
+- LRU 캐시 적중 (사용자 생성/레벨 변경 시 같은 (이니셜, 레벨) 재요청)
+
+실행 (프로젝트 루트에서):
+    python benchmarks/avatar_benchmark.py --iterations 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.ai_services import ProfileGenerator, _load_avatar_font, render_avatar
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프로필 아바타 렌더링 벤치마크")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    render = render_avatar.__wrapped__
+    names = ["Kim Minsu", "Lee Jiwon", "Park Seoyeon", "Choi Junho", "Jung Hana"]
+
+    def uncached(i):
+        _load_avatar_font()
+        render(ProfileGenerator.initials(names[i % len(names)]), i % 5 + 1)
+
+    def render_only(i):
+        render(ProfileGenerator.initials(names[i % len(names)]), i % 5 + 1)
+
+    render_avatar.cache_clear()
+    for i in range(len(names) * 5):
+        render_avatar(ProfileGenerator.initials(names[i % len(names)]), i % 5 + 1)
+
+    def cached(i):
+        render_avatar(ProfileGenerator.initials(names[i % len(names)]), i % 5 + 1)
+
+    print(f"🖼️ 아바타 렌더링 ({args.iterations}회 평균)")
+    print(f"{'폰트 로드 + 렌더링':<20} {_per_call_us(uncached, args.iterations):>10.1f} µs")
+    print(f"{'렌더링만':<20} {_per_call_us(render_only, args.iterations):>10.1f} µs")
+    print(f"{'캐시 적중':<20} {_per_call_us(cached, args.iterations * 100):>10.1f} µs")
+    print(f"캐시: {render_avatar.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
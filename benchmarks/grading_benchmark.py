@@ -0,0 +1,139 @@
+# grading_benchmark.py
+"""
+채점 파이프라인 처리량 벤치마크 (mock LLM 서버 사용, 실제 토큰 소비 없음)
+
+AutoGrader.grade_answer 와 call_ai_with_prompt 를 동시성을 높여가며 호출하고
+처리량(req/s)과 p50/p95/p99 지연을 출력합니다.
+
+실행 (프로젝트 루트에서):
+    python benchmarks/grading_benchmark.py --requests 200 --concurrency 1,4,16,64 --latency-mean 0.5
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_llm_server import MockConfig, start_mock_server
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_level(call: Callable[[int], Dict], requests: int, concurrency: int) -> Dict:
+    """동시성 한 단계 실행"""
+    latencies: List[float] = []
+    errors = 0
+
+    def timed(i: int):
+        start = time.perf_counter()
+        result = call(i)
+        return time.perf_counter() - start, result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, result in pool.map(timed, range(requests)):
+            latencies.append(latency)
+            if isinstance(result, dict) and (result.get('error') or '오류' in str(result.get('feedback', ''))):
+                errors += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        'concurrency': concurrency,
+        'throughput': requests / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'errors': errors
+    }
+
+
+def print_report(name: str, rows: List[Dict]):
+    print(f"\n📊 {name}")
+    print(f"{'동시성':>6} {'req/s':>9} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8} {'오류':>5}")
+    for row in rows:
+        print(f"{row['concurrency']:>6} {row['throughput']:>9.2f} {row['p50']:>8.3f} "
+              f"{row['p95']:>8.3f} {row['p99']:>8.3f} {row['errors']:>5}")
+
+
+SAMPLE_QUESTION = {
+    'id': 'bench-q',
+    'difficulty': 'basic',
+    'question_text': 'ChatGPT를 사용하여 간단한 요약문을 작성하는 방법을 설명하세요.'
+}
+
+SAMPLE_SUBMISSION = {
+    "problem": {
+        "lang": "kr",
+        "problemTitle": "벤치마크 승급 시험",
+        "scenario": "고객 문의 응대 자동화를 위해 AI 도구를 도입하려 합니다. " * 5,
+        "answer_key": ["A", "B", "C"],
+        "weights_map": [{"A": 1.0, "B": 0.5, "C": 0.2}, {"A": 0.3, "B": 1.0, "C": 0.5}, {"A": 0.2, "B": 0.5, "C": 1.0}],
+        "feedback_map": [{"A": "좋은 선택입니다.", "B": "부분적으로 맞습니다.", "C": "아쉽습니다."}] * 3
+    },
+    "sessions": [{"selected_option_id": "A"}, {"selected_option_id": "C"}, {"selected_option_id": "C"}]
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채점 파이프라인 처리량 벤치마크")
+    parser.add_argument("--requests", type=int, default=100, help="동시성 단계별 요청 수")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32")
+    parser.add_argument("--latency", default="lognormal", choices=["fixed", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--latency-mean", type=float, default=0.5)
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stream", action="store_true", help="스트리밍 모드로 호출")
+    args = parser.parse_args()
+
+    server = start_mock_server(MockConfig(
+        latency=args.latency, latency_mean=args.latency_mean, latency_spread=args.latency_spread,
+        error_rate=args.error_rate, seed=args.seed
+    ))
+    host, port = server.server_address[:2]
+
+    # src 모듈이 설정을 읽기 전에 mock 서버를 가리키도록 지정
+    os.environ["OPENAI_API_KEY"] = "mock-key"
+    os.environ["OPENAI_BASE_URL"] = f"http://{host}:{port}/v1"
+
+    from src.services.ai_services import AutoGrader
+    from ui.pages.promotion_page import call_ai_with_prompt
+
+    grader = AutoGrader()
+    on_partial = (lambda snapshot: None) if args.stream else None
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    print(f"🧪 mock 서버: http://{host}:{port}/v1 (지연 {args.latency}, 평균 {args.latency_mean}s, 오류율 {args.error_rate})")
+
+    grade_rows = [
+        run_level(lambda i: grader.grade_answer(SAMPLE_QUESTION, f"답변 {i}: 핵심 문장을 추려 요약합니다.",
+                                                "basic", on_partial=on_partial),
+                  args.requests, c)
+        for c in levels
+    ]
+    print_report("AutoGrader.grade_answer", grade_rows)
+
+    promotion_rows = [
+        run_level(lambda i: call_ai_with_prompt("당신은 승급 시험 채점관입니다.", SAMPLE_SUBMISSION, on_partial=on_partial),
+                  args.requests, c)
+        for c in levels
+    ]
+    print_report("call_ai_with_prompt (승급 시험)", promotion_rows)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
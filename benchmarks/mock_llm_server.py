@@ -0,0 +1,252 @@
+# mock_llm_server.py
+"""
+OpenAI 호환 로컬 mock LLM 서버 (채점 파이프라인 벤치마크용)
+
+실제 토큰을 쓰지 않고 /v1/chat/completions 를 흉내 냅니다.
+- 지연 분포(fixed / uniform / exponential / lognormal), 오류율, 토큰 수 설정
+- AutoGrader 단일/배치 채점 스키마와 승급 시험 스키마에 맞는 JSON 응답
+- stream=True 요청에는 SSE 청크로 응답 (stream_options.include_usage 지원)
+
+실행:
+    python benchmarks/mock_llm_server.py --port 8900 --latency lognormal --latency-mean 1.5
+    OPENAI_API_KEY=mock OPENAI_BASE_URL=http://127.0.0.1:8900/v1 streamlit run main.py
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+@dataclass
+class MockConfig:
+    """mock 서버 동작 설정"""
+    latency: str = "lognormal"        # fixed | uniform | exponential | lognormal
+    latency_mean: float = 1.0         # 초
+    latency_spread: float = 0.5       # uniform: ±범위, lognormal: sigma
+    error_rate: float = 0.0           # 0~1, 500/429 오류 비율
+    prompt_tokens: Optional[int] = None       # 미지정 시 입력 길이로 추정
+    completion_tokens: Optional[int] = None   # 미지정 시 출력 길이로 추정
+    stream_chunks: int = 20           # 스트리밍 응답을 나눌 청크 수
+    seed: Optional[int] = None
+
+
+class MockLLM:
+    """요청 본문에 맞는 캔드(canned) 채점 응답 생성기"""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def sample_latency(self) -> float:
+        c = self.config
+        with self._lock:
+            if c.latency == "fixed":
+                return c.latency_mean
+            if c.latency == "uniform":
+                return max(0.0, self._rng.uniform(c.latency_mean - c.latency_spread, c.latency_mean + c.latency_spread))
+            if c.latency == "exponential":
+                return self._rng.expovariate(1 / c.latency_mean) if c.latency_mean > 0 else 0.0
+            # lognormal: 평균이 latency_mean이 되도록 mu 보정
+            sigma = c.latency_spread
+            mu = math.log(max(c.latency_mean, 1e-6)) - sigma ** 2 / 2
+            return self._rng.lognormvariate(mu, sigma)
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            return self._rng.random() < self.config.error_rate
+
+    def _score(self) -> int:
+        with self._lock:
+            return int(min(100, max(0, self._rng.gauss(68, 18))))
+
+    def _grade(self) -> Dict:
+        score = self._score()
+        return {
+            "total_score": score,
+            "criteria_scores": {"accuracy": round(score * 0.6, 1), "completeness": round(score * 0.3, 1),
+                                "clarity": round(score * 0.1, 1)},
+            "passed": score >= 60,
+            "strengths": ["핵심 개념을 정확히 설명했습니다"],
+            "improvements": ["구체적인 사례를 추가해보세요"],
+            "feedback": "mock 서버가 생성한 채점 결과입니다."
+        }
+
+    def _promotion(self) -> Dict:
+        quantitative = self._score()
+        qualitative = self._score()
+        total = quantitative + qualitative
+        return {
+            "pass_fail": "PASS" if total >= 100 else "FAIL",
+            "score": {
+                "total": total,
+                "quantitative": {"aggregate": quantitative},
+                "qualitative": {"overall": qualitative}
+            },
+            "detail": "mock 서버가 생성한 승급 시험 평가 코멘트입니다.\n단계별 선택이 시나리오 목표와 대체로 일치합니다."
+        }
+
+    def completion_content(self, messages: List[Dict]) -> str:
+        """요청 프롬프트로 응답 스키마를 판별해 JSON 문자열 생성"""
+        user = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "user")
+        if '"results"' in user:
+            ids = [int(i) for i in re.findall(r'^\[(\d+)\]', user, flags=re.MULTILINE)] or [0]
+            body = {"results": [dict(self._grade(), id=i) for i in ids]}
+        elif "total_score" in user:
+            body = self._grade()
+        else:
+            body = self._promotion()
+        return json.dumps(body, ensure_ascii=False)
+
+    def usage(self, messages: List[Dict], content: str) -> Dict:
+        prompt_text = "".join(str(m.get("content", "")) for m in messages)
+        prompt_tokens = self.config.prompt_tokens or max(1, len(prompt_text) // 3)
+        completion_tokens = self.config.completion_tokens or max(1, len(content) // 3)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """/v1/chat/completions 핸들러"""
+
+    llm: MockLLM = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        messages = request.get("messages", [])
+        model = request.get("model", "mock")
+
+        latency = self.llm.sample_latency()
+        if self.llm.should_fail():
+            time.sleep(latency / 2)
+            status = random.choice([429, 500])
+            self._send_json(status, {"error": {"message": "mock failure", "type": "server_error"}})
+            return
+
+        content = self.llm.completion_content(messages)
+        usage = self.llm.usage(messages, content)
+        created = int(time.time())
+        completion_id = f"chatcmpl-mock-{self.llm.requests}"
+
+        if request.get("stream"):
+            self._stream(completion_id, created, model, content, usage, latency,
+                         (request.get("stream_options") or {}).get("include_usage", False))
+            return
+
+        time.sleep(latency)
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+
+    def _stream(self, completion_id: str, created: int, model: str, content: str,
+                usage: Dict, latency: float, include_usage: bool):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send(payload: Dict):
+            self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def chunk(delta: Dict, finish_reason=None) -> Dict:
+            return {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+        pieces = max(1, self.llm.config.stream_chunks)
+        size = max(1, math.ceil(len(content) / pieces))
+        parts = [content[i:i + size] for i in range(0, len(content), size)]
+        delay = latency / (len(parts) + 1)
+
+        time.sleep(delay)
+        send(chunk({"role": "assistant", "content": ""}))
+        for part in parts:
+            time.sleep(delay)
+            send(chunk({"content": part}))
+        send(chunk({}, "stop"))
+        if include_usage:
+            send({"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                  "model": model, "choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def start_mock_server(config: MockConfig = None, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 mock 서버 시작 (port=0이면 빈 포트 사용)"""
+    handler = type("BoundMockHandler", (MockHandler,), {"llm": MockLLM(config or MockConfig())})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-llm-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 mock LLM 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", default="lognormal", choices=["fixed", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--latency-mean", type=float, default=1.0)
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--prompt-tokens", type=int)
+    parser.add_argument("--completion-tokens", type=int)
+    parser.add_argument("--stream-chunks", type=int, default=20)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency, latency_mean=args.latency_mean, latency_spread=args.latency_spread,
+        error_rate=args.error_rate, prompt_tokens=args.prompt_tokens,
+        completion_tokens=args.completion_tokens, stream_chunks=args.stream_chunks, seed=args.seed
+    )
+    handler = type("BoundMockHandler", (MockHandler,), {"llm": MockLLM(config)})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"🧪 mock LLM 서버 실행 중: http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
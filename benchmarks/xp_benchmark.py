@@ -0,0 +1,79 @@
+# xp_benchmark.py
+"""
+경험치 계산 마이크로 벤치마크 (스칼라 vs 배열)
+
+- GameEngine.calculate_xp_reward / calculate_simple_xp_reward를 행마다 호출
+- GameEngine.calculate_xp_rewards / calculate_simple_xp_rewards로 열 전체를 한 번에 계산
+- 두 결과가 모든 행에서 같은지 확인
+
+실행 (프로젝트 루트에서):
+    python benchmarks/xp_benchmark.py --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.config import DIFFICULTY_MULTIPLIER, GRADE_PASS_SCORE
+from src.services.game_engine import GameEngine
+
+
+def _columns(rows: int, seed: int):
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, 101, rows).astype(float)
+    times_taken = rng.integers(0, 180, rows)
+    tokens_used = rng.integers(0, 400, rows)
+    # DB/pandas에서 읽은 열처럼 파이썬 문자열 object 배열 (None은 기본 배율)
+    difficulties = rng.choice(np.array(list(DIFFICULTY_MULTIPLIER) + ['unknown', None], dtype=object), rows)
+    return scores, times_taken, tokens_used, difficulties
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경험치 계산 벤치마크 (스칼라 vs 배열)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = GameEngine(db=None)
+    scores, times_taken, tokens_used, difficulties = _columns(args.rows, args.seed)
+    correct = scores >= GRADE_PASS_SCORE
+
+    # 스칼라 호출은 실제 사용처처럼 파이썬 값으로 변환한 목록을 순회
+    rows = list(zip(scores.tolist(), times_taken.tolist(), tokens_used.tolist(), difficulties.tolist()))
+    start = time.perf_counter()
+    scalar = [engine.calculate_xp_reward(s, t, k, d) for s, t, k, d in rows]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = engine.calculate_xp_rewards(scores, times_taken, tokens_used, difficulties)
+    batched_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scalar_simple = [engine.calculate_simple_xp_reward(c, d) for c, d in zip(correct.tolist(), difficulties.tolist())]
+    scalar_simple_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched_simple = engine.calculate_simple_xp_rewards(correct, difficulties)
+    batched_simple_seconds = time.perf_counter() - start
+
+    assert np.array_equal(batched, scalar), "AI 채점 모드 XP 불일치"
+    assert np.array_equal(batched_simple, scalar_simple), "단순 정답 모드 XP 불일치"
+
+    print(f"⚡ 경험치 계산 ({args.rows:,}행, 결과 일치 확인)")
+    print(f"{'':<28} {'전체(초)':>10} {'행당(ns)':>10}")
+    for label, seconds in [("calculate_xp_reward", scalar_seconds),
+                           ("calculate_xp_rewards", batched_seconds),
+                           ("calculate_simple_xp_reward", scalar_simple_seconds),
+                           ("calculate_simple_xp_rewards", batched_simple_seconds)]:
+        print(f"{label:<28} {seconds:>10.3f} {seconds / args.rows * 1e9:>10.1f}")
+    print(f"속도 향상: AI 채점 {scalar_seconds / batched_seconds:.0f}배, "
+          f"단순 정답 {scalar_simple_seconds / batched_simple_seconds:.0f}배")
+
+
+if __name__ == "__main__":
+    main()
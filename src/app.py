@@ -8,8 +8,11 @@ import json
 from datetime import datetime
 from typing import Dict, Optional
 
+from src.core.config import ADMIN_EMAILS
 from src.core.database import GameDatabase
-from src.services import AutoGrader, QuestionGenerator, GameEngine, UserManager
+from src.services import (
+    AutoGrader, QuestionGenerator, GameEngine, UserManager, get_grading_queue, get_achievement_engine
+)
 from src.auth.authentication import AuthenticationManager
 
 
@@ -19,12 +22,18 @@ class AIAssessmentGame:
     def __init__(self):
         self.db = GameDatabase()
         self.grader = AutoGrader()
+        self.grading_queue = get_grading_queue()
         self.game_engine = GameEngine(self.db)
         self.user_manager = UserManager(self.db)
+        self.achievements = get_achievement_engine(self.db)
         self.auth_manager = AuthenticationManager()
     
-    def submit_answer(self, user_id: str, question: Dict, answer: str, pass_fail: str = None) -> Dict:
-        """답변 제출 및 처리 (Supabase 기반)"""
+    def submit_answer(self, user_id: str, question: Dict, answer: str, pass_fail: str = None,
+                      time_taken: Optional[int] = None) -> Dict:
+        """답변 제출 및 처리 (Supabase 기반)
+
+        time_taken은 플레이어가 문제를 푸는 데 걸린 시간(초)으로, 업적 평가에 사용합니다 (측정하지 않았으면 None).
+        """
         # pass_fail 파라미터가 있으면 단순 정답/오답 처리
         if pass_fail is not None:
             is_correct = (pass_fail == 'PASS')
@@ -44,13 +53,13 @@ class AIAssessmentGame:
                     question_id=question['id'],
                     user_answer=answer,
                     score=100 if is_correct else 0,
-                    time_taken=0,
+                    time_taken=time_taken or 0,
                     tokens_used=0,
                     pass_fail=pass_fail
                 )
         else:
-            # AI 채점 모드
-            grade_result = self.grader.grade_answer(question, answer, question['difficulty'])
+            # AI 채점 모드 (동시 요청은 채점 큐에서 배치로 묶여 처리됨)
+            grade_result = self.grading_queue.grade(question, answer, question['difficulty'])
             is_correct = grade_result['passed']
             
             # 경험치 계산
@@ -84,7 +93,7 @@ class AIAssessmentGame:
             }
         
         # 사용자 통계 업데이트
-        stats_success = self.user_manager.update_user_stats(user_id, is_correct, xp_earned)
+        stats_success = self.user_manager.update_user_stats(user_id, is_correct, xp_earned, question.get('id'))
         
         if not stats_success:
             return {
@@ -97,6 +106,17 @@ class AIAssessmentGame:
         current_level = profile.get('level', 1) if profile else 1
         current_xp = profile.get('experience_points', 0) if profile else 0
         
+        # 업적 평가 (새로 달성한 업적은 한 번만 저장되고 보상 XP 지급)
+        unlocked = []
+        if profile and user_id != "test_user_001":
+            # 채점 모델의 시간/토큰이 아닌 플레이어가 쓴 시간으로 평가 (플레이어 토큰 사용량은 측정하지 않음)
+            unlocked = self.achievements.on_answer(
+                user_id, profile, question.get('id'), is_correct, time_taken=time_taken
+            )
+            achievement_xp = sum(achievement['xp'] for achievement in unlocked)
+            if achievement_xp > 0 and self.game_engine.award_experience(user_id, achievement_xp):
+                xp_earned += achievement_xp
+        
         # 간단한 레벨업 로직
         new_level = current_level
         level_up = False
@@ -111,7 +131,8 @@ class AIAssessmentGame:
             "feedback": "정답입니다!" if is_correct else "오답입니다.",
             "level_up": level_up,
             "new_level": new_level,
-            "time_taken": 0,  # pass_fail 모드에서는 시간 측정 안함
+            "achievements_unlocked": unlocked,
+            "time_taken": time_taken or 0,  # 플레이어 풀이 시간 (측정하지 않았으면 0)
             "tokens_used": 0  # pass_fail 모드에서는 토큰 사용 안함
         }
     
@@ -164,8 +185,13 @@ class AIAssessmentGame:
             return
         
         
-        # 탭 구성
-        tab1, tab2, tab3, tab4 = st.tabs(["🎯 도전하기", "📊 승급 시험", "🏆 리더보드", "📈 통계"])
+        # 탭 구성 (관리자에게는 메트릭 탭 추가)
+        tab_names = ["🎯 도전하기", "📊 승급 시험", "🏆 리더보드", "📈 통계"]
+        is_admin = st.session_state.get('user_email', '') in ADMIN_EMAILS
+        if is_admin:
+            tab_names.append("🛠️ 메트릭")
+        tabs = st.tabs(tab_names)
+        tab1, tab2, tab3, tab4 = tabs[:4]
         
         with tab1:
             self.render_challenge_tab(profile)
@@ -181,15 +207,22 @@ class AIAssessmentGame:
         with tab4:
             from ui.pages.stats_page import render_user_stats
             render_user_stats(self.db, user_id)
+        
+        if is_admin:
+            with tabs[4]:
+                from ui.pages.admin_metrics_page import render_admin_metrics, render_stats_recompute
+                render_admin_metrics()
+                render_stats_recompute(self.db)
     
     def render_challenge_tab(self, profile: Dict):
         """도전하기 탭 렌더링"""
         from ui.pages.challenge_page import render_challenge_tab
         render_challenge_tab(profile, self._submit_answer_wrapper)
     
-    def _submit_answer_wrapper(self, user_id: str, question: Dict, answer: str, pass_fail: str = None) -> Dict:
+    def _submit_answer_wrapper(self, user_id: str, question: Dict, answer: str, pass_fail: str = None,
+                               time_taken: Optional[int] = None) -> Dict:
         """답변 제출 래퍼"""
-        return self.submit_answer(user_id, question, answer, pass_fail)
+        return self.submit_answer(user_id, question, answer, pass_fail, time_taken)
     
     def render_sidebar(self):
         """사이드바 렌더링"""
@@ -50,7 +50,30 @@ def get_secret(key: str, default: str = None) -> str:
 
 # OpenAI 설정
 OPENAI_API_KEY = get_secret('OPENAI_API_KEY')
+OPENAI_BASE_URL = get_secret('OPENAI_BASE_URL')   # OpenAI 호환 서버 주소 (벤치마크용 mock 서버 등, 미설정 시 기본값)
 OPENAI_MODEL = "gpt-5"
+OPENAI_FAST_MODEL = get_secret('OPENAI_FAST_MODEL', 'gpt-5-mini')
+
+# LLM 호출 마감/헤지 설정
+LLM_CALL_DEADLINE = 90              # 호출 1회의 최대 대기 시간 (초)
+LLM_HEDGING = str(get_secret('LLM_HEDGING', 'false')).lower() == 'true'
+LLM_HEDGE_MIN_SAMPLES = 20          # p95 지연을 헤지 기준으로 쓰기 위한 최소 관측 수
+
+# 문제 통과 기준 점수 (LLM/시뮬레이션 채점의 passed, 정답 XP, 틀린 문제 판정에 공통 사용)
+GRADE_PASS_SCORE = 60
+
+# 채점 라우팅 (모델 캐스케이드)
+#  - fast: 저비용 모델, 지연 SLO를 넘기면 strong으로 대체
+#  - strong: 최종 판단 모델
+GRADING_ROUTES = {
+    "fast": {"model": OPENAI_FAST_MODEL, "latency_slo": 10.0, "cost_per_1k_tokens": 0.0006},
+    "strong": {"model": OPENAI_MODEL, "latency_slo": 60.0, "cost_per_1k_tokens": 0.006}
+}
+GRADING_FAST_LEVELS = ["basic"]     # fast 경로를 먼저 시도하는 채점 기준
+GRADING_ESCALATION_MARGIN = 10      # 통과 기준(GRADE_PASS_SCORE) ± 이 범위의 점수는 strong으로 재채점
+GRADING_SLO_WINDOW = 300            # SLO 판단에 쓰는 최근 지연 관측 구간 (초)
+GRADING_SLO_MIN_SAMPLES = 20        # 구간 내 관측이 이보다 적으면 SLO 초과로 보지 않음
+GRADING_FAST_PROBE_RATE = 0.05      # SLO 초과로 fast를 건너뛰는 동안에도 fast로 보내는 요청 비율 (회복 감지용)
 
 # Supabase 설정
 SUPABASE_URL = get_secret('SUPABASE_URL')
@@ -129,6 +152,16 @@ XP_REWARDS = {
     "level_up_bonus": 500
 }
 
+# XP 원장 스냅샷 압축 주기 (초, xp_events → users 스냅샷)
+XP_SNAPSHOT_INTERVAL = 5
+# 압축 유예 시간 (초): 이보다 최근에 생성된 이벤트부터는 다음 주기로 미룸
+#  - BIGSERIAL id는 커밋 순서가 아니므로, 낮은 id가 높은 id보다 늦게 커밋될 수 있음
+#  - 유예 시간은 INSERT 트랜잭션 길이와 앱/DB 시계 차이보다 충분히 커야 함
+XP_COMPACTION_GRACE = 30
+
+# 사용자 통계 일괄 재계산 배치 크기 (user_answers 페이지 / 반영 RPC 1회당 사용자 수)
+STATS_RECOMPUTE_PAGE_SIZE = 5000
+
 # 레벨 설정
 LEVEL_REQUIREMENTS = [
     (1, 0, 60.0, 10, "AI Beginner", "🌱", "기본 문제 접근 가능"),
@@ -147,7 +180,12 @@ ACHIEVEMENTS = [
     ("perfect_exam", "완벽한 승급", "승급 시험에서 만점을 받았습니다", "💯", 300, "legendary"),
     ("ai_enthusiast", "AI 열정가", "100문제를 해결했습니다", "🤖", 500, "epic"),
     ("token_saver", "토큰 절약가", "최소 토큰으로 문제를 해결했습니다", "💰", 100, "rare"),
-    ("comeback_kid", "재도전의 달인", "실패 후 재도전으로 성공했습니다", "💪", 150, "rare")
+    ("comeback_kid", "재도전의 달인", "실패 후 재도전으로 성공했습니다", "💪", 150, "rare"),
+    # 업적 엔진 이전부터 프로필 통계로 표시되던 업적 (README의 achievements 초기 데이터, 보상 XP 없음)
+    ("first_question", "첫 번째 문제", "첫 번째 문제를 해결했습니다!", "🎯", 0, "common"),
+    ("level_5", "레벨 5 달성", "레벨 5에 도달했습니다!", "⭐", 0, "rare"),
+    ("level_10", "레벨 10 달성", "레벨 10에 도달했습니다!", "🌟", 0, "legendary"),
+    ("accuracy_80", "80% 정확도", "80% 이상의 정확도를 달성했습니다!", "🎯", 0, "rare")
 ]
 
 # 채점 기준
@@ -171,6 +209,80 @@ GRADING_CRITERIA = {
     }
 }
 
+# 문제 난이도(questions.difficulty) → 채점 기준 키 (GRADING_CRITERIA, 라우팅/시뮬레이션도 같은 키 사용)
+#  - 표에 없고 GRADING_CRITERIA 키도 아닌 값은 basic
+DIFFICULTY_CRITERIA = {
+    "아주 쉬움": "basic",
+    "쉬움": "basic",
+    "보통": "intermediate",
+    "어려움": "advanced",
+    "아주 어려움": "advanced"
+}
+
+# 프롬프트 레지스트리 (이름 → prompts 테이블 ID)
+PROMPT_REGISTRY = {
+    "promotion_grader": "1afe1512-9a7a-4eee-b316-1734b9c81f3a"
+}
+PROMPT_CACHE_TTL = 300          # 프롬프트 재검증 주기 (초)
+
+# 채점 프롬프트 토큰 예산 (요청당, 로컬 추정치 기준)
+PROMPT_TOKEN_BUDGET = {
+    "grading": 2000,
+    "promotion": 6000
+}
+# 승급 시험 채점 시 모델에 보내지 않는 문제 필드 (채점에 사용되지 않음)
+PROMOTION_PROMPT_DROP_FIELDS = ["feedback_map"]
+
+# 채점 결과 캐시 설정
+GRADING_CACHE_SIZE = 1024
+GRADING_CACHE_TTL = 3600        # 초
+
+# LLM 사용량 원장 (호출별 토큰/지연/결과 기록, 로컬 SQLite에 배치 저장)
+USAGE_LEDGER_PATH = get_secret('USAGE_LEDGER_PATH', 'data/usage_ledger.sqlite3')
+USAGE_LEDGER_FLUSH_SIZE = 50        # 버퍼가 이 크기에 도달하면 즉시 저장
+USAGE_LEDGER_FLUSH_INTERVAL = 5     # 버퍼 저장 주기 (초)
+
+# 관리자 이메일 (쉼표 구분, 관리자 메트릭 탭 노출 대상)
+ADMIN_EMAILS = [e.strip() for e in str(get_secret('ADMIN_EMAILS', '')).split(',') if e.strip()]
+
+# 채점 모드
+#  - "llm": OpenAI 채점 (API 키가 없으면 자동으로 시뮬레이션)
+#  - "simulation": API 키가 있어도 시드 고정 시뮬레이션 채점 (부하 테스트/로컬 벤치마크용)
+GRADING_MODE = get_secret('GRADING_MODE', 'llm')
+GRADING_SIMULATION_SEED = int(get_secret('GRADING_SIMULATION_SEED', '0'))
+
+# 시뮬레이션 채점 점수 분포 (난이도별 평균, 표준편차)
+SIMULATION_SCORE_PROFILES = {
+    "basic": (72, 12),
+    "intermediate": (64, 15),
+    "advanced": (56, 18)
+}
+
+# 사전 채점 필터 (명백한 경우는 LLM 호출 없이 로컬에서 결정)
+PRE_GRADING_MIN_CHARS = 5               # 공백 제외 최소 글자 수
+PRE_GRADING_MAX_CHARS = 4000            # 최대 글자 수 (초과 시 채점하지 않음)
+PRE_GRADING_MIN_LETTER_RATIO = 0.3      # 한글/영문 글자 비율 하한 (기호/숫자 나열 차단)
+PRE_GRADING_QUESTION_SIMILARITY = 0.85  # 문제 문장을 그대로 붙여넣은 답변으로 보는 유사도
+PRE_GRADING_DUPLICATE_SIMILARITY = 0.95 # 최근 채점 답변과 같은 답변으로 보는 유사도
+PRE_GRADING_RECENT_PER_QUESTION = 50    # 문제별로 기억하는 최근 채점 답변 수
+
+# 연습 문제 사전 생성 풀 (백그라운드에서 LLM으로 미리 생성해 두고 즉시 제공)
+QUESTION_POOL_ENABLED = str(get_secret('QUESTION_POOL_ENABLED', 'false')).lower() == 'true'
+QUESTION_POOL_TARGET_DEPTH = 3      # (난이도, 레벨)별로 유지할 문제 수
+QUESTION_POOL_REFILL_INTERVAL = 30  # 풀 보충 확인 주기 (초)
+QUESTION_GENERATION_STEPS = 3       # 생성 문제의 단계 수
+
+# 문제 은행 유사 중복 탐지 (MinHash/LSH, 한글 문자 n-gram)
+NEAR_DUP_THRESHOLD = 0.8    # 같은 문제로 보는 추정 Jaccard 유사도
+NEAR_DUP_NUM_PERM = 64      # MinHash 서명 길이
+NEAR_DUP_BANDS = 16         # LSH 밴드 수 (밴드당 행 수 = NUM_PERM / BANDS)
+NEAR_DUP_NGRAM = 3          # 문자 n-gram 길이
+NEAR_DUP_INDEX_PATH = get_secret('NEAR_DUP_INDEX_PATH', 'data/question_index.npz')
+
+# 채점 큐 마이크로 배칭 설정
+GRADING_BATCH_SIZE = 8          # 한 번의 요청에 묶을 최대 답변 수
+GRADING_BATCH_WINDOW_MS = 50    # 첫 요청 이후 배치를 채우기 위해 기다리는 시간 (0이면 배칭 안 함)
+
 # 승급 시험 설정
 PROMOTION_EXAM_CONFIG = {
     2: {
@@ -199,6 +311,47 @@ PROMOTION_EXAM_CONFIG = {
     }
 }
 
+# 승급 시험 총점 기준 (정량 100 + 정성 100)
+PROMOTION_MAX_SCORE = 200
+PROMOTION_PASS_SCORE = 100
+
+# 승급 시험 도전 최소 XP (현재 레벨 → 필요 XP, 표에 없는 레벨은 현재 레벨 * 100)
+PROMOTION_REQUIRED_XP = {
+    1: 50,
+    2: 150,
+    3: 300
+}
+
+# 업적 달성 조건 (업적 ID → (이벤트, [(필드, 연산자, 값), ...]), 모든 조건을 만족하면 달성)
+#  - answer 이벤트: correct, time_taken, tokens_used, retried_failed(이전에 틀린 문제) + 프로필 누적 통계
+#    + accuracy(정답률 %, 푼 문제가 없으면 없음)
+#  - promotion 이벤트: score, new_level
+#  - time_taken은 플레이어가 문제를 받은 뒤 제출까지 걸린 시간 (측정하지 않았으면 speed_demon 대상이 아님)
+#  - None: 평가하지 않는 업적 (token_saver는 플레이어의 토큰 사용량을 측정하지 않으므로 정의만 유지)
+ACHIEVEMENT_RULES = {
+    "first_solve": ("answer", [("correct_answers", ">=", 1)]),
+    "streak_5": ("answer", [("best_streak", ">=", 5)]),
+    "streak_10": ("answer", [("best_streak", ">=", 10)]),
+    "speed_demon": ("answer", [("correct", "==", True), ("time_taken", ">", 0), ("time_taken", "<=", 30)]),
+    "perfect_exam": ("promotion", [("score", ">=", PROMOTION_MAX_SCORE)]),
+    "ai_enthusiast": ("answer", [("total_questions_solved", ">=", 100)]),
+    "token_saver": None,
+    "comeback_kid": ("answer", [("correct", "==", True), ("retried_failed", "==", True)]),
+    "first_question": ("answer", [("total_questions_solved", ">=", 1)]),
+    "level_5": ("answer", [("level", ">=", 5)]),
+    "level_10": ("answer", [("level", ">=", 10)]),
+    "accuracy_80": ("answer", [("accuracy", ">=", 80)])
+}
+ACHIEVEMENT_CACHE_SIZE = 1024   # 업적 목록을 메모리에 유지하는 사용자 수
+
+# 승급 시험 채점 모드
+#  - "llm": 전체 채점을 LLM에 위임 (LLM 오류 시 로컬 채점으로 대체)
+#  - "hybrid": 점수/PASS·FAIL은 로컬에서 즉시 계산, LLM은 detail 코멘트만 비동기 생성
+#  - "local": LLM 호출 없이 로컬 채점과 feedback_map 기반 코멘트만 사용
+#  로컬 채점도 LLM과 같은 총점 척도(정량 + 정성, PROMOTION_MAX_SCORE)를 쓰며,
+#  정성 점수는 모범 답안(answer_key)과 일치한 단계 비율로 대신합니다 (exam_scoring.grade_promotion_locally)
+PROMOTION_GRADING_MODE = get_secret('PROMOTION_GRADING_MODE', 'llm')
+
 # 난이도 설정
 DIFFICULTY_MULTIPLIER = {
     "basic": 1.2,
@@ -223,3 +376,20 @@ LEVEL_ICONS = {
     4: '🌟',  # 별 - 숙련
     5: '👑'   # 왕관 - 마스터
 }
+
+# 프로필 아바타 설정
+AVATAR_SIZE = 200               # 아바타 한 변 (px)
+AVATAR_THUMBNAIL_SIZES = [32, 64, 128]  # 함께 생성하는 작은 해상도 (리더보드 아이콘 등)
+AVATAR_FONT_SIZE = 80
+AVATAR_FONT_PATHS = [           # 이니셜 폰트 후보 (앞에서부터 시도, 모두 없으면 PIL 기본 폰트)
+    "C:/Windows/Fonts/pretendard.ttf",
+    "/System/Library/Fonts/pretendard.ttf",
+    "/usr/share/fonts/truetype/pretendard.ttf",
+    "arial.ttf"
+]
+AVATAR_CACHE_SIZE = 512         # 렌더링된 아바타 LRU 캐시 크기 ((이니셜, 레벨) 단위)
+AVATAR_WORKERS = 2              # 백그라운드 아바타 생성 스레드 수
+AVATAR_FORMAT = 'webp'          # 저장 형식 (webp 미지원 Pillow에서는 png)
+AVATAR_STORE_DIR = get_secret('AVATAR_STORE_DIR', 'static/avatars')   # Streamlit 정적 파일 디렉터리 하위
+AVATAR_URL_PREFIX = get_secret('AVATAR_URL_PREFIX', 'app/static/avatars')
+AVATAR_BUCKET = get_secret('AVATAR_BUCKET', 'avatars')  # 아바타 원본을 두는 Supabase Storage 공개 버킷 (로컬은 캐시)
@@ -3,9 +3,10 @@
 Supabase 데이터베이스 관련 클래스 및 함수
 """
 
+import json
 import streamlit as st
-from typing import Dict, List, Optional, Any
-from src.core.config import LEVEL_REQUIREMENTS, ACHIEVEMENTS, SUPABASE_URL, SUPABASE_ANON_KEY
+from typing import Dict, Iterator, List, Optional, Any
+from src.core.config import LEVEL_REQUIREMENTS, ACHIEVEMENTS, GRADE_PASS_SCORE, SUPABASE_URL, SUPABASE_ANON_KEY
 from src.auth.supabase_auth import _get_supabase
 
 
@@ -100,6 +101,14 @@ class GameDatabase:
             st.error(f"사용자 프로필 업데이트 오류: {str(e)}")
             return False
     
+    def set_profile_image(self, user_id: str, profile_image: str) -> bool:
+        """프로필 이미지만 갱신 (백그라운드 아바타 생성에서 호출되므로 Streamlit API를 사용하지 않음)"""
+        try:
+            result = self.supabase.table('users').update({'profile_image': profile_image}).eq('user_id', user_id).execute()
+            return len(result.data) > 0
+        except Exception:
+            return False
+    
     def add_experience(self, user_id: str, xp: int) -> bool:
         """경험치 추가"""
         try:
@@ -135,6 +144,70 @@ class GameDatabase:
             st.error(f"경험치 추가 오류: {str(e)}")
             return False
     
+    def insert_xp_event(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """xp_events에 이벤트 1건 추가 후 저장된 행(id 포함) 반환"""
+        try:
+            result = self.supabase.table('xp_events').insert(event).execute()
+            
+            return result.data[0] if result.data else None
+        except Exception as e:
+            st.error(f"XP 이벤트 저장 오류: {str(e)}")
+            return None
+    
+    def get_xp_snapshot(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """users의 XP 스냅샷 필드 조회 (백그라운드 압축에서 호출되므로 Streamlit API를 사용하지 않음)"""
+        try:
+            result = self.supabase.table('users').select(
+                'user_id, experience_points, level, total_questions_solved, correct_answers, '
+                'current_streak, best_streak, snapshot_event_id'
+            ).eq('user_id', user_id).execute()
+            
+            return result.data[0] if result.data else None
+        except Exception:
+            return None
+    
+    def get_xp_events(self, user_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """after_id 이후의 XP 이벤트 조회 (id 순, 압축 유예 판단용 created_at 포함)"""
+        try:
+            result = self.supabase.table('xp_events').select('id, xp, correct, level, created_at') \
+                .eq('user_id', user_id).gt('id', after_id).order('id').execute()
+            
+            return result.data or []
+        except Exception:
+            return []
+    
+    def update_xp_snapshot(self, user_id: str, expected_event_id: int, snapshot: Dict[str, Any]) -> bool:
+        """스냅샷 갱신 (snapshot_event_id가 expected_event_id일 때만 적용, 동시 압축 시 한쪽만 성공)"""
+        try:
+            result = self.supabase.table('users').update(snapshot) \
+                .eq('user_id', user_id).eq('snapshot_event_id', expected_event_id).execute()
+            
+            return len(result.data) > 0
+        except Exception:
+            return False
+    
+    def process_promotion(self, user_id: str, from_level: int, to_level: int, xp: int,
+                          score: float, time_taken: int) -> Optional[Dict[str, Any]]:
+        """승급 처리 (process_promotion RPC: 승급 XP 이벤트 + 시험 결과를 한 트랜잭션으로 기록)
+        
+        반환: {'promoted', 'event_id', 'profile'(users 스냅샷), 'events'(스냅샷 이후 XP 이벤트)}
+        같은 목표 레벨 승급이 이미 있으면 promoted=False, 오류 시 None
+        """
+        try:
+            result = self.supabase.rpc('process_promotion', {
+                'p_user_id': user_id,
+                'p_from_level': from_level,
+                'p_to_level': to_level,
+                'p_xp': int(xp),
+                'p_score': score,
+                'p_time_taken': int(time_taken)
+            }).execute()
+            
+            return result.data or None
+        except Exception as e:
+            st.error(f"승급 처리 오류: {str(e)}")
+            return None
+    
     def record_answer(self, user_id: str, is_correct: bool) -> bool:
         """답변 기록"""
         try:
@@ -212,7 +285,8 @@ class GameDatabase:
             st.error(f"사용자 통계 조회 오류: {str(e)}")
             return {}
     
-    def _calculate_level(self, xp: int) -> int:
+    @staticmethod
+    def _calculate_level(xp: int) -> int:
         """경험치로 레벨 계산"""
         for level_data in LEVEL_REQUIREMENTS:
             level, required_xp, _, _, _, _, _ = level_data
@@ -299,6 +373,18 @@ class GameDatabase:
             st.error(f"프롬프트 조회 오류: {str(e)}")
             return None
     
+    def get_prompt_record(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        """ID로 프롬프트 행 전체 조회 (버전 정보 포함)"""
+        try:
+            result = self.supabase.table('prompts').select('*').eq('id', prompt_id).execute()
+            
+            if result.data and len(result.data) > 0:
+                return result.data[0]
+            return None
+        except Exception as e:
+            st.error(f"프롬프트 조회 오류: {str(e)}")
+            return None
+    
     def get_available_question_types(self) -> List[str]:
         """사용 가능한 문제 유형 목록 조회"""
         try:
@@ -354,6 +440,40 @@ class GameDatabase:
         except Exception as e:
             return None
     
+    def get_question_bank(self, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """중복 탐지용 문제 목록 전체 조회 (id, scenario, steps, 페이지 단위)
+
+        백그라운드 스레드와 CLI에서 호출되므로 Streamlit API를 사용하지 않습니다.
+        """
+        rows: List[Dict[str, Any]] = []
+        try:
+            while True:
+                result = self.supabase.table('questions').select('id, scenario, steps') \
+                    .order('id').range(len(rows), len(rows) + page_size - 1).execute()
+                rows.extend(result.data or [])
+                if not result.data or len(result.data) < page_size:
+                    return rows
+        except Exception:
+            return rows
+    
+    def save_generated_question(self, question: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """생성된 문제를 questions 테이블에 저장하고 저장된 행 반환 (id 포함, steps는 파싱된 목록)
+
+        백그라운드 스레드에서 호출되므로 Streamlit API를 사용하지 않습니다.
+        """
+        try:
+            row = dict(question)
+            row['steps'] = json.dumps(question['steps'], ensure_ascii=False)
+            result = self.supabase.table('questions').insert(row).execute()
+            
+            if result.data and len(result.data) > 0:
+                saved = result.data[0]
+                saved['steps'] = question['steps']
+                return saved
+            return None
+        except Exception:
+            return None
+    
     def save_user_answer(self, user_id: str, question_id: str, user_answer: str, score: float, time_taken: int, tokens_used: int, pass_fail: str = None, detail: str = None) -> bool:
         """사용자 답변 저장"""
         try:
@@ -415,4 +535,89 @@ class GameDatabase:
             return []
         except Exception as e:
             st.error(f"PASS한 문제 ID 조회 오류: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+    
+    def get_failed_question_ids(self, user_id: str) -> List[str]:
+        """사용자가 틀린(GRADE_PASS_SCORE 미만) 문제 ID 목록 조회"""
+        try:
+            result = self.supabase.table('user_answers').select('question_id').eq('user_id', user_id).lt('score', GRADE_PASS_SCORE).execute()
+            
+            return [item['question_id'] for item in result.data or []]
+        except Exception as e:
+            st.error(f"틀린 문제 ID 조회 오류: {str(e)}")
+            return []
+    
+    def get_unlocked_achievements(self, user_id: str) -> List[Dict[str, Any]]:
+        """사용자가 달성한 업적 조회 (achievement_id, unlocked_at)"""
+        try:
+            result = self.supabase.table('user_achievements').select('achievement_id, unlocked_at').eq('user_id', user_id).order('unlocked_at').execute()
+            
+            return result.data or []
+        except Exception as e:
+            st.error(f"업적 조회 오류: {str(e)}")
+            return []
+    
+    def unlock_achievements(self, user_id: str, achievement_ids: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """업적 달성 저장 (이미 저장된 업적은 무시), 저장된 행 반환 (오류 시 None)"""
+        try:
+            rows = [{'user_id': user_id, 'achievement_id': achievement_id} for achievement_id in achievement_ids]
+            result = self.supabase.table('user_achievements').upsert(
+                rows, on_conflict='user_id,achievement_id', ignore_duplicates=True
+            ).execute()
+            
+            return result.data or []
+        except Exception as e:
+            st.error(f"업적 저장 오류: {str(e)}")
+            return None
+    
+    # --- 사용자 통계 일괄 재계산 (관리자 배치 작업) ---
+    # 일부만 읽은 채로 반영하면 통계가 망가지므로 오류를 삼키지 않고 호출자에게 전달합니다.
+    
+    def iter_user_answers(self, page_size: int = 5000) -> Iterator[List[Dict[str, Any]]]:
+        """user_answers 전체를 (user_id, id) 순 키셋 페이지로 순회"""
+        after = None
+        while True:
+            query = self.supabase.table('user_answers').select(
+                'id, user_id, question_id, score, time_taken, tokens_used, result, created_at'
+            )
+            if after is not None:
+                user_id, answer_id = after
+                query = query.or_(f'user_id.gt."{user_id}",and(user_id.eq."{user_id}",id.gt.{answer_id})')
+            page = query.order('user_id').order('id').limit(page_size).execute().data or []
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            after = (page[-1]['user_id'], page[-1]['id'])
+    
+    def get_question_difficulties(self, page_size: int = 5000) -> Dict[str, str]:
+        """문제 ID → 난이도"""
+        difficulties: Dict[str, str] = {}
+        while True:
+            result = self.supabase.table('questions').select('id, difficulty') \
+                .order('id').range(len(difficulties), len(difficulties) + page_size - 1).execute()
+            difficulties.update({row['id']: row.get('difficulty') for row in result.data or []})
+            if len(result.data or []) < page_size:
+                return difficulties
+    
+    def iter_bonus_xp_events(self, page_size: int = 5000) -> Iterator[Dict[str, Any]]:
+        """답변 외 XP 이벤트(업적 보상, 승급) 순회 (user_id, xp, level)"""
+        after_id = 0
+        while True:
+            page = self.supabase.table('xp_events').select('id, user_id, xp, level') \
+                .neq('kind', 'answer').gt('id', after_id).order('id').limit(page_size).execute().data or []
+            for row in page:
+                yield {'user_id': row['user_id'], 'xp': row.get('xp') or 0, 'level': row.get('level') or 0}
+            if len(page) < page_size:
+                return
+            after_id = page[-1]['id']
+    
+    def get_max_xp_event_id(self) -> int:
+        """가장 최근 XP 이벤트 ID (없으면 0)"""
+        result = self.supabase.table('xp_events').select('id').order('id', desc=True).limit(1).execute()
+        return result.data[0]['id'] if result.data else 0
+    
+    def bulk_update_user_stats(self, rows: List[Dict[str, Any]]) -> int:
+        """사용자 통계 일괄 반영 (bulk_update_user_stats RPC, 기존 사용자 행만 갱신), 갱신된 행 수 반환"""
+        result = self.supabase.rpc('bulk_update_user_stats', {'rows': rows}).execute()
+        return int(result.data or 0)
@@ -2,3 +2,15 @@
 """
 Data models and schemas
 """
+
+from .grading import (
+    SchemaError, ResponseSchema, PromotionResult,
+    GRADE_RESPONSE, BATCH_GRADE_RESPONSE, PROMOTION_RESPONSE, COMMENTARY_RESPONSE
+)
+from .question import QUESTION_RESPONSE, compile_generated_question
+
+__all__ = [
+    'SchemaError', 'ResponseSchema', 'PromotionResult',
+    'GRADE_RESPONSE', 'BATCH_GRADE_RESPONSE', 'PROMOTION_RESPONSE', 'COMMENTARY_RESPONSE',
+    'QUESTION_RESPONSE', 'compile_generated_question'
+]
@@ -0,0 +1,324 @@
+# src/models/grading.py
+"""
+채점 결과 스키마 (구조화 출력 요청 + 수신 시 1회 검증/정규화)
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from src.core.config import DIFFICULTY_CRITERIA, GRADE_PASS_SCORE, GRADING_CRITERIA, PROMOTION_PASS_SCORE
+
+
+def criteria_level(difficulty: Optional[str]) -> str:
+    """문제 난이도 → 채점 기준 키 (GRADING_CRITERIA 키는 그대로, 앱 난이도 표기는 DIFFICULTY_CRITERIA로 변환)"""
+    if difficulty in GRADING_CRITERIA:
+        return difficulty
+    return DIFFICULTY_CRITERIA.get(difficulty, "basic")
+
+
+class SchemaError(ValueError):
+    """LLM 응답이 채점 스키마와 맞지 않음"""
+
+
+# ---------------------------------------------------------------------------
+# JSON Schema → 정규화 함수 컴파일
+# ---------------------------------------------------------------------------
+
+Normalizer = Callable[[Any, str], Any]
+
+
+def _number(spec: Dict) -> Normalizer:
+    low, high = spec.get('minimum'), spec.get('maximum')
+    integer = spec.get('type') == 'integer'
+
+    def normalize(value, path):
+        if isinstance(value, bool):
+            raise SchemaError(f"{path}: 숫자가 아닙니다")
+        if isinstance(value, str):
+            try:
+                value = float(value.strip().rstrip('점%'))
+            except ValueError:
+                raise SchemaError(f"{path}: 숫자가 아닙니다 ({value!r})")
+        if not isinstance(value, (int, float)):
+            raise SchemaError(f"{path}: 숫자가 아닙니다")
+        if low is not None:
+            value = max(low, value)
+        if high is not None:
+            value = min(high, value)
+        return int(value) if integer else value
+    return normalize
+
+
+_TRUTHY = {'true', 'yes', 'y', '1', 'pass', 'passed', 'o', '예', '통과', '합격'}
+_FALSY = {'false', 'no', 'n', '0', 'fail', 'failed', 'x', '아니오', '불합격', '실패'}
+
+
+def _boolean(spec: Dict) -> Normalizer:
+    """true/false 외에 흔한 표현("yes", "1", "pass" 등)도 변환, 알 수 없는 값은 None (필드 생략 취급)"""
+    def normalize(value, path):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            return value != 0
+        if isinstance(value, str):
+            token = value.strip().lower()
+            if token in _TRUTHY:
+                return True
+            if token in _FALSY:
+                return False
+        return None
+    return normalize
+
+
+def _string(spec: Dict) -> Normalizer:
+    enum = spec.get('enum')
+    lookup = {str(option).upper(): option for option in enum} if enum else None
+
+    def normalize(value, path):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            raise SchemaError(f"{path}: 문자열이 아닙니다")
+        if lookup is not None:
+            if value.strip().upper() not in lookup:
+                raise SchemaError(f"{path}: {enum} 중 하나가 아닙니다 ({value!r})")
+            return lookup[value.strip().upper()]
+        return value
+    return normalize
+
+
+def _array(spec: Dict) -> Normalizer:
+    item = compile_schema(spec.get('items', {}))
+
+    def normalize(value, path):
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            value = [value]
+        return [item(entry, f"{path}[{i}]") for i, entry in enumerate(value)]
+    return normalize
+
+
+def _object(spec: Dict) -> Normalizer:
+    properties = {name: compile_schema(sub) for name, sub in spec.get('properties', {}).items()}
+    defaults = {name: sub['default'] for name, sub in spec.get('properties', {}).items() if 'default' in sub}
+    required = tuple(spec.get('required', ()))
+    extra = spec.get('additionalProperties', True)
+    extra_normalizer = compile_schema(extra) if isinstance(extra, dict) else None
+
+    def normalize(value, path):
+        if not isinstance(value, dict):
+            raise SchemaError(f"{path}: 객체가 아닙니다")
+        for name in required:
+            if value.get(name) is None:
+                raise SchemaError(f"{path}.{name}: 필수 필드가 없습니다")
+
+        result = {}
+        for name, entry in value.items():
+            if name in properties:
+                if entry is None:
+                    continue
+                entry = properties[name](entry, f"{path}.{name}")
+                if entry is not None:
+                    result[name] = entry
+            elif extra_normalizer is not None:
+                try:
+                    result[name] = extra_normalizer(entry, f"{path}.{name}")
+                except SchemaError:
+                    # 동적 필드(기준별 점수 등)의 잘못된 값은 버림
+                    continue
+            elif extra:
+                result[name] = entry
+        for name, default in defaults.items():
+            if name not in result:
+                result[name] = type(default)(default) if isinstance(default, (list, dict)) else default
+        return result
+    return normalize
+
+
+_COMPILERS = {
+    'number': _number, 'integer': _number, 'boolean': _boolean,
+    'string': _string, 'array': _array, 'object': _object
+}
+
+
+def compile_schema(spec: Dict) -> Normalizer:
+    """JSON Schema(사용하는 부분집합)를 검증/정규화 함수로 한 번만 컴파일
+
+    타입이 조금 다른 값은 변환하고("85" → 85, "pass" → "PASS", "yes" → True, 단일 값 → 목록),
+    범위를 넘는 숫자는 minimum/maximum으로 자르며, 변환할 수 없으면 SchemaError를 던집니다.
+    """
+    compiler = _COMPILERS.get(spec.get('type'))
+    if compiler is None:
+        return lambda value, path: value
+    return compiler(spec)
+
+
+# ---------------------------------------------------------------------------
+# 스키마 정의
+# ---------------------------------------------------------------------------
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}, "default": []}
+
+GRADE_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "total_score": {"type": "number", "minimum": 0, "maximum": 100},
+        "criteria_scores": {"type": "object", "additionalProperties": {"type": "number", "minimum": 0},
+                            "default": {}},
+        "passed": {"type": "boolean"},
+        "strengths": _STRING_LIST,
+        "improvements": _STRING_LIST,
+        "feedback": {"type": "string", "default": ""}
+    },
+    "required": ["total_score"]
+}
+
+BATCH_GRADE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": dict(GRADE_RESULT_SCHEMA["properties"], id={"type": "integer"}),
+                "required": ["id", "total_score"]
+            }
+        }
+    },
+    "required": ["results"]
+}
+
+PROMOTION_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "pass_fail": {"type": "string", "enum": ["PASS", "FAIL"]},
+        "score": {
+            "type": "object",
+            "properties": {
+                "total": {"type": "number", "minimum": 0},
+                "quantitative": {
+                    "type": "object",
+                    "properties": {"aggregate": {"type": "number", "minimum": 0}}
+                },
+                "qualitative": {
+                    "type": "object",
+                    "properties": {"overall": {"type": "number", "minimum": 0}}
+                }
+            }
+        },
+        "detail": {"type": "string", "default": ""}
+    },
+    "required": ["score"]
+}
+
+COMMENTARY_SCHEMA = {
+    "type": "object",
+    "properties": {"detail": {"type": "string"}},
+    "required": ["detail"]
+}
+
+
+# ---------------------------------------------------------------------------
+# 타입 있는 결과
+# ---------------------------------------------------------------------------
+
+@dataclass
+class PromotionResult:
+    """승급 시험 채점 결과 (정규화된 ai_response에서 생성)"""
+    pass_fail: str
+    total: float
+    quantitative: Optional[float] = None
+    qualitative: Optional[float] = None
+    detail: str = ""
+
+    @property
+    def passed(self) -> bool:
+        return self.pass_fail == 'PASS'
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PromotionResult':
+        """normalize_promotion_result / grade_promotion_locally 결과에서 생성"""
+        score = data['score']
+        return cls(
+            pass_fail=data['pass_fail'],
+            total=score['total'],
+            quantitative=score.get('quantitative', {}).get('aggregate'),
+            qualitative=score.get('qualitative', {}).get('overall'),
+            detail=data.get('detail', '')
+        )
+
+
+_normalize_grade = compile_schema(GRADE_RESULT_SCHEMA)
+_normalize_batch = compile_schema(BATCH_GRADE_SCHEMA["properties"]["results"]["items"])
+_normalize_promotion = compile_schema(PROMOTION_RESULT_SCHEMA)
+_normalize_commentary = compile_schema(COMMENTARY_SCHEMA)
+
+
+def normalize_grade_result(data: Any) -> Dict:
+    """AutoGrader 응답 검증/정규화 (passed가 없으면 점수로 결정)"""
+    result = _normalize_grade(data, "$")
+    result.setdefault('passed', result['total_score'] >= GRADE_PASS_SCORE)
+    return result
+
+
+def normalize_batch_results(data: Any) -> Dict:
+    """배치 응답 정규화 (잘못된 항목은 버려서 개별 재채점되도록 함)"""
+    if not isinstance(data, dict) or not isinstance(data.get('results'), list):
+        raise SchemaError("$.results: 목록이 없습니다")
+    results = []
+    for i, entry in enumerate(data['results']):
+        try:
+            result = _normalize_batch(entry, f"$.results[{i}]")
+        except SchemaError:
+            continue
+        result.setdefault('passed', result['total_score'] >= GRADE_PASS_SCORE)
+        results.append(result)
+    return {'results': results}
+
+
+def normalize_promotion_result(data: Any, pass_score: float = PROMOTION_PASS_SCORE) -> Dict:
+    """승급 시험 응답 검증/정규화
+
+    - score가 숫자이면 {"total": score}로 감쌉니다
+    - total이 없거나 0이면 정량(quantitative.aggregate) + 정성(qualitative.overall)으로 계산합니다
+    - pass_fail이 없으면 total이 pass_score 이상인지로 결정합니다
+    """
+    if isinstance(data, dict) and isinstance(data.get('score'), (int, float, str)) \
+            and not isinstance(data.get('score'), bool):
+        data = dict(data, score={"total": data['score']})
+
+    result = _normalize_promotion(data, "$")
+    score = result['score']
+    if not score.get('total'):
+        parts = [score.get('quantitative', {}).get('aggregate'), score.get('qualitative', {}).get('overall')]
+        if all(part is None for part in parts) and 'total' not in score:
+            raise SchemaError("$.score: 총점을 계산할 수 없습니다")
+        score['total'] = sum(part or 0 for part in parts)
+    result.setdefault('pass_fail', 'PASS' if score['total'] >= pass_score else 'FAIL')
+    return result
+
+
+def normalize_commentary(data: Any) -> Dict:
+    return _normalize_commentary(data, "$")
+
+
+@dataclass(frozen=True)
+class ResponseSchema:
+    """구조화 출력 요청(response_format)과 수신 시 정규화 함수 묶음"""
+    name: str
+    schema: Dict
+    normalize: Callable[[Any], Dict]
+
+    @property
+    def response_format(self) -> Dict:
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": self.name, "schema": self.schema, "strict": False}
+        }
+
+
+GRADE_RESPONSE = ResponseSchema("grade_result", GRADE_RESULT_SCHEMA, normalize_grade_result)
+BATCH_GRADE_RESPONSE = ResponseSchema("batch_grade_result", BATCH_GRADE_SCHEMA, normalize_batch_results)
+PROMOTION_RESPONSE = ResponseSchema("promotion_result", PROMOTION_RESULT_SCHEMA, normalize_promotion_result)
+COMMENTARY_RESPONSE = ResponseSchema("promotion_commentary", COMMENTARY_SCHEMA, normalize_commentary)
@@ -0,0 +1,92 @@
+# src/models/question.py
+"""
+생성 문제 스키마 (LLM 구조화 출력 → DB 문제와 같은 런타임 형식으로 컴파일)
+"""
+
+from typing import Any, Dict, List
+
+from src.models.grading import ResponseSchema, SchemaError, compile_schema
+
+OPTION_IDS = "ABCDE"
+
+GENERATED_QUESTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "scenario": {"type": "string"},
+        "steps": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "question": {"type": "string"},
+                    "options": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "text": {"type": "string"},
+                                "feedback": {"type": "string", "default": ""},
+                                "weight": {"type": "number", "minimum": 0, "maximum": 1}
+                            },
+                            "required": ["text", "weight"]
+                        }
+                    }
+                },
+                "required": ["question", "options"]
+            }
+        }
+    },
+    "required": ["title", "scenario", "steps"]
+}
+
+_normalize_question = compile_schema(GENERATED_QUESTION_SCHEMA)
+
+
+def normalize_generated_question(data: Any) -> Dict:
+    """생성 문제 검증
+
+    - 단계는 1개 이상, 단계별 선택지는 2~5개
+    - 단계마다 정답(weight 1.0) 선택지가 정확히 1개
+    """
+    result = _normalize_question(data, "$")
+    if not result['steps']:
+        raise SchemaError("$.steps: 단계가 없습니다")
+    for i, step in enumerate(result['steps']):
+        options = step['options']
+        if not 2 <= len(options) <= len(OPTION_IDS):
+            raise SchemaError(f"$.steps[{i}].options: 선택지는 2~{len(OPTION_IDS)}개여야 합니다")
+        if sum(1 for option in options if option['weight'] == 1.0) != 1:
+            raise SchemaError(f"$.steps[{i}].options: 정답(weight 1.0)은 정확히 1개여야 합니다")
+    return result
+
+
+def compile_generated_question(data: Dict, difficulty: str, question_type: str = "multiple_choice") -> Dict:
+    """검증된 생성 문제를 DB 문제(questions 행)와 같은 형식으로 변환
+
+    선택지 ID(A, B, ...)는 순서대로 부여하며, steps는 이미 파싱된 목록 형태입니다.
+    """
+    steps: List[Dict] = []
+    for i, step in enumerate(data['steps']):
+        steps.append({
+            "step": i + 1,
+            "title": step.get('title') or f"단계 {i + 1}",
+            "question": step['question'],
+            "options": [
+                {"id": OPTION_IDS[j], "text": option['text'],
+                 "feedback": option.get('feedback', ''), "weight": option['weight']}
+                for j, option in enumerate(step['options'])
+            ]
+        })
+
+    return {
+        "question_text": data['title'],
+        "scenario": data['scenario'],
+        "difficulty": difficulty,
+        "type": question_type,
+        "steps": steps
+    }
+
+
+QUESTION_RESPONSE = ResponseSchema("generated_question", GENERATED_QUESTION_SCHEMA, normalize_generated_question)
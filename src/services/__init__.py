@@ -5,5 +5,11 @@ Service layer modules
 
 from .ai_services import AutoGrader, QuestionGenerator
 from .game_engine import GameEngine, UserManager
+from .grading_queue import GradingQueue, get_grading_queue
+from .question_pool import QuestionPool, get_question_pool
+from .avatar_queue import AvatarQueue, get_avatar_queue
+from .achievement_engine import AchievementEngine, get_achievement_engine
 
-__all__ = ['AutoGrader', 'QuestionGenerator', 'GameEngine', 'UserManager']
\ No newline at end of file
+__all__ = ['AutoGrader', 'QuestionGenerator', 'GameEngine', 'UserManager', 'GradingQueue', 'get_grading_queue',
+           'QuestionPool', 'get_question_pool', 'AvatarQueue', 'get_avatar_queue',
+           'AchievementEngine', 'get_achievement_engine']
\ No newline at end of file
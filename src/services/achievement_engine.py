@@ -0,0 +1,193 @@
+# achievement_engine.py
+"""
+이벤트 기반 업적 엔진
+
+- ACHIEVEMENTS + ACHIEVEMENT_RULES를 시작 시 한 번 이벤트별 조건 함수로 컴파일합니다
+- 답변/승급 이벤트마다 해당 이벤트의 아직 달성하지 않은 업적만 평가합니다
+- 달성한 업적은 user_achievements에 한 번만 저장되고, 조회는 사용자별 캐시 목록을 반환합니다
+"""
+
+import logging
+import operator
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from src.core.config import ACHIEVEMENTS, ACHIEVEMENT_RULES, ACHIEVEMENT_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+_OPERATORS = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+    '==': operator.eq
+}
+
+# 프로필(users 행)에서 그대로 가져오는 누적 통계
+PROFILE_FIELDS = ('level', 'experience_points', 'total_questions_solved', 'correct_answers',
+                  'current_streak', 'best_streak')
+
+
+def profile_context(profile: Dict) -> Dict:
+    """프로필 → 업적 조건 컨텍스트 (누적 통계 + 정답률 %)"""
+    ctx = {field: profile.get(field) for field in PROFILE_FIELDS}
+    solved = ctx['total_questions_solved'] or 0
+    ctx['accuracy'] = (ctx['correct_answers'] or 0) / solved * 100 if solved > 0 else None
+    return ctx
+
+
+class AchievementRule:
+    """업적 1개의 컴파일된 조건"""
+
+    def __init__(self, achievement: tuple, event: str, conditions: List[tuple]):
+        self.achievement_id, self.name, self.description, self.icon, self.xp, self.rarity = achievement
+        self.event = event
+        self.fields = {field for field, _, _ in conditions}
+        self._checks: List[Callable[[Dict], bool]] = [self._compile(*condition) for condition in conditions]
+
+    @staticmethod
+    def _compile(field: str, op: str, value: Any) -> Callable[[Dict], bool]:
+        if op not in _OPERATORS:
+            raise ValueError(f"알 수 없는 업적 조건 연산자: {op}")
+        compare = _OPERATORS[op]
+        # 이벤트에 없는 필드는 조건 불충족 (예: 단순 모드 답변에는 토큰 정보가 없음)
+        return lambda ctx: ctx.get(field) is not None and compare(ctx[field], value)
+
+    def matches(self, ctx: Dict) -> bool:
+        return all(check(ctx) for check in self._checks)
+
+    def to_dict(self, unlocked_at: str = None) -> Dict:
+        return {
+            'achievement_id': self.achievement_id,
+            'name': self.name,
+            'description': self.description,
+            'icon': self.icon,
+            'xp': self.xp,
+            'rarity': self.rarity,
+            'unlocked_at': unlocked_at
+        }
+
+
+def compile_rules(achievements: List[tuple] = ACHIEVEMENTS,
+                  rules: Dict[str, tuple] = ACHIEVEMENT_RULES) -> Dict[str, List[AchievementRule]]:
+    """업적 정의 → 이벤트별 조건 목록 (조건이 없거나 None인 업적은 평가하지 않음)"""
+    compiled: Dict[str, List[AchievementRule]] = {}
+    for achievement in achievements:
+        if achievement[0] not in rules:
+            logger.warning("달성 조건이 없는 업적: %s", achievement[0])
+            continue
+        rule = rules[achievement[0]]
+        if rule is None:
+            continue
+        event, conditions = rule
+        compiled.setdefault(event, []).append(AchievementRule(achievement, event, conditions))
+    return compiled
+
+
+class _UserState:
+    __slots__ = ('unlocked', 'failed_questions')
+
+    def __init__(self, unlocked: Dict[str, Optional[str]]):
+        self.unlocked = unlocked                                # 업적 ID → 달성 시각
+        self.failed_questions: Optional[Set[str]] = None        # comeback_kid용, 처음 필요할 때 로드
+
+
+class AchievementEngine:
+    """사용자별 업적 상태 캐시 + 이벤트 평가"""
+
+    def __init__(self, db, rules: Dict[str, List[AchievementRule]] = None,
+                 cache_size: int = ACHIEVEMENT_CACHE_SIZE):
+        self.db = db
+        self.rules = rules if rules is not None else compile_rules()
+        self._by_id = {rule.achievement_id: rule for event_rules in self.rules.values() for rule in event_rules}
+        self.cache_size = cache_size
+        self._states: "OrderedDict[str, _UserState]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, user_id: str, profile: Dict = None) -> List[Dict]:
+        """달성한 업적 목록 (캐시)"""
+        with self._lock:
+            state = self._state(user_id, profile)
+            return [self._by_id[aid].to_dict(at) for aid, at in state.unlocked.items() if aid in self._by_id]
+
+    def on_answer(self, user_id: str, profile: Dict, question_id: str, correct: bool,
+                  time_taken: Optional[int] = None, tokens_used: Optional[int] = None) -> List[Dict]:
+        """답변 이벤트 평가 (profile은 이번 답변이 반영된 누적 통계), 새로 달성한 업적 반환
+
+        time_taken/tokens_used는 플레이어가 문제를 푸는 데 쓴 값입니다 (측정하지 않았으면 None).
+        """
+        with self._lock:
+            # 캐시가 비어 있어도 누적 통계 소급 반영은 하지 않음: 이번 답변이 반영된 프로필로 소급하면
+            # 이 답변으로 달성한 업적이 보상/알림 없이 저장되므로, 아래 이벤트 평가가 그 역할을 대신함
+            state = self._state(user_id)
+            ctx = profile_context(profile)
+            ctx.update({'correct': correct, 'time_taken': time_taken, 'tokens_used': tokens_used})
+
+            if self._pending(state, 'answer', 'retried_failed'):
+                ctx['retried_failed'] = question_id in self._failed_questions(user_id, state)
+            if not correct and question_id and state.failed_questions is not None:
+                state.failed_questions.add(question_id)
+
+            return self._unlock(user_id, state, 'answer', ctx)
+
+    def on_promotion(self, user_id: str, score: float, new_level: int) -> List[Dict]:
+        """승급 이벤트 평가, 새로 달성한 업적 반환"""
+        with self._lock:
+            state = self._state(user_id)
+            return self._unlock(user_id, state, 'promotion', {'score': score, 'new_level': new_level})
+
+    def _pending(self, state: _UserState, event: str, field: str) -> bool:
+        """아직 달성하지 않은 업적 중 field를 쓰는 조건이 있는지"""
+        return any(field in rule.fields and rule.achievement_id not in state.unlocked
+                   for rule in self.rules.get(event, ()))
+
+    def _unlock(self, user_id: str, state: _UserState, event: str, ctx: Dict) -> List[Dict]:
+        newly = [rule for rule in self.rules.get(event, ())
+                 if rule.achievement_id not in state.unlocked and rule.matches(ctx)]
+        if not newly:
+            return []
+        rows = self.db.unlock_achievements(user_id, [rule.achievement_id for rule in newly])
+        if rows is None:
+            return []
+        # 반환된 행만 이번에 새로 저장된 업적 (다른 프로세스가 먼저 저장한 업적은 상태만 갱신)
+        inserted = {row.get('achievement_id'): row.get('unlocked_at') for row in rows}
+        for rule in newly:
+            state.unlocked[rule.achievement_id] = inserted.get(rule.achievement_id)
+        return [rule.to_dict(inserted[rule.achievement_id]) for rule in newly if rule.achievement_id in inserted]
+
+    def _state(self, user_id: str, profile: Dict = None) -> _UserState:
+        state = self._states.get(user_id)
+        if state is not None:
+            self._states.move_to_end(user_id)
+            return state
+
+        rows = self.db.get_unlocked_achievements(user_id)
+        state = _UserState({row['achievement_id']: row.get('unlocked_at') for row in rows})
+        if profile is not None:
+            # 엔진 도입 전부터 누적 통계로 이미 조건을 만족한 업적은 처음 조회할 때 한 번 반영 (보상 XP 없음)
+            self._unlock(user_id, state, 'answer', profile_context(profile))
+
+        self._states[user_id] = state
+        while len(self._states) > self.cache_size:
+            self._states.popitem(last=False)
+        return state
+
+    def _failed_questions(self, user_id: str, state: _UserState) -> Set[str]:
+        if state.failed_questions is None:
+            state.failed_questions = set(self.db.get_failed_question_ids(user_id))
+        return state.failed_questions
+
+
+_achievement_engine: Optional[AchievementEngine] = None
+_achievement_engine_lock = threading.Lock()
+
+
+def get_achievement_engine(db) -> AchievementEngine:
+    """프로세스 전역 업적 엔진 (모든 세션이 같은 캐시를 공유)"""
+    global _achievement_engine
+    with _achievement_engine_lock:
+        if _achievement_engine is None:
+            _achievement_engine = AchievementEngine(db)
+    return _achievement_engine
@@ -3,26 +3,34 @@
 AI 관련 서비스 클래스들
 """
 
-import json
 import time
 import random
-import base64
 import io
 import hashlib
-from typing import Dict, List, Optional
-from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+from PIL import Image, ImageDraw, ImageFont, features
 import streamlit as st
 
 from src.core.config import (
-    OPENAI_API_KEY, OPENAI_MODEL,
-    GRADING_CRITERIA, LEVEL_COLORS, LEVEL_ICONS
+    OPENAI_API_KEY, GRADING_MODE, GRADING_SIMULATION_SEED, QUESTION_GENERATION_STEPS,
+    GRADING_CRITERIA, LEVEL_COLORS, LEVEL_ICONS,
+    AVATAR_SIZE, AVATAR_THUMBNAIL_SIZES, AVATAR_FONT_SIZE, AVATAR_FONT_PATHS, AVATAR_CACHE_SIZE, AVATAR_FORMAT
 )
+from src.models.grading import BATCH_GRADE_RESPONSE, GRADE_RESPONSE, criteria_level
+from src.models.question import QUESTION_RESPONSE, compile_generated_question
+from src.services.avatar_store import avatar_store
+from src.services.grading_router import grading_router, is_confident_grade
+from src.services.llm_client import CancelToken, get_openai_client
+from src.services.pre_grading import PreGradingPipeline, pre_grading_pipeline
+from src.services.prompt_builder import build_grading_prompt, compact_json
+from src.services.prompt_registry import compute_etag
+from src.services.simulation_grader import SimulationGrader
 
-# OpenAI 클라이언트 초기화
+# OpenAI 클라이언트 초기화 (마감 시간이 설정된 공용 클라이언트)
 try:
-    from openai import OpenAI
     if OPENAI_API_KEY:
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = get_openai_client()
     else:
         client = None
         st.warning("⚠️ OPENAI_API_KEY가 설정되지 않았습니다. 일부 기능이 제한될 수 있습니다.")
@@ -31,129 +39,162 @@ except Exception as e:
     st.error(f"OpenAI 클라이언트 초기화 오류: {str(e)}")
 
 
+def _load_avatar_font():
+    """아바타 이니셜 폰트 (Pretendard 우선, 프로세스에서 한 번만 로드)"""
+    for path in AVATAR_FONT_PATHS:
+        try:
+            return ImageFont.truetype(path, AVATAR_FONT_SIZE)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+_AVATAR_FONT = _load_avatar_font()
+
+
+def _avatar_format() -> str:
+    return 'webp' if AVATAR_FORMAT == 'webp' and features.check('webp') else 'png'
+
+
+def _encode_image(img: Image.Image, ext: str) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format=ext.upper(), **({'quality': 90} if ext == 'webp' else {}))
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=AVATAR_CACHE_SIZE)
+def render_avatar(initials: str, level: int) -> str:
+    """(이니셜, 레벨) 아바타를 렌더링해 DB에 저장할 값 반환 (같은 조합은 캐시된 값 재사용)
+
+    원본 + 작은 해상도를 아바타 저장소(버킷 + 로컬 캐시)에 저장하고 키를 반환합니다
+    (버킷에 올리지 못하면 data URL).
+    """
+    size = AVATAR_SIZE
+    img = Image.new('RGB', (size, size), color=LEVEL_COLORS.get(level, '#FFFFFF'))
+    draw = ImageDraw.Draw(img)
+    draw.text((size // 2, size // 2), initials, fill='white', anchor='mm', font=_AVATAR_FONT)
+    
+    # 레벨 표시
+    draw.text((size - 30, size - 30), LEVEL_ICONS.get(level, ''), fill='white', anchor='mm')
+    
+    ext = _avatar_format()
+    images = {size: _encode_image(img, ext)}
+    for thumb_size in AVATAR_THUMBNAIL_SIZES:
+        if thumb_size < size:
+            images[thumb_size] = _encode_image(img.resize((thumb_size, thumb_size), Image.LANCZOS), ext)
+    return avatar_store.save(images, ext)
+
+
 class ProfileGenerator:
-    """AI 기반 프로필 이미지 생성기"""
+    """프로필 아바타 생성 보조 (사용자 이름 → 이니셜, 렌더링은 render_avatar)"""
     
     @staticmethod
-    def generate_profile_image(username: str, level: int, prompt: str = None) -> str:
-        """사용자 프로필 이미지 생성"""
-        try:
-            img = Image.new('RGB', (200, 200), color='white')
-            draw = ImageDraw.Draw(img)
-            
-            # 레벨에 따른 배경색
-            bg_color = LEVEL_COLORS.get(level, '#FFFFFF')
-            
-            # 배경 그리기
-            draw.rectangle([0, 0, 200, 200], fill=bg_color)
-            
-            # 사용자 이니셜
-            initials = ''.join([word[0].upper() for word in username.split()[:2]])
-            
-            # 텍스트 그리기 (Pretendard 폰트 우선 시도)
-            try:
-                # Pretendard 폰트 시도 (Windows)
-                font = ImageFont.truetype("C:/Windows/Fonts/pretendard.ttf", 80)
-            except:
-                try:
-                    # Pretendard 폰트 시도 (macOS)
-                    font = ImageFont.truetype("/System/Library/Fonts/pretendard.ttf", 80)
-                except:
-                    try:
-                        # Pretendard 폰트 시도 (Linux)
-                        font = ImageFont.truetype("/usr/share/fonts/truetype/pretendard.ttf", 80)
-                    except:
-                        try:
-                            # 기본 시스템 폰트 시도
-                            font = ImageFont.truetype("arial.ttf", 80)
-                        except:
-                            # 최종 fallback
-                            font = ImageFont.load_default()
-            
-            draw.text((100, 100), initials, fill='white', anchor='mm', font=font)
-            
-            # 레벨 표시
-            level_icon = LEVEL_ICONS.get(level, '')
-            draw.text((170, 170), level_icon, fill='white', anchor='mm')
-            
-            # Base64로 인코딩
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            img_str = base64.b64encode(buffer.getvalue()).decode()
-            
-            return f"data:image/png;base64,{img_str}"
-        except Exception as e:
-            st.error(f"프로필 이미지 생성 오류: {str(e)}")
-            return ""
+    def initials(username: str) -> str:
+        return ''.join([word[0].upper() for word in username.split()[:2]])
+
+
+GRADING_SYSTEM_PROMPT = """당신은 AI 활용능력평가 전문 채점관입니다.
+        주어진 답변을 평가하고 점수와 피드백을 제공해주세요.
+        평가는 공정하고 객관적이어야 하며, 구체적인 개선점을 제시해야 합니다."""
+
+
+GRADING_RESPONSE_FORMAT = """다음 형식으로 채점해주세요:
+{
+    "total_score": 0-100 사이의 점수,
+    "criteria_scores": {각 기준별 점수},
+    "passed": true/false (60점 이상이면 true),
+    "strengths": ["강점1", "강점2"],
+    "improvements": ["개선점1", "개선점2"],
+    "feedback": "종합 피드백"
+}
+"""
+
+# 사용량 원장에 기록할 채점 프롬프트 버전 (프롬프트 내용이 바뀌면 함께 바뀜)
+GRADING_PROMPT_VERSION = f"autograder@{compute_etag(GRADING_SYSTEM_PROMPT + GRADING_RESPONSE_FORMAT)}"
 
 
 class AutoGrader:
     """AI 기반 자동 채점 시스템"""
     
-    def __init__(self):
+    def __init__(self, mode: str = GRADING_MODE, seed: int = GRADING_SIMULATION_SEED,
+                 pre_grading: PreGradingPipeline = None):
         self.grading_criteria = GRADING_CRITERIA
+        self.pre_grading = pre_grading or pre_grading_pipeline
+        self.simulator = SimulationGrader(seed)
+        # 설정이 simulation이거나 OpenAI 클라이언트가 없으면 시뮬레이션 채점
+        self.simulation = mode == 'simulation' or client is None
     
-    def grade_answer(self, question: Dict, answer: str, level: str) -> Dict:
-        """답변 자동 채점"""
+    def grade_answer(self, question: Dict, answer: str, level: str,
+                     on_partial: Optional[Callable[[Dict], None]] = None,
+                     cancel_token: Optional[CancelToken] = None,
+                     pre_checked: bool = False) -> Dict:
+        """답변 자동 채점
+
+        on_partial이 주어지면 스트리밍 모드로 호출하며, total_score/passed 등
+        파싱이 끝난 필드와 작성 중인 feedback을 도착하는 대로 전달합니다.
+        cancel_token이 취소되면 진행 중인 호출을 중단합니다.
+        빈 답변, 문제 복사 등 명백한 경우는 사전 채점 필터가 LLM 호출 없이 결정합니다
+        (호출자가 이미 필터를 거친 답변이면 pre_checked=True로 건너뜁니다).
+        """
         start_time = time.time()
         
-        # OpenAI 클라이언트가 없는 경우 시뮬레이션 모드
-        if client is None:
+        # 사전 채점 필터 (명백한 경우 로컬에서 즉시 결정)
+        if not pre_checked:
+            pre_graded = self.pre_grading.run(question, answer, level)
+            if pre_graded is not None:
+                return pre_graded
+        
+        # 시뮬레이션 모드 (설정 또는 OpenAI 클라이언트 없음)
+        if self.simulation:
             return self._simulate_grading(question, answer, level, start_time)
         
         # 채점 프롬프트 구성
-        system_prompt = """당신은 AI 활용능력평가 전문 채점관입니다.
-        주어진 답변을 평가하고 점수와 피드백을 제공해주세요.
-        평가는 공정하고 객관적이어야 하며, 구체적인 개선점을 제시해야 합니다."""
+        system_prompt = GRADING_SYSTEM_PROMPT
         
-        criteria = self.grading_criteria.get(level, self.grading_criteria["basic"])
+        # 앱 난이도 표기("아주 쉬움" 등)를 채점 기준 키로 바꿔 기준 선택과 모델 라우팅에 함께 사용
+        criteria_key = criteria_level(level)
+        criteria = self.grading_criteria[criteria_key]
         
-        user_prompt = f"""
-문제: {question.get('question_text', question.get('question', '문제 없음'))}
-
-학생 답변: {answer}
-
-평가 기준:
-{json.dumps(criteria, indent=2)}
-
-다음 형식으로 채점해주세요:
-{{
-    "total_score": 0-100 사이의 점수,
-    "criteria_scores": {{각 기준별 점수}},
-    "passed": true/false (60점 이상이면 true),
-    "strengths": ["강점1", "강점2"],
-    "improvements": ["개선점1", "개선점2"],
-    "feedback": "종합 피드백"
-}}
-"""
+        user_prompt = build_grading_prompt(
+            question.get('question_text', question.get('question', '문제 없음')),
+            answer,
+            criteria,
+            GRADING_RESPONSE_FORMAT
+        )
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
         
         try:
-            response = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
+            # 난이도/신뢰도에 따라 fast → strong 모델 순으로 라우팅
+            # (on_partial이 있으면 스트리밍으로 부분 결과를 즉시 전달)
+            content, result, tokens_used, model = grading_router.grade(
+                messages, criteria_key, on_partial=on_partial, client=client, cancel_token=cancel_token,
+                purpose="grading", prompt_version=GRADING_PROMPT_VERSION, schema=GRADE_RESPONSE
             )
             
-            # 응답 파싱
-            content = response.choices[0].message.content
-            tokens_used = response.usage.total_tokens
             time_taken = int(time.time() - start_time)
             
-            # JSON 파싱
-            try:
-                result = json.loads(content)
-            except:
-                # 파싱 실패 시 기본 구조
+            if result is None:
+                # 스키마에 맞지 않는 응답 (fast/strong 모두 실패)
                 result = {
                     "total_score": 0,
                     "passed": False,
                     "feedback": content
                 }
+                parsed = False
+            else:
+                parsed = True
             
             result["time_taken"] = time_taken
             result["tokens_used"] = tokens_used
+            result["model"] = model
+            
+            if parsed:
+                # 같은 문제의 (거의) 같은 답변은 이 결과를 재사용
+                self.pre_grading.remember(question, answer, level, result)
             
             return result
             
@@ -166,45 +207,141 @@ class AutoGrader:
                 "tokens_used": 0
             }
     
-    def _simulate_grading(self, question: Dict, answer: str, level: str, start_time: float) -> Dict:
-        """OpenAI API 없이 시뮬레이션 채점"""
-        time_taken = int(time.time() - start_time)
+    def grade_batch(self, items: List[Dict], pre_checked: bool = False) -> List[Dict]:
+        """여러 답변을 한 번의 요청으로 채점
+
+        Args:
+            items: {"question", "answer", "level"} 딕셔너리 목록
+            pre_checked: 모든 항목이 이미 사전 채점 필터를 통과했으면 True (필터를 다시 돌리지 않음)
         
-        # 답변 길이와 내용에 따른 간단한 점수 계산
-        answer_length = len(answer.strip())
-        base_score = min(100, max(0, answer_length * 2))  # 길이에 따른 기본 점수
+        Returns:
+            items와 같은 순서의 채점 결과 목록. 배치 응답에서 누락되었거나
+            형식이 잘못된 항목은 grade_answer로 개별 재채점합니다.
+            사전 채점 필터로 결정된 항목은 요청에 포함하지 않습니다.
+        """
+        if pre_checked:
+            return self._grade_batch(items)
+        results: List[Optional[Dict]] = [
+            self.pre_grading.run(item['question'], item['answer'], item['level']) for item in items
+        ]
+        pending = [i for i, result in enumerate(results) if result is None]
         
-        # 난이도별 조정
-        from src.core.config import DIFFICULTY_MULTIPLIER
-        adjusted_score = base_score * DIFFICULTY_MULTIPLIER.get(level, 1.0)
+        if pending:
+            graded = self._grade_batch([items[i] for i in pending])
+            for i, result in zip(pending, graded):
+                results[i] = result
         
-        # 랜덤 요소 추가 (실제 AI 채점 시뮬레이션)
-        final_score = min(100, max(0, adjusted_score + random.randint(-20, 20)))
+        return results
+    
+    def _grade_batch(self, items: List[Dict]) -> List[Dict]:
+        """사전 채점 필터를 통과한 답변들의 배치 채점"""
+        if not items:
+            return []
+        
+        start_time = time.time()
+        
+        if self.simulation:
+            return self.simulator.grade_batch(items)
+        
+        if len(items) == 1:
+            item = items[0]
+            return [self.grade_answer(item['question'], item['answer'], item['level'], pre_checked=True)]
+        
+        # 공통 평가 기준은 난이도별로 한 번만 포함
+        levels = sorted({criteria_level(item['level']) for item in items})
+        criteria_block = {level: self.grading_criteria[level] for level in levels}
         
-        passed = final_score >= 60
+        answers_block = "\n\n".join(
+            f"[{i}] 난이도: {criteria_level(item['level'])}\n"
+            f"문제: {item['question'].get('question_text', item['question'].get('question', '문제 없음'))}\n"
+            f"학생 답변: {item['answer']}"
+            for i, item in enumerate(items)
+        )
         
-        feedback = f"""
-시뮬레이션 모드에서 채점되었습니다.
+        user_prompt = f"""
+아래 {len(items)}개의 답변을 각각 독립적으로 채점해주세요.
 
-점수: {final_score:.1f}점
-결과: {'통과' if passed else '실패'}
+난이도별 평가 기준:
+{compact_json(criteria_block)}
 
-답변 길이: {answer_length}자
-소요 시간: {time_taken}초
+{answers_block}
 
-실제 AI 채점을 위해서는 OpenAI API 키를 설정해주세요.
+다음 형식으로 채점해주세요 (results의 id는 답변 번호):
+{{
+    "results": [
+        {{
+            "id": 답변 번호,
+            "total_score": 0-100 사이의 점수,
+            "criteria_scores": {{각 기준별 점수}},
+            "passed": true/false (60점 이상이면 true),
+            "strengths": ["강점1", "강점2"],
+            "improvements": ["개선점1", "개선점2"],
+            "feedback": "종합 피드백"
+        }}
+    ]
+}}
 """
         
-        return {
-            "total_score": final_score,
-            "criteria_scores": {"accuracy": final_score * 0.6, "completeness": final_score * 0.3, "clarity": final_score * 0.1},
-            "passed": passed,
-            "strengths": ["답변을 제출했습니다", "문제에 대한 시도를 했습니다"] if answer_length > 10 else [],
-            "improvements": ["더 구체적인 답변을 작성해보세요", "실제 사례를 포함해보세요"] if not passed else [],
-            "feedback": feedback,
-            "time_taken": time_taken,
-            "tokens_used": 0
-        }
+        results: List[Optional[Dict]] = [None] * len(items)
+        tokens_used = 0
+        model = None
+        
+        def batch_is_confident(parsed: Optional[Dict]) -> bool:
+            entries = parsed.get('results') if isinstance(parsed, dict) else None
+            return (isinstance(entries, list) and len(entries) == len(items)
+                    and all(is_confident_grade(entry) for entry in entries))
+        
+        # 모든 항목이 같은 기준일 때만 그 기준으로 라우팅 (혼합 배치는 strong)
+        route_level = levels[0] if len(levels) == 1 else None
+        
+        try:
+            _, parsed, tokens_used, model = grading_router.grade(
+                [
+                    {"role": "system", "content": GRADING_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ],
+                route_level,
+                client=client,
+                is_confident=batch_is_confident,
+                purpose="grading_batch",
+                prompt_version=GRADING_PROMPT_VERSION,
+                schema=BATCH_GRADE_RESPONSE
+            )
+            
+            # 항목은 수신 시 스키마로 정규화되어 있음 (잘못된 항목은 이미 제외됨)
+            for entry in parsed['results']:
+                if 0 <= entry['id'] < len(items):
+                    results[entry['id']] = entry
+        except Exception:
+            # 배치 전체 실패 시 아래에서 모든 항목을 개별 재채점
+            pass
+        
+        time_taken = int(time.time() - start_time)
+        graded = sum(1 for result in results if result is not None)
+        per_item_tokens = tokens_used // graded if graded else 0
+        
+        for i, item in enumerate(items):
+            if results[i] is None:
+                # 부분 실패: 누락/손상된 항목만 개별 채점
+                results[i] = self.grade_answer(item['question'], item['answer'], item['level'],
+                                               pre_checked=True)
+                continue
+            results[i].pop('id', None)
+            results[i]["time_taken"] = time_taken
+            results[i]["tokens_used"] = per_item_tokens
+            results[i]["model"] = model
+            self.pre_grading.remember(item['question'], item['answer'], item['level'], results[i])
+        
+        return results
+    
+    def _simulate_grading(self, question: Dict, answer: str, level: str, start_time: float) -> Dict:
+        """OpenAI API 없이 시뮬레이션 채점 (시드 고정, 재현 가능)"""
+        return self.simulator.grade(question, answer, level, start_time)
+
+
+QUESTION_SYSTEM_PROMPT = """당신은 AI 활용능력평가 문제 출제 전문가입니다.
+        실제 업무 상황에서 AI 도구를 활용하는 판단력을 평가하는 시나리오형 문제를 출제합니다.
+        선택지는 모두 그럴듯해야 하며, 정답은 하나로 명확해야 합니다."""
 
 
 class QuestionGenerator:
@@ -241,3 +378,38 @@ class QuestionGenerator:
             "level": level,
             "type": "practice"
         }
+    
+    @staticmethod
+    def generate_practice_question(difficulty: str, level: int,
+                                   steps: int = QUESTION_GENERATION_STEPS) -> Optional[Dict]:
+        """LLM으로 객관식 시나리오 문제 생성 (DB 문제와 같은 형식, 실패 시 None)
+
+        응답 대기 시간이 길기 때문에 요청 경로가 아닌 QuestionPool의 백그라운드 작업에서 호출합니다.
+        """
+        if client is None:
+            return None
+        
+        messages = [
+            {"role": "system", "content": QUESTION_SYSTEM_PROMPT},
+            {"role": "user", "content": (
+                f"난이도: {difficulty}\n"
+                f"대상 레벨: {level}\n"
+                f"단계 수: {steps}\n\n"
+                "업무 시나리오와 단계별 객관식 문제를 만들어주세요. "
+                "각 단계의 선택지는 3~4개이며, 가장 적절한 선택지 1개만 weight 1.0이고 "
+                "나머지는 적절한 정도에 따라 0.0~0.7 사이의 weight를 가집니다. "
+                "모든 선택지에 선택 이유를 설명하는 feedback을 작성해주세요."
+            )}
+        ]
+        
+        try:
+            _, parsed, _, _ = grading_router.grade(
+                messages, None, client=client,
+                purpose="question_generation", schema=QUESTION_RESPONSE
+            )
+        except Exception:
+            return None
+        
+        if parsed is None:
+            return None
+        return compile_generated_question(parsed, difficulty)
@@ -0,0 +1,66 @@
+# avatar_queue.py
+"""
+프로필 아바타 백그라운드 생성 큐
+
+가입 시에는 아바타 없이 사용자를 먼저 저장하고, 렌더링은 실행기에서 처리한 뒤 결과 키(버킷 저장 실패 시 data URL)를 DB에 반영합니다.
+가입 시점 외에도 프로필을 표시할 때 아바타가 비어 있거나 키의 파일이 버킷/로컬 어디에도 없으면 같은 큐로 생성을 요청합니다.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from src.core.config import AVATAR_WORKERS
+from src.services.ai_services import ProfileGenerator, render_avatar
+
+logger = logging.getLogger(__name__)
+
+
+class AvatarQueue:
+    """사용자별 아바타 생성 요청 (같은 사용자의 진행 중인 요청은 합침)"""
+
+    def __init__(self, persist: Callable[[str, str], bool] = None, max_workers: int = AVATAR_WORKERS):
+        self.persist = persist
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="avatar")
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def request(self, user_id: str, username: str, level: int = 1) -> Future:
+        """아바타 생성 요청 (결과는 profile_image에 저장한 값, 실패 시 None)"""
+        with self._lock:
+            future = self._pending.get(user_id)
+            if future is None:
+                future = self._executor.submit(self._generate, user_id, username, level)
+                self._pending[user_id] = future
+        return future
+
+    def pending(self, user_id: str) -> bool:
+        with self._lock:
+            return user_id in self._pending
+
+    def _generate(self, user_id: str, username: str, level: int) -> Optional[str]:
+        try:
+            image = render_avatar(ProfileGenerator.initials(username or ''), level)
+            if self.persist is not None and not self.persist(user_id, image):
+                logger.warning("아바타 저장 실패 (%s)", user_id)
+            return image
+        except Exception as e:
+            logger.warning("아바타 생성 실패 (%s): %s", user_id, e)
+            return None
+        finally:
+            with self._lock:
+                self._pending.pop(user_id, None)
+
+
+_avatar_queue: Optional[AvatarQueue] = None
+_avatar_queue_lock = threading.Lock()
+
+
+def get_avatar_queue(db=None) -> AvatarQueue:
+    """프로세스 전역 아바타 생성 큐 (db가 있으면 생성된 값을 users.profile_image에 저장)"""
+    global _avatar_queue
+    with _avatar_queue_lock:
+        if _avatar_queue is None:
+            _avatar_queue = AvatarQueue(persist=db.set_profile_image if db is not None else None)
+    return _avatar_queue
@@ -0,0 +1,261 @@
+# avatar_store.py
+"""
+내용 주소 기반 아바타 저장소 (공유 저장소 + 로컬 파일 캐시)
+
+- 원본은 Supabase Storage 버킷(AVATAR_BUCKET)에 두고, DB(users.profile_image)에는 짧은 키(<해시>.<확장자>)만 저장합니다
+- 로컬 디렉터리는 캐시입니다: Streamlit Cloud의 파일 시스템은 재배포/재시작 시 비워지므로, 파일이 없으면 버킷에서 다시 받습니다
+- 이미지 바이트의 해시를 키로 쓰므로 같은 내용은 같은 키, 업로드/다운로드를 반복해도 안전합니다
+- 로컬 파일은 Streamlit 정적 파일 서빙(static/ 디렉터리, .streamlit/config.toml의 enableStaticServing)으로 제공됩니다
+- URL에 ?v=<해시>를 붙여 정적 파일 핸들러가 장기 캐시 헤더를 보내게 합니다 (내용이 바뀌면 키도 바뀜)
+- 작은 해상도(<해시>-<크기>.<확장자>)도 함께 저장하고, 화면은 표시 크기에 맞는 가장 작은 파일을 요청합니다
+- 버킷에 올리지 못하면(설정 없음/오류) data URL을 DB에 저장해 이미지가 유실되지 않게 하며,
+  이전에 저장된 data URL은 프로필 조회 시 버킷에 올리고 키로 바꿉니다
+"""
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from src.auth.supabase_auth import _get_supabase
+from src.core.config import (
+    AVATAR_STORE_DIR, AVATAR_URL_PREFIX, AVATAR_THUMBNAIL_SIZES, AVATAR_CACHE_SIZE, AVATAR_BUCKET,
+    SUPABASE_URL, SUPABASE_ANON_KEY
+)
+
+logger = logging.getLogger(__name__)
+
+_KEY_PATTERN = re.compile(r'^[0-9a-f]{32}\.(webp|png|jpeg|gif)$')
+_DATA_URL_PATTERN = re.compile(r'^data:image/(webp|png|jpeg|jpg|gif);base64,(.+)$', re.DOTALL | re.IGNORECASE)
+# 작은 해상도를 만들 형식 (gif는 애니메이션이 깨지므로 원본만 제공)
+_THUMBNAIL_FORMATS = {'webp': 'WEBP', 'png': 'PNG', 'jpeg': 'JPEG'}
+
+
+def to_data_url(data: bytes, ext: str) -> str:
+    """이미지 바이트 → data URL (버킷에 올리지 못했을 때 DB에 저장하는 값)"""
+    return f"data:image/{ext};base64,{base64.b64encode(data).decode()}"
+
+
+def is_avatar_key(value: Optional[str]) -> bool:
+    return bool(value) and bool(_KEY_PATTERN.match(value))
+
+
+def is_data_url(value: Optional[str]) -> bool:
+    return str(value or '').startswith('data:image')
+
+
+class AvatarStore:
+    """내용 주소 기반 아바타 저장소 (버킷 원본 + 로컬 캐시)"""
+
+    def __init__(self, root: str = AVATAR_STORE_DIR, url_prefix: str = AVATAR_URL_PREFIX,
+                 sizes: List[int] = AVATAR_THUMBNAIL_SIZES, bucket_name: str = AVATAR_BUCKET, bucket=None):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip('/')
+        self.sizes = sorted(sizes)
+        self.bucket_name = bucket_name
+        self._bucket = bucket
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 공유 저장소 (Supabase Storage)
+    # ------------------------------------------------------------------
+
+    def bucket(self):
+        """버킷 핸들 (Supabase 설정이 없으면 None)"""
+        if self._bucket is None and self.bucket_name and SUPABASE_URL and SUPABASE_ANON_KEY:
+            try:
+                client = _get_supabase(SUPABASE_URL, SUPABASE_ANON_KEY)
+                self._bucket = client.storage.from_(self.bucket_name) if client else None
+            except Exception as e:
+                logger.warning("아바타 버킷 연결 실패: %s", e)
+        return self._bucket
+
+    def _upload(self, key: str, data: bytes) -> bool:
+        bucket = self.bucket()
+        if bucket is None:
+            return False
+        try:
+            bucket.upload(key, data, file_options={
+                "content-type": f"image/{key.rsplit('.', 1)[1]}",
+                "cache-control": "31536000",
+                "upsert": "true"
+            })
+            return True
+        except Exception as e:
+            logger.warning("아바타 업로드 실패 (%s): %s", key, e)
+            return False
+
+    def _download(self, key: str) -> Optional[bytes]:
+        bucket = self.bucket()
+        if bucket is None:
+            return None
+        try:
+            return bucket.download(key)
+        except Exception:
+            return None
+
+    # ------------------------------------------------------------------
+    # 저장
+    # ------------------------------------------------------------------
+
+    def save(self, images: Dict[int, bytes], ext: str) -> str:
+        """해상도별 이미지를 로컬 캐시와 버킷에 저장하고 DB에 넣을 값 반환
+
+        버킷에 모두 올라가면 키, 아니면 가장 큰 이미지의 data URL (재시작해도 유실되지 않도록).
+        """
+        key = self.put_variants(images, ext)
+        largest = max(images)
+        uploaded = all(
+            self._upload(key if size == largest else self.variant_key(key, size), data)
+            for size, data in images.items()
+        )
+        return key if uploaded else to_data_url(images[largest], ext)
+
+    def migrate(self, data_url: str) -> Optional[str]:
+        """data URL → 버킷에 올린 키 (형식이 다르거나 업로드에 실패하면 None)"""
+        decoded = self._decode(data_url)
+        if decoded is None:
+            return None
+        value = self.save(self._variants(*decoded), decoded[1])
+        return value if is_avatar_key(value) else None
+
+    def put(self, data: bytes, ext: str) -> str:
+        """이미지를 로컬 캐시에 저장 후 키 반환 (같은 내용은 같은 키, 이미 있으면 쓰지 않음)"""
+        key = f"{hashlib.sha256(data).hexdigest()[:32]}.{ext}"
+        self._write(key, data)
+        return key
+
+    def put_variants(self, images: Dict[int, bytes], ext: str) -> str:
+        """해상도별 이미지를 로컬 캐시에 저장 (가장 큰 이미지의 키 반환, 나머지는 같은 키의 크기별 파일)"""
+        largest = max(images)
+        key = self.put(images[largest], ext)
+        for size, data in images.items():
+            if size != largest:
+                self._write(self.variant_key(key, size), data)
+        return key
+
+    @staticmethod
+    def variant_key(key: str, size: int) -> str:
+        stem, ext = key.split('.')
+        return f"{stem}-{size}.{ext}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def _write(self, key: str, data: bytes):
+        path = self.path(key)
+        if os.path.exists(path):
+            return
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    @staticmethod
+    def _decode(data_url: str) -> Optional[Tuple[bytes, str]]:
+        """data URL → (바이트, 확장자) (원래 형식의 확장자 유지, 형식이 다르면 None)"""
+        match = _DATA_URL_PATTERN.match(data_url or '')
+        if not match:
+            return None
+        return base64.b64decode(match.group(2)), match.group(1).lower().replace('jpg', 'jpeg')
+
+    def _variants(self, data: bytes, ext: str) -> Dict[int, bytes]:
+        """원본 바이트 → {크기: 바이트} (원본보다 작은 해상도만 추가)"""
+        img = Image.open(io.BytesIO(data))
+        largest = max(img.size)
+        images = {largest: data}
+        if ext not in _THUMBNAIL_FORMATS:
+            return images
+        if ext == 'jpeg' and img.mode != 'RGB':
+            img = img.convert('RGB')
+        for size in self.sizes:
+            if size < largest:
+                buffer = io.BytesIO()
+                img.resize((size, size), Image.LANCZOS).save(buffer, format=_THUMBNAIL_FORMATS[ext])
+                images[size] = buffer.getvalue()
+        return images
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def fetch(self, key: str) -> bool:
+        """로컬 캐시에 없는 키를 버킷에서 받아 둠 (원본이 로컬에 있으면 True)"""
+        if self.exists(key):
+            return True
+        data = self._download(key)
+        if data is None:
+            return False
+        self._write(key, data)
+        for size in self.sizes:
+            variant = self.variant_key(key, size)
+            variant_data = self._download(variant)
+            if variant_data is not None:
+                self._write(variant, variant_data)
+        return True
+
+    def put_data_url(self, data_url: str) -> Optional[str]:
+        """data URL을 로컬 캐시 파일(+ 작은 해상도)로 만들고 키 반환 (형식이 다르면 None)"""
+        decoded = self._decode(data_url)
+        if decoded is None:
+            return None
+        data, ext = decoded
+        key = f"{hashlib.sha256(data).hexdigest()[:32]}.{ext}"
+        if self.exists(key) and all(self.exists(self.variant_key(key, size)) for size in self.sizes
+                                    if ext in _THUMBNAIL_FORMATS):
+            return key
+        return self.put_variants(self._variants(data, ext), ext)
+
+    @lru_cache(maxsize=AVATAR_CACHE_SIZE)
+    def _data_url_key(self, data_url: str) -> Optional[str]:
+        return self.put_data_url(data_url)
+
+    def materialize(self, data_url: str) -> Optional[str]:
+        """data URL의 로컬 파일 키 (재시작 등으로 파일이 사라졌으면 다시 만듦)"""
+        key = self._data_url_key(data_url)
+        if key is not None and not self.exists(key):
+            key = self.put_data_url(data_url)
+        return key
+
+    def url(self, key: str, size: int = None) -> str:
+        """키 → 정적 파일 URL (size가 주어지면 그 크기 이상인 가장 작은 해상도, 없으면 원본)"""
+        if size is not None:
+            for candidate in self.sizes:
+                if candidate >= size:
+                    variant = self.variant_key(key, candidate)
+                    if self.exists(variant):
+                        key = variant
+                    break
+        return f"{self.url_prefix}/{key}?v={key.split('.')[0][:12]}"
+
+    def resolve(self, value: Optional[str], size: int = None) -> str:
+        """profile_image 값 → <img src>에 쓸 URL
+
+        - 아바타 키: 로컬 캐시(없으면 버킷에서 받아 둔 파일)의 URL, 어디에도 없으면 '' (호출 측에서 재생성 요청)
+        - data URL(버킷에 올리기 전 값): 로컬 파일로 만들어 정적 파일 URL 반환 (실패하면 data URL 그대로)
+        - 그 외(외부 URL): 그대로
+        """
+        if is_avatar_key(value):
+            return self.url(value, size) if self.fetch(value) else ''
+        if is_data_url(value):
+            try:
+                key = self.materialize(value)
+            except Exception:
+                key = None
+            return self.url(key, size) if key else value
+        return value or ''
+
+
+avatar_store = AvatarStore()
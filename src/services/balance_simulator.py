@@ -0,0 +1,359 @@
+# balance_simulator.py
+"""
+게임 밸런스 몬테카를로 시뮬레이터
+
+LEVEL_REQUIREMENTS / XP_REWARDS / DIFFICULTY_MULTIPLIER / 승급 도전 XP 기준을 바꿨을 때
+가상 플레이어가 각 레벨에 도달하기까지 몇 문제를 푸는지 분포를 봅니다.
+
+- 플레이어 실력은 구간 혼합 정규분포 (비율, 평균 점수, 표준편차)로 만들고, 매 답변 점수는 실력 주변에서 뽑습니다
+- 빠른 경로: 청크 단위 numpy 배열로 GameEngine의 배열 XP 계산, 승급 도전 XP 기준, 승급 업적 조건을 그대로 적용합니다
+- 엔진 경로(--validate): 같은 난수로 UserManager/GameEngine/XP 원장/업적 엔진을 메모리 DB 위에서 그대로 실행해
+  빠른 경로와 결과가 같은지 확인합니다
+- 청크는 SeedSequence로 시드를 나눠 프로세스 풀에서 병렬 실행하며, 작업자 수와 관계없이 결과가 같습니다
+- 앱의 답변 업적 보상(app.py에서 지급)과 이탈은 모델링하지 않습니다
+
+실행 (프로젝트 루트에서):
+    python -m src.services.balance_simulator --players 100000 --answers 300
+    python -m src.services.balance_simulator --segment 0.5:60:10 --segment 0.5:85:5 --attempt-rate 0.5
+    python -m src.services.balance_simulator --players 200 --answers 150 --validate
+"""
+
+import argparse
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.config import GRADE_PASS_SCORE, LEVEL_REQUIREMENTS, PROMOTION_MAX_SCORE, PROMOTION_PASS_SCORE
+from src.core.database import GameDatabase
+from src.services.achievement_engine import compile_rules
+from src.services.game_engine import GameEngine, UserManager
+from src.services.stats_recompute import levels_for_xp
+from src.services.xp_ledger import SNAPSHOT_FIELDS, get_xp_ledger
+
+MAX_LEVEL = max(requirement[0] for requirement in LEVEL_REQUIREMENTS)
+_LEVEL_INFO = {requirement[0]: {'name': requirement[4], 'icon': requirement[5]} for requirement in LEVEL_REQUIREMENTS}
+
+
+@dataclass
+class SimulationConfig:
+    """시뮬레이션 설정 (프로세스 풀로 넘어가므로 피클 가능한 값만 사용)"""
+    players: int = 10000
+    answers: int = 300                  # 플레이어당 답변 수 (시간 축)
+    # 실력 구간: (비율, 평균 점수, 표준편차)
+    segments: List[Tuple[float, float, float]] = field(
+        default_factory=lambda: [(0.25, 55.0, 10.0), (0.5, 70.0, 10.0), (0.25, 85.0, 6.0)])
+    difficulty_mix: Dict[str, float] = field(
+        default_factory=lambda: {'basic': 0.4, 'intermediate': 0.4, 'advanced': 0.2})
+    answer_score_sd: float = 15.0       # 같은 플레이어의 답변별 점수 편차
+    attempt_rate: float = 0.3           # 자격이 있을 때 한 답변 뒤 승급 시험에 도전할 확률
+    exam_score_sd: float = 25.0         # 승급 시험 점수 편차 (평균은 실력 × 2, 200점 만점)
+    seed: int = 0
+    chunk_size: int = 10000
+
+
+class InMemoryGameDatabase(GameDatabase):
+    """시뮬레이션용 메모리 DB (GameEngine/UserManager/XP 원장/업적 엔진이 쓰는 메서드만 구현)"""
+
+    def __init__(self):
+        self.supabase = None
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.events: Dict[str, List[Dict[str, Any]]] = {}
+        self.achievements: Dict[str, Dict[str, str]] = {}
+        self.promotion_exams: List[Dict[str, Any]] = []
+        self._event_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_user_profile(self, user_id: str, username: str, email: str, profile_image: str = "") -> bool:
+        self.users[user_id] = {
+            'user_id': user_id, 'username': username, 'email': email, 'level': 1,
+            'experience_points': 0, 'total_questions_solved': 0, 'correct_answers': 0,
+            'current_streak': 0, 'best_streak': 0, 'profile_image': profile_image, 'snapshot_event_id': 0
+        }
+        return True
+
+    def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        user = self.users.get(user_id)
+        if user is None:
+            return None
+        level_info = self._get_level_info(user['level'])
+        return dict(user, level_icon=level_info['icon'], level_name=level_info['name'])
+
+    def _get_level_info(self, level: int) -> Dict[str, str]:
+        return _LEVEL_INFO.get(level, {'icon': '🌱', 'name': '초보자'})
+
+    def update_user_profile(self, user_id: str, updates: Dict[str, Any]) -> bool:
+        if user_id not in self.users:
+            return False
+        self.users[user_id].update(updates)
+        return True
+
+    def set_profile_image(self, user_id: str, profile_image: str) -> bool:
+        return self.update_user_profile(user_id, {'profile_image': profile_image})
+
+    def insert_xp_event(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = dict(event, id=next(self._event_ids))
+            self.events.setdefault(event['user_id'], []).append(row)
+        return dict(row)
+
+    def get_xp_snapshot(self, user_id: str) -> Optional[Dict[str, Any]]:
+        user = self.users.get(user_id)
+        return {'user_id': user_id, **{f: user[f] for f in SNAPSHOT_FIELDS}} if user else None
+
+    def get_xp_events(self, user_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        return [dict(e) for e in self.events.get(user_id, ()) if e['id'] > after_id]
+
+    def update_xp_snapshot(self, user_id: str, expected_event_id: int, snapshot: Dict[str, Any]) -> bool:
+        with self._lock:
+            user = self.users.get(user_id)
+            if user is None or user['snapshot_event_id'] != expected_event_id:
+                return False
+            user.update(snapshot)
+            return True
+
+    def process_promotion(self, user_id: str, from_level: int, to_level: int, xp: int,
+                          score: float, time_taken: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            user = self.users.get(user_id)
+            if user is None:
+                return None
+            events = self.events.setdefault(user_id, [])
+            promoted = not any(e['kind'] == 'promotion' and (e.get('level') or 0) >= to_level for e in events)
+            event_id = None
+            if promoted:
+                event_id = next(self._event_ids)
+                events.append({'user_id': user_id, 'kind': 'promotion', 'xp': xp, 'correct': None,
+                               'question_id': None, 'level': to_level, 'id': event_id})
+                self.promotion_exams.append({'user_id': user_id, 'from_level': from_level, 'to_level': to_level,
+                                             'score': score, 'time_taken': time_taken, 'xp_reward': xp,
+                                             'xp_event_id': event_id})
+            return {'promoted': promoted, 'event_id': event_id, 'profile': dict(user),
+                    'events': self.get_xp_events(user_id, user['snapshot_event_id'])}
+
+    def get_failed_question_ids(self, user_id: str) -> List[str]:
+        return []
+
+    def get_unlocked_achievements(self, user_id: str) -> List[Dict[str, Any]]:
+        return [{'achievement_id': a, 'unlocked_at': at} for a, at in self.achievements.get(user_id, {}).items()]
+
+    def unlock_achievements(self, user_id: str, achievement_ids: List[str]) -> Optional[List[Dict[str, Any]]]:
+        unlocked = self.achievements.setdefault(user_id, {})
+        rows = []
+        for achievement_id in achievement_ids:
+            if achievement_id not in unlocked:
+                unlocked[achievement_id] = 'simulated'
+                rows.append({'user_id': user_id, 'achievement_id': achievement_id, 'unlocked_at': 'simulated'})
+        return rows
+
+
+def _skills(rng: np.random.Generator, n: int, config: SimulationConfig) -> Tuple[np.ndarray, np.ndarray]:
+    """플레이어별 (실력 구간, 평균 점수)"""
+    weights = np.array([s[0] for s in config.segments], dtype=float)
+    segment = rng.choice(len(config.segments), n, p=weights / weights.sum())
+    means = np.array([s[1] for s in config.segments])[segment]
+    sds = np.array([s[2] for s in config.segments])[segment]
+    return segment, np.clip(rng.normal(means, sds), 0, 100)
+
+
+def _draws(rng: np.random.Generator, skill: np.ndarray, config: SimulationConfig) -> Dict[str, np.ndarray]:
+    """한 시점의 플레이어별 답변/승급 시험 난수 (두 경로가 같은 순서로 호출해야 결과가 같음)"""
+    n = len(skill)
+    names = np.array(list(config.difficulty_mix), dtype=object)
+    weights = np.array(list(config.difficulty_mix.values()), dtype=float)
+    return {
+        'score': np.clip(np.rint(rng.normal(skill, config.answer_score_sd)), 0, 100),
+        'time_taken': np.rint(rng.lognormal(np.log(60), 0.5, n)),
+        'tokens_used': np.rint(rng.lognormal(np.log(150), 0.6, n)),
+        'difficulty': names[rng.choice(len(names), n, p=weights / weights.sum())],
+        'attempt': rng.random(n) < config.attempt_rate,
+        'exam_score': np.clip(np.rint(rng.normal(skill * 2, config.exam_score_sd)), 0, PROMOTION_MAX_SCORE),
+        'exam_time': np.rint(rng.uniform(120, 480, n))
+    }
+
+
+def simulate_chunk(seed: np.random.SeedSequence, n: int, config: SimulationConfig) -> Dict[str, np.ndarray]:
+    """플레이어 n명 배열 시뮬레이션
+
+    반환 reached[i, L]은 플레이어 i가 레벨 L에 처음 도달한 답변 수 (도달하지 못하면 -1).
+    """
+    rng = np.random.default_rng(seed)
+    segment, skill = _skills(rng, n, config)
+    engine = GameEngine(db=None)
+    required = np.array([0] + [engine.promotion_required_xp(level) for level in range(1, MAX_LEVEL + 1)])
+    rules = compile_rules().get('promotion', [])
+    unlocked = np.zeros((n, len(rules)), dtype=bool)
+
+    xp = np.zeros(n, dtype=np.int64)
+    level = np.ones(n, dtype=np.int64)
+    reached = np.full((n, MAX_LEVEL + 1), -1, dtype=np.int32)
+    reached[:, :2] = 0                      # 열 = 레벨 (0은 미사용, 1은 시작 레벨)
+    attempts = passes = 0
+
+    for step in range(1, config.answers + 1):
+        d = _draws(rng, skill, config)
+        xp += engine.calculate_xp_rewards(d['score'], d['time_taken'], d['tokens_used'], d['difficulty'])
+        level = np.maximum(level, levels_for_xp(xp))
+
+        # process_promotion_result: 승급 보상 이벤트(레벨 +1) → 승급 업적 보상 이벤트
+        attempting = d['attempt'] & (level < MAX_LEVEL) & (xp >= required[level])
+        promoted = np.flatnonzero(attempting & (d['exam_score'] >= PROMOTION_PASS_SCORE))
+        attempts += int(attempting.sum())
+        passes += len(promoted)
+        if len(promoted):
+            new_level = level[promoted] + 1
+            xp[promoted] += engine.calculate_xp_rewards(
+                d['exam_score'][promoted], d['exam_time'][promoted], np.zeros(len(promoted)),
+                np.full(len(promoted), 'hard', dtype=object))
+            level[promoted] = np.maximum(level[promoted], new_level)
+            for r, rule in enumerate(rules):
+                for j, i in enumerate(promoted):
+                    if not unlocked[i, r] and rule.matches({'score': float(d['exam_score'][i]),
+                                                            'new_level': int(new_level[j])}):
+                        unlocked[i, r] = True
+                        xp[i] += rule.xp
+            level = np.maximum(level, levels_for_xp(xp))
+
+        newly = (level[:, None] >= np.arange(MAX_LEVEL + 1)) & (reached < 0)
+        reached[newly] = step
+
+    return {'segment': segment, 'skill': skill, 'xp': xp, 'level': level, 'reached': reached,
+            'attempts': np.array([attempts]), 'passes': np.array([passes])}
+
+
+_worker_db: Optional[InMemoryGameDatabase] = None
+
+
+def simulate_chunk_engine(seed: np.random.SeedSequence, n: int, config: SimulationConfig,
+                          chunk_id: int = 0) -> Dict[str, np.ndarray]:
+    """simulate_chunk와 같은 난수로 UserManager/GameEngine을 메모리 DB 위에서 실제 호출 (검증용, 느림)
+
+    XP 원장/업적 엔진은 프로세스 전역 싱글턴이라 프로세스당 메모리 DB 하나를 공유합니다.
+    """
+    global _worker_db
+    if _worker_db is None:
+        _worker_db = InMemoryGameDatabase()
+    db = _worker_db
+    engine, users, ledger = GameEngine(db), UserManager(db), get_xp_ledger(db)
+
+    rng = np.random.default_rng(seed)
+    segment, skill = _skills(rng, n, config)
+    user_ids = [f"sim-{chunk_id}-{i}" for i in range(n)]
+    for user_id in user_ids:
+        # 아바타 생성 요청이 나가지 않도록 이미지 값을 채워 둠
+        db.create_user_profile(user_id, user_id, f"{user_id}@simulation.local", "simulated")
+
+    reached = np.full((n, MAX_LEVEL + 1), -1, dtype=np.int32)
+    reached[:, :2] = 0                      # 열 = 레벨 (0은 미사용, 1은 시작 레벨)
+    attempts = passes = 0
+    for step in range(1, config.answers + 1):
+        d = _draws(rng, skill, config)
+        for i, user_id in enumerate(user_ids):
+            xp = engine.calculate_xp_reward(d['score'][i], d['time_taken'][i], d['tokens_used'][i], d['difficulty'][i])
+            users.update_user_stats(user_id, bool(d['score'][i] >= GRADE_PASS_SCORE), xp)
+            if not d['attempt'][i]:
+                continue
+            can_promote, info = engine.check_promotion_eligibility(user_id)
+            if can_promote and info['current_level'] < MAX_LEVEL:
+                attempts += 1
+                if d['exam_score'][i] >= PROMOTION_PASS_SCORE:
+                    passes += 1
+                    engine.process_promotion_result(user_id, float(d['exam_score'][i]), int(d['exam_time'][i]))
+        ledger.flush()
+        for i, user_id in enumerate(user_ids):
+            for level in range(2, db.users[user_id]['level'] + 1):
+                if reached[i, level] < 0:
+                    reached[i, level] = step
+
+    return {'segment': segment, 'skill': skill,
+            'xp': np.array([db.users[u]['experience_points'] for u in user_ids], dtype=np.int64),
+            'level': np.array([db.users[u]['level'] for u in user_ids], dtype=np.int64),
+            'reached': reached, 'attempts': np.array([attempts]), 'passes': np.array([passes])}
+
+
+def run_simulation(config: SimulationConfig, workers: int = None, engine: bool = False) -> Dict[str, np.ndarray]:
+    """플레이어를 청크로 나눠 프로세스 풀에서 실행하고 결과를 합침"""
+    sizes = [min(config.chunk_size, config.players - lo) for lo in range(0, config.players, config.chunk_size)]
+    seeds = np.random.SeedSequence(config.seed).spawn(len(sizes))
+    target = simulate_chunk_engine if engine else simulate_chunk
+    args = [(seed, size, config) + ((chunk_id,) if engine else ())
+            for chunk_id, (seed, size) in enumerate(zip(seeds, sizes))]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sizes) == 1:
+        chunks = [target(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+            chunks = list(pool.map(target, *zip(*args)))
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def summarize(result: Dict[str, np.ndarray], config: SimulationConfig) -> List[Dict[str, Any]]:
+    """레벨별 도달률과 도달까지 답변 수 분위수 (전체 + 실력 구간별)"""
+    groups = [('전체', np.ones(len(result['level']), dtype=bool))]
+    groups += [(f"구간{k + 1} (평균 {mean:.0f}점)", result['segment'] == k)
+               for k, (_, mean, _) in enumerate(config.segments)]
+    rows = []
+    for name, mask in groups:
+        for level in range(2, MAX_LEVEL + 1):
+            steps = result['reached'][mask, level]
+            steps = steps[steps >= 0]
+            p10, p50, p90 = np.percentile(steps, [10, 50, 90]) if len(steps) else (np.nan,) * 3
+            rows.append({'group': name, 'level': level, 'players': int(mask.sum()),
+                         'reached': len(steps) / max(int(mask.sum()), 1),
+                         'p10': p10, 'p50': p50, 'p90': p90})
+    return rows
+
+
+def _parse_segment(value: str) -> Tuple[float, float, float]:
+    weight, mean, sd = (float(part) for part in value.split(':'))
+    return weight, mean, sd
+
+
+def main(argv=None):
+    defaults = SimulationConfig()
+    parser = argparse.ArgumentParser(description="게임 밸런스 몬테카를로 시뮬레이터")
+    parser.add_argument("--players", type=int, default=defaults.players)
+    parser.add_argument("--answers", type=int, default=defaults.answers, help="플레이어당 답변 수")
+    parser.add_argument("--segment", action="append", type=_parse_segment, metavar="비율:평균:표준편차",
+                        help="실력 구간 (여러 번 지정 가능)")
+    parser.add_argument("--attempt-rate", type=float, default=defaults.attempt_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size)
+    parser.add_argument("--validate", action="store_true", help="같은 난수로 GameEngine 경로를 실행해 결과 비교 (소규모)")
+    args = parser.parse_args(argv)
+
+    config = SimulationConfig(players=args.players, answers=args.answers, attempt_rate=args.attempt_rate,
+                              seed=args.seed, chunk_size=args.chunk_size)
+    if args.segment:
+        config.segments = args.segment
+
+    start = time.perf_counter()
+    result = run_simulation(config, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"🎲 플레이어 {config.players:,}명 × 답변 {config.answers}개 | {elapsed:.1f}s | "
+          f"승급 도전 {int(result['attempts'].sum()):,}회, 통과 {int(result['passes'].sum()):,}회")
+    print(f"{'구간':<22} {'레벨':>4} {'도달률':>7} {'p10':>6} {'p50':>6} {'p90':>6}  (도달까지 답변 수)")
+    for row in summarize(result, config):
+        print(f"{row['group']:<22} {row['level']:>4} {row['reached']:>7.1%} "
+              f"{row['p10']:>6.0f} {row['p50']:>6.0f} {row['p90']:>6.0f}")
+    levels, counts = np.unique(result['level'], return_counts=True)
+    print("최종 레벨 분포: " + ", ".join(f"L{lv} {c / len(result['level']):.1%}" for lv, c in zip(levels, counts)))
+
+    if args.validate:
+        start = time.perf_counter()
+        expected = run_simulation(config, args.workers, engine=True)
+        mismatches = int(np.sum((expected['xp'] != result['xp']) | (expected['level'] != result['level'])
+                                | np.any(expected['reached'] != result['reached'], axis=1)))
+        print(f"🔎 GameEngine 경로 검증 ({time.perf_counter() - start:.1f}s): 불일치 플레이어 {mismatches}명")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# exam_scoring.py
+"""
+승급 시험 로컬 채점 엔진 (answer_key / weights_map 기반 결정적 채점)
+"""
+
+from typing import Dict, List
+
+from src.core.config import PROMOTION_PASS_SCORE
+
+
+def score_sessions(weights_map: List[Dict[str, float]], sessions: List[Dict]) -> List[float]:
+    """단계별 선택지 가중치 목록 (선택이 없거나 알 수 없는 선택지는 0)"""
+    per_step = []
+    for i, weights in enumerate(weights_map):
+        selected = sessions[i].get('selected_option_id') if i < len(sessions) else None
+        per_step.append(float(weights.get(selected, 0.0)) if selected else 0.0)
+    return per_step
+
+
+def grade_promotion_locally(submission_data: Dict, with_detail: bool = True) -> Dict:
+    """승급 시험 제출 데이터를 LLM 없이 채점
+
+    LLM 응답과 같은 구조({pass_fail, score, detail})를 반환하므로
+    render_promotion_result에서 그대로 표시할 수 있습니다.
+    총점은 LLM 채점과 같은 척도(정량 100 + 정성 100, PROMOTION_MAX_SCORE)로 계산합니다.
+    - 정량(0~100): 선택지 가중치 평균
+    - 정성(0~100): 모범 답안(answer_key)과 같은 선택을 한 단계 비율 (LLM 평가 대신 사용)
+    """
+    problem = submission_data.get('problem', {})
+    answer_key = problem.get('answer_key', [])
+    weights_map = problem.get('weights_map', [])
+    sessions = submission_data.get('sessions', [])
+
+    per_step = score_sessions(weights_map, sessions)
+    steps = len(per_step)
+    aggregate = round(sum(per_step) / steps * 100, 1) if steps else 0.0
+    correct = sum(
+        1 for i, key in enumerate(answer_key)
+        if i < len(sessions) and sessions[i].get('selected_option_id') == key
+    )
+
+    overall = round(correct / steps * 100, 1) if steps else 0.0
+    total = round(aggregate + overall, 1)
+    pass_fail = 'PASS' if total >= PROMOTION_PASS_SCORE else 'FAIL'
+
+    result = {
+        'pass_fail': pass_fail,
+        'score': {
+            'total': total,
+            'quantitative': {
+                'aggregate': aggregate,
+                'per_step': [round(w * 100, 1) for w in per_step],
+                'correct': correct,
+                'steps': steps
+            },
+            'qualitative': {
+                'overall': overall
+            }
+        },
+        'graded_by': 'local'
+    }
+
+    if with_detail:
+        result['detail'] = build_local_detail(submission_data, per_step)
+
+    return result
+
+
+def build_local_detail(submission_data: Dict, per_step: List[float]) -> str:
+    """feedback_map을 이용한 단계별 코멘트 (LLM 없이 생성)"""
+    problem = submission_data.get('problem', {})
+    answer_key = problem.get('answer_key', [])
+    feedback_map = problem.get('feedback_map', [])
+    sessions = submission_data.get('sessions', [])
+
+    lines = []
+    for i, weight in enumerate(per_step):
+        selected = sessions[i].get('selected_option_id') if i < len(sessions) else None
+        mark = '✅' if i < len(answer_key) and selected == answer_key[i] else '❌'
+        line = f"{mark} 단계 {i + 1}: {selected or '-'} 선택 (가중치 {weight:.2f})"
+        feedback = feedback_map[i].get(selected) if i < len(feedback_map) and selected else None
+        if feedback:
+            line += f" - {feedback}"
+        lines.append(line)
+
+    return '\n'.join(lines)
@@ -6,11 +6,26 @@
 import hashlib
 import random
 from typing import Dict, List, Tuple, Optional
+import numpy as np
+import pandas as pd
 import streamlit as st
 
-from src.core.config import XP_REWARDS, PROMOTION_EXAM_CONFIG, DIFFICULTY_MULTIPLIER
+from src.core.config import (
+    XP_REWARDS, PROMOTION_EXAM_CONFIG, DIFFICULTY_MULTIPLIER, LEVEL_REQUIREMENTS,
+    PROMOTION_REQUIRED_XP, GRADE_PASS_SCORE
+)
 from src.core.database import GameDatabase
-from src.services.ai_services import ProfileGenerator, QuestionGenerator
+from src.services.achievement_engine import get_achievement_engine
+from src.services.ai_services import QuestionGenerator
+from src.services.avatar_queue import get_avatar_queue
+from src.services.avatar_store import avatar_store, is_avatar_key, is_data_url
+from src.services.xp_ledger import fold_events, get_xp_ledger
+
+# 레벨별 승급 도전 최소 XP 표 (시작 시 한 번 계산, 최고 레벨까지)
+_PROMOTION_TABLE = {
+    level: PROMOTION_REQUIRED_XP.get(level, level * 100)
+    for level in range(1, max(requirement[0] for requirement in LEVEL_REQUIREMENTS) + 1)
+}
 
 
 class GameEngine:
@@ -22,7 +37,7 @@ class GameEngine:
     
     def calculate_xp_reward(self, score: float, time_taken: int, tokens_used: int, difficulty: str) -> int:
         """경험치 계산"""
-        base_xp = self.xp_rewards["correct_answer"] if score >= 60 else 10
+        base_xp = self.xp_rewards["correct_answer"] if score >= GRADE_PASS_SCORE else 10
         
         # 난이도 보너스
         xp = int(base_xp * DIFFICULTY_MULTIPLIER.get(difficulty, 1.0))
@@ -52,52 +67,70 @@ class GameEngine:
         
         return max(xp, 1)  # 최소 1 XP
     
+    @staticmethod
+    def difficulty_multipliers(difficulties) -> np.ndarray:
+        """난이도 열 → 난이도 배율 배열 (알 수 없는 난이도/None은 1.0)"""
+        codes, uniques = pd.factorize(np.asarray(difficulties, dtype=object))
+        # 고유 난이도만 조회, 마지막 1.0은 결측(None → 코드 -1) 자리
+        table = np.array([DIFFICULTY_MULTIPLIER.get(d, 1.0) for d in uniques] + [1.0])
+        return table[codes]
+    
+    def calculate_xp_rewards(self, scores, times_taken, tokens_used, difficulties) -> np.ndarray:
+        """경험치 일괄 계산 (calculate_xp_reward의 배열 버전, 같은 길이의 열을 받아 int64 배열 반환)
+        
+        단계마다 int()로 절사하는 규칙을 floor로 그대로 따릅니다. 시간/토큰이 NaN이면 보너스 없음.
+        """
+        scores = np.asarray(scores, dtype=float)
+        times_taken = np.asarray(times_taken, dtype=float)
+        tokens_used = np.asarray(tokens_used, dtype=float)
+        
+        xp = np.floor(np.where(scores >= GRADE_PASS_SCORE, self.xp_rewards["correct_answer"], 10)
+                      * self.difficulty_multipliers(difficulties))
+        xp = np.where(times_taken < 30, np.floor(xp * 1.2),
+                      np.where(times_taken < 60, np.floor(xp * 1.1), xp))
+        xp = np.where(tokens_used < 100, np.floor(xp * 1.1), xp)
+        return np.maximum(xp, 1).astype(np.int64)
+    
+    def calculate_simple_xp_rewards(self, is_correct, difficulties) -> np.ndarray:
+        """단순 정답/오답 경험치 일괄 계산 (calculate_simple_xp_reward의 배열 버전)"""
+        xp = np.maximum(np.floor(self.xp_rewards["correct_answer"] * self.difficulty_multipliers(difficulties)), 1)
+        return np.where(np.asarray(is_correct, dtype=bool), xp, 0).astype(np.int64)
+    
     def award_experience(self, user_id: str, xp: int) -> bool:
-        """경험치 지급"""
-        return self.db.add_experience(user_id, xp)
+        """경험치 지급 (보상 이벤트 추가)"""
+        return get_xp_ledger(self.db).append(user_id, xp, 'bonus')
     
-    def check_promotion_eligibility(self, user_id: str) -> Tuple[bool, Dict]:
-        """승급 시험 자격 확인"""
-        # UserManager를 통해 프로필 조회 (테스트 사용자 지원 포함)
-        user_manager = UserManager(self.db)
-        profile = user_manager.get_user_profile(user_id)
+    @staticmethod
+    def promotion_required_xp(level: int) -> int:
+        """현재 레벨에서 승급 시험에 도전하기 위한 최소 XP"""
+        required_xp = _PROMOTION_TABLE.get(level)
+        return required_xp if required_xp is not None else PROMOTION_REQUIRED_XP.get(level, level * 100)
+    
+    def check_promotion_eligibility(self, user_id: str, profile: Dict = None) -> Tuple[bool, Dict]:
+        """승급 시험 자격 확인 (이미 불러온 profile을 넘기면 추가 조회 없이 표 조회만으로 계산)"""
+        if profile is None:
+            # UserManager를 통해 프로필 조회 (테스트 사용자 지원 포함, 원장 오버레이 반영)
+            profile = UserManager(self.db).get_user_profile(user_id)
         
         if not profile:
             return False, {}
         
         current_level = profile.get('level', 1)
         current_xp = profile.get('experience_points', 0)
-        
-        # 다음 레벨 요구사항 확인
-        next_level = current_level + 1
-        
-        # 레벨별 승급 조건
-        if current_level == 1:
-            # 레벨 1 → 2: 최소 50 XP 필요
-            required_xp = 50
-        elif current_level == 2:
-            # 레벨 2 → 3: 최소 150 XP 필요
-            required_xp = 150
-        elif current_level == 3:
-            # 레벨 3 → 4: 최소 300 XP 필요
-            required_xp = 300
-        else:
-            # 레벨 4 이상: 현재 레벨 * 100 XP 필요
-            required_xp = current_level * 100
-        
+        required_xp = self.promotion_required_xp(current_level)
         can_promote = current_xp >= required_xp
-        
-        return can_promote, {
+        info = {
             'current_level': current_level,
             'current_xp': current_xp,
             'required_xp': required_xp,
-            'next_level': next_level,
+            'next_level': current_level + 1,
             'can_promote': can_promote
         }
+        return can_promote, info
     
     def conduct_promotion_exam(self, user_id: str) -> Dict:
         """승급 시험 진행"""
-        profile = self.db.get_user_profile(user_id)
+        profile = get_xp_ledger(self.db).apply_pending(self.db.get_user_profile(user_id))
         if not profile:
             return {'success': False, 'message': '사용자 정보를 찾을 수 없습니다.'}
         
@@ -119,49 +152,55 @@ class GameEngine:
             'next_level': next_level
         }
     
-    def process_promotion_result(self, user_id: str, score: float, time_taken: int) -> Dict:
-        """승급 시험 결과 처리"""
-        profile = self.db.get_user_profile(user_id)
-        if not profile:
-            return {'success': False, 'message': '사용자 정보를 찾을 수 없습니다.'}
+    def process_promotion_result(self, user_id: str, score: float, time_taken: int, next_level: int = None) -> Dict:
+        """승급 시험 결과 처리 (승급 이벤트 + 시험 결과를 process_promotion RPC 한 번으로 기록)
         
-        current_level = profile.get('level', 1)
-        next_level = current_level + 1
+        next_level은 시험 시작 시 정한 목표 레벨이며, 같은 목표 레벨의 승급은 한 번만 적용됩니다.
+        주지 않으면 현재 프로필에서 계산합니다.
+        """
+        ledger = get_xp_ledger(self.db)
+        if next_level is None:
+            profile = ledger.apply_pending(self.db.get_user_profile(user_id))
+            if not profile:
+                return {'success': False, 'message': '사용자 정보를 찾을 수 없습니다.'}
+            next_level = profile.get('level', 1) + 1
         
-        # 승급 시험 통과 조건: pass_fail이 "PASS"이고 score가 100 이상
-        # 이 조건은 이미 promotion_page.py에서 확인되므로 여기서는 항상 통과로 처리
-        if True:  # 승급 시험 통과 조건은 이미 확인됨
-            # 승급 성공 - 실제 레벨 업데이트
-            xp_reward = self.calculate_xp_reward(score, time_taken, 0, 'hard')
-            
-            # 레벨 업데이트
-            level_update_success = self.db.update_user_profile(user_id, {'level': next_level})
-            
-            # 경험치 지급
-            xp_success = self.award_experience(user_id, xp_reward)
-            
-            if level_update_success and xp_success:
-                return {
-                    'success': True,
-                    'promoted': True,
-                    'new_level': next_level,
-                    'xp_reward': xp_reward,
-                    'message': f'축하합니다! 레벨 {next_level}로 승급했습니다!'
-                }
-            else:
-                return {
-                    'success': False,
-                    'promoted': False,
-                    'message': '승급 처리 중 오류가 발생했습니다.'
-                }
-        else:
-            # 승급 실패
+        # 승급 시험 통과 조건(pass_fail이 "PASS"이고 score가 100 이상)은 이미 promotion_page.py에서 확인됨
+        xp_reward = self.calculate_xp_reward(score, time_taken, 0, 'hard')
+        result = self.db.process_promotion(user_id, next_level - 1, next_level, xp_reward, score, time_taken)
+        if result is None:
+            return {
+                'success': False,
+                'promoted': False,
+                'message': '승급 처리 중 오류가 발생했습니다.'
+            }
+        if not result['promoted']:
             return {
-                'success': True,
+                'success': False,
                 'promoted': False,
-                'current_level': current_level,
-                'message': f'아쉽게도 승급에 실패했습니다. {exam_config["passing_score"]}% 이상이 필요합니다.'
+                'message': f'이미 레벨 {next_level} 승급이 처리되었습니다.'
             }
+        
+        # 새 승급 이벤트를 원장 오버레이에 등록하고, 반환된 스냅샷 + 미압축 이벤트로 갱신된 프로필 구성
+        ledger.record(user_id, {'id': result['event_id'], 'xp': xp_reward, 'correct': None, 'level': next_level})
+        profile = dict(result['profile'], **fold_events(result['profile'], result['events']))
+        
+        # 승급 업적 평가 (보상 XP는 승급 보상에 합산)
+        unlocked = get_achievement_engine(self.db).on_promotion(user_id, score, next_level)
+        achievement_xp = sum(achievement['xp'] for achievement in unlocked)
+        if achievement_xp > 0 and self.award_experience(user_id, achievement_xp):
+            xp_reward += achievement_xp
+            profile = ledger.apply_pending(profile)
+        
+        return {
+            'success': True,
+            'promoted': True,
+            'new_level': next_level,
+            'xp_reward': xp_reward,
+            'profile': profile,
+            'achievements_unlocked': unlocked,
+            'message': f'축하합니다! 레벨 {next_level}로 승급했습니다!'
+        }
 
 
 class UserManager:
@@ -169,20 +208,17 @@ class UserManager:
     
     def __init__(self, db: GameDatabase):
         self.db = db
-        self.profile_gen = ProfileGenerator()
     
     def create_user(self, username: str, email: str) -> Optional[str]:
         """새 사용자 생성"""
         try:
             user_id = hashlib.md5(username.encode()).hexdigest()[:10]
             
-            # 프로필 이미지 생성
-            profile_image = self.profile_gen.generate_profile_image(username, 1)
-            
-            # Supabase DB에 사용자 생성
-            success = self.db.create_user_profile(user_id, username, email, profile_image)
+            # Supabase DB에 사용자 생성 (아바타는 비워 두고 백그라운드에서 생성 후 반영)
+            success = self.db.create_user_profile(user_id, username, email, "")
             
             if success:
+                get_avatar_queue(self.db).request(user_id, username, 1)
                 return user_id
             else:
                 st.error("사용자 생성 실패")
@@ -199,10 +235,20 @@ class UserManager:
             if user_id == "test_user_001":
                 return self._get_test_user_profile()
             
-            profile = self.db.get_user_profile(user_id)
+            profile = get_xp_ledger(self.db).apply_pending(self.db.get_user_profile(user_id))
             if not profile:
                 return None
             
+            # data URL로 저장된 아바타는 버킷에 올리고 키만 남김 (업로드에 실패하면 그대로 두고 다음 조회 때 재시도)
+            # 아바타가 없거나 키의 파일이 버킷/로컬 어디에도 없으면 백그라운드 재생성 요청 (이번 표시는 이미지 없이 진행)
+            profile_image = profile.get('profile_image')
+            if is_data_url(profile_image):
+                key = avatar_store.migrate(profile_image)
+                if key and self.db.set_profile_image(user_id, key):
+                    profile['profile_image'] = key
+            elif not profile_image or (is_avatar_key(profile_image) and not avatar_store.fetch(profile_image)):
+                get_avatar_queue(self.db).request(user_id, profile.get('username', ''), profile.get('level', 1))
+            
             # UI에서 필요한 필드들 추가
             level = profile.get('level', 1)
             current_xp = profile.get('experience_points', 0)
@@ -216,7 +262,7 @@ class UserManager:
                 'next_level_xp': level_info['next_requirement'],
                 'accuracy': self._calculate_accuracy(profile),
                 'total_questions': profile.get('total_questions_solved', 0),
-                'achievements': self.get_user_achievements(user_id)
+                'achievements': self.get_user_achievements(user_id, profile)
             })
             
             return profile
@@ -341,76 +387,16 @@ class UserManager:
         
         return (correct_answers / total_questions) * 100
     
-    def get_user_achievements(self, user_id: str) -> List[Dict]:
-        """사용자 업적 조회"""
+    def get_user_achievements(self, user_id: str, profile: Dict = None) -> List[Dict]:
+        """사용자 업적 조회 (업적 엔진 캐시, profile을 넘기면 재조회하지 않음)"""
         try:
-            profile = self.db.get_user_profile(user_id)
-            if not profile:
-                return []
-            
-            level = profile.get('level', 1)
-            total_questions = profile.get('total_questions_solved', 0)
-            correct_answers = profile.get('correct_answers', 0)
-            best_streak = profile.get('best_streak', 0)
-            
-            unlocked_achievements = []
-            
-            # 업적 확인 로직
-            if total_questions >= 1:
-                unlocked_achievements.append({
-                    'achievement_id': 'first_question',
-                    'name': '첫 번째 문제',
-                    'description': '첫 번째 문제를 해결했습니다!',
-                    'icon': '🎯'
-                })
-            
-            if level >= 5:
-                unlocked_achievements.append({
-                    'achievement_id': 'level_5',
-                    'name': '레벨 5 달성',
-                    'description': '레벨 5에 도달했습니다!',
-                    'icon': '⭐'
-                })
-            
-            if level >= 10:
-                unlocked_achievements.append({
-                    'achievement_id': 'level_10',
-                    'name': '레벨 10 달성',
-                    'description': '레벨 10에 도달했습니다!',
-                    'icon': '🌟'
-                })
-            
-            if best_streak >= 5:
-                unlocked_achievements.append({
-                    'achievement_id': 'streak_5',
-                    'name': '5연속 정답',
-                    'description': '5문제 연속으로 정답을 맞췄습니다!',
-                    'icon': '🔥'
-                })
-            
-            if best_streak >= 10:
-                unlocked_achievements.append({
-                    'achievement_id': 'streak_10',
-                    'name': '10연속 정답',
-                    'description': '10문제 연속으로 정답을 맞췄습니다!',
-                    'icon': '🚀'
-                })
-            
-            if total_questions > 0 and (correct_answers / total_questions) >= 0.8:
-                unlocked_achievements.append({
-                    'achievement_id': 'accuracy_80',
-                    'name': '80% 정확도',
-                    'description': '80% 이상의 정확도를 달성했습니다!',
-                    'icon': '🎯'
-                })
-            
-            return unlocked_achievements
+            return get_achievement_engine(self.db).get(user_id, profile)
         except Exception as e:
             st.error(f"업적 조회 중 오류: {str(e)}")
             return []
     
-    def update_user_stats(self, user_id: str, is_correct: bool, xp_earned: int = 0) -> bool:
-        """사용자 통계 업데이트"""
+    def update_user_stats(self, user_id: str, is_correct: bool, xp_earned: int = 0, question_id: str = None) -> bool:
+        """사용자 통계 업데이트 (답변 1건 = xp_events 1행 추가, 누적 통계는 스냅샷 압축 시 반영)"""
         try:
             st.write(f"🔍 통계 업데이트 시작: user_id={user_id}, is_correct={is_correct}, xp_earned={xp_earned}")
             
@@ -418,16 +404,9 @@ class UserManager:
             if user_id == "test_user_001":
                 return self._update_test_user_stats(is_correct, xp_earned)
             
-            # 답변 기록
-            success = self.db.record_answer(user_id, is_correct)
-            st.write(f"🔍 답변 기록 결과: {success}")
-            
-            # 경험치 지급
-            if xp_earned > 0:
-                xp_success = self.db.add_experience(user_id, xp_earned)
-                st.write(f"🔍 경험치 지급 결과: {xp_success}")
-                success = success and xp_success
-            
+            success = get_xp_ledger(self.db).append(
+                user_id, xp_earned, 'answer', correct=is_correct, question_id=question_id
+            )
             st.write(f"🔍 통계 업데이트 최종 결과: {success}")
             return success
         except Exception as e:
@@ -0,0 +1,55 @@
+# grading_cache.py
+"""
+채점 결과 캐시 (프롬프트 버전 + 제출 내용 기준)
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.core.config import GRADING_CACHE_SIZE, GRADING_CACHE_TTL
+
+
+def grading_cache_key(prompt_key: str, payload: Dict) -> str:
+    """'name@version'과 제출 데이터로 캐시 키 생성
+
+    프롬프트 버전이 키에 포함되므로 프롬프트가 바뀌면 이전 결과는 재사용되지 않습니다.
+    """
+    body = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha256(body.encode('utf-8')).hexdigest()
+    return f"{prompt_key}:{digest}"
+
+
+class GradingCache:
+    """TTL이 있는 LRU 채점 결과 캐시 (스레드 안전)"""
+
+    def __init__(self, max_size: int = GRADING_CACHE_SIZE, ttl: int = GRADING_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return dict(value)
+
+    def set(self, key: str, value: Dict):
+        with self._lock:
+            self._items[key] = (time.monotonic(), dict(value))
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+grading_cache = GradingCache()
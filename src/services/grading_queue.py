@@ -0,0 +1,108 @@
+# grading_queue.py
+"""
+채점 요청 큐 (마이크로 배칭)
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from src.core.config import GRADING_BATCH_SIZE, GRADING_BATCH_WINDOW_MS
+from src.services.ai_services import AutoGrader
+
+
+class GradingQueue:
+    """채점 요청을 모아 AutoGrader.grade_batch로 한 번에 처리하는 큐
+
+    첫 요청이 들어오면 최대 window_ms 동안 추가 요청을 기다려 배치를 채웁니다.
+    부하가 낮을 때는 요청 1건이 그대로 grade_answer로 처리됩니다.
+    """
+    
+    def __init__(self, grader: AutoGrader = None, max_batch_size: int = GRADING_BATCH_SIZE,
+                 window_ms: int = GRADING_BATCH_WINDOW_MS, max_workers: int = 4):
+        self.grader = grader or AutoGrader()
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0, window_ms) / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="grading-batch")
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def submit(self, question: Dict, answer: str, level: str) -> Future:
+        """채점 요청 등록 (결과는 Future로 반환)"""
+        future: Future = Future()
+        pre_graded = self.grader.pre_grading.run(question, answer, level)
+        if pre_graded is not None:
+            # 사전 채점 필터로 결정된 답변은 배치 윈도우를 기다리지 않음
+            future.set_result(pre_graded)
+            return future
+        # 이후 채점 경로는 필터를 다시 돌리지 않음 (pre_checked)
+        if self.grader.simulation:
+            # 시뮬레이션 채점은 네트워크 호출이 없으므로 배치 윈도우를 기다리지 않음
+            future.set_result(self.grader.grade_answer(question, answer, level, pre_checked=True))
+            return future
+        self._ensure_worker()
+        self._queue.put(({'question': question, 'answer': answer, 'level': level}, future))
+        return future
+    
+    def grade(self, question: Dict, answer: str, level: str, timeout: Optional[float] = None) -> Dict:
+        """채점 요청 후 결과를 기다려 반환"""
+        return self.submit(question, answer, level).result(timeout=timeout)
+    
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._collect, name="grading-queue", daemon=True)
+                self._worker.start()
+    
+    def _collect(self):
+        """배치 윈도우 동안 요청을 모아 실행기로 넘김"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            self._executor.submit(self._dispatch, batch)
+    
+    def _dispatch(self, batch: List):
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+        
+        try:
+            if len(items) == 1:
+                item = items[0]
+                results = [self.grader.grade_answer(item['question'], item['answer'], item['level'],
+                                                    pre_checked=True)]
+            else:
+                results = self.grader.grade_batch(items, pre_checked=True)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+
+_grading_queue: Optional[GradingQueue] = None
+_grading_queue_lock = threading.Lock()
+
+
+def get_grading_queue() -> GradingQueue:
+    """프로세스 전역 채점 큐 (모든 세션이 공유해야 배치가 채워짐)"""
+    global _grading_queue
+    with _grading_queue_lock:
+        if _grading_queue is None:
+            _grading_queue = GradingQueue()
+    return _grading_queue
@@ -0,0 +1,220 @@
+# grading_router.py
+"""
+채점 모델 라우터 (저비용 모델 우선 → 필요 시 상위 모델로 에스컬레이션)
+"""
+
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.core.config import (
+    GRADE_PASS_SCORE, GRADING_ROUTES, GRADING_FAST_LEVELS, GRADING_ESCALATION_MARGIN,
+    GRADING_SLO_WINDOW, GRADING_SLO_MIN_SAMPLES, GRADING_FAST_PROBE_RATE,
+    LLM_CALL_DEADLINE, LLM_HEDGING, LLM_HEDGE_MIN_SAMPLES
+)
+from src.models.grading import ResponseSchema, SchemaError
+from src.services.llm_client import (
+    CancelToken, LLMCancelledError, LLMTimeoutError, get_openai_client, run_with_deadline,
+    stream_chat_completion, usage_dict
+)
+from src.services.metrics import COST_BUCKETS, LATENCY_BUCKETS, Histogram, SlidingWindow
+from src.services.usage_ledger import usage_ledger
+
+
+def is_confident_grade(result: Optional[Dict]) -> bool:
+    """채점 결과가 확정적인지 판단 (파싱 실패 또는 통과 기준 근처 점수는 불확실)"""
+    if not isinstance(result, dict):
+        return False
+    score = result.get('total_score')
+    if not isinstance(score, (int, float)):
+        return False
+    return abs(score - GRADE_PASS_SCORE) >= GRADING_ESCALATION_MARGIN
+
+
+class GradingRouter:
+    """난이도와 응답 신뢰도에 따라 채점 모델을 선택하는 라우터
+
+    - GRADING_FAST_LEVELS 기준은 fast 모델을 먼저 시도하고, 그 외는 strong 모델로 바로 보냅니다
+    - fast 결과가 불확실하면 strong 모델로 재채점합니다
+    - fast 호출은 지연 SLO를, strong 호출은 LLM_CALL_DEADLINE을 마감 시간으로 사용합니다
+    - 최근 GRADING_SLO_WINDOW초 동안의 p95가 SLO를 넘는 fast 경로는 건너뛰되,
+      GRADING_FAST_PROBE_RATE 비율은 계속 fast로 보내 회복 여부를 관측합니다
+    - LLM_HEDGING이 켜져 있으면 경로의 최근 p95 지연이 지나도 응답이 없을 때 두 번째 요청을 보냅니다
+    - 경로별 지연시간과 비용을 히스토그램으로 기록합니다 (SLO/헤지 판단은 최근 구간의 원시 관측값 사용)
+    """
+
+    def __init__(self, routes: Dict[str, Dict] = None):
+        self.routes = routes or GRADING_ROUTES
+        self.latency = {name: Histogram(LATENCY_BUCKETS) for name in self.routes}
+        self.cost = {name: Histogram(COST_BUCKETS) for name in self.routes}
+        self.recent = {name: SlidingWindow(GRADING_SLO_WINDOW) for name in self.routes}
+        self.escalations = 0
+        self._lock = threading.Lock()
+
+    def plan(self, level: Optional[str]) -> List[str]:
+        """시도할 경로 순서"""
+        if level in GRADING_FAST_LEVELS and 'fast' in self.routes:
+            if not self._over_slo('fast') or random.random() < GRADING_FAST_PROBE_RATE:
+                return ['fast', 'strong']
+        return ['strong']
+
+    def grade(
+        self,
+        messages: List[Dict[str, str]],
+        level: Optional[str],
+        on_partial: Optional[Callable[[Dict], None]] = None,
+        client=None,
+        is_confident: Callable[[Optional[Dict]], bool] = is_confident_grade,
+        cancel_token: Optional[CancelToken] = None,
+        heartbeat: Optional[Callable[[float], None]] = None,
+        purpose: str = "grading",
+        prompt_version: Optional[str] = None,
+        schema: Optional[ResponseSchema] = None
+    ) -> Tuple[str, Optional[Dict], int, str]:
+        """라우팅 계획에 따라 호출
+
+        경로별 호출은 모두 usage_ledger에 purpose/prompt_version과 함께 기록됩니다.
+        schema가 주어지면 구조화 출력(response_format)을 요청하고, 응답은 수신 시 한 번
+        schema.normalize로 검증/정규화합니다. 스키마에 맞지 않는 응답은 파싱 실패(None)로 취급합니다.
+
+        Returns:
+            (응답 텍스트, 파싱된 JSON 또는 None, 사용 토큰 수, 사용 모델)
+        """
+        client = client or get_openai_client()
+        plan = self.plan(level)
+
+        for i, name in enumerate(plan):
+            route = self.routes[name]
+            is_last = i == len(plan) - 1
+            deadline = LLM_CALL_DEADLINE if is_last else route['latency_slo']
+            start = time.monotonic()
+
+            def attempt(token: CancelToken, emit: Callable[[Dict], None], model=route['model'], timeout=deadline):
+                return self._call(client, model, messages, emit if on_partial else None, timeout, token, schema)
+
+            def log(outcome: str, usage: Optional[Dict[str, int]] = None):
+                usage = usage or {}
+                self._record(name, latency, usage.get('total_tokens', 0))
+                usage_ledger.record(
+                    purpose, outcome,
+                    model=route['model'],
+                    route=name,
+                    prompt_version=prompt_version,
+                    prompt_tokens=usage.get('prompt_tokens', 0),
+                    completion_tokens=usage.get('completion_tokens', 0),
+                    latency=latency,
+                    cost=usage.get('total_tokens', 0) / 1000 * route['cost_per_1k_tokens']
+                )
+
+            try:
+                content, parsed, usage = run_with_deadline(
+                    attempt,
+                    deadline=deadline,
+                    cancel_token=cancel_token,
+                    hedge_after=self._hedge_delay(name),
+                    on_partial=on_partial,
+                    heartbeat=heartbeat
+                )
+            except LLMCancelledError:
+                latency = time.monotonic() - start
+                usage_ledger.record(purpose, "cancelled", model=route['model'], route=name,
+                                    prompt_version=prompt_version, latency=latency)
+                raise
+            except Exception as e:
+                latency = time.monotonic() - start
+                log("timeout" if isinstance(e, LLMTimeoutError) else "error")
+                if is_last:
+                    raise
+                self._escalated()
+                continue
+
+            latency = time.monotonic() - start
+            if is_last or is_confident(parsed):
+                log("ok" if parsed is not None else "invalid", usage)
+                return content, parsed, usage['total_tokens'], route['model']
+            log("escalated" if parsed is not None else "invalid", usage)
+            self._escalated()
+
+    def _call(self, client, model: str, messages: List[Dict[str, str]],
+              on_partial: Optional[Callable[[Dict], None]], timeout: Optional[float],
+              cancel_token: Optional[CancelToken] = None,
+              schema: Optional[ResponseSchema] = None) -> Tuple[str, Optional[Dict], Dict[str, int]]:
+        response_format = schema.response_format if schema is not None else None
+
+        if on_partial is not None:
+            content, parser, usage = stream_chat_completion(
+                messages, on_partial=on_partial, model=model, client=client,
+                timeout=timeout, cancel_token=cancel_token, response_format=response_format
+            )
+            return content, self._validate(parser.result(), schema), usage
+
+        options = {"timeout": timeout} if timeout else {}
+        if response_format:
+            options["response_format"] = response_format
+        response = client.chat.completions.create(model=model, messages=messages, **options)
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        content = response.choices[0].message.content
+        try:
+            parsed = json.loads(content)
+        except (TypeError, ValueError):
+            parsed = None
+        return content, self._validate(parsed, schema), usage_dict(response.usage)
+
+    @staticmethod
+    def _validate(parsed: Optional[Dict], schema: Optional[ResponseSchema]) -> Optional[Dict]:
+        """스키마 검증/정규화 (실패 시 None)"""
+        if parsed is None or schema is None:
+            return parsed
+        try:
+            return schema.normalize(parsed)
+        except SchemaError:
+            return None
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        """헤지 요청을 보낼 대기 시간 (경로의 최근 p95, 관측이 부족하면 헤지 안 함)"""
+        if not LLM_HEDGING:
+            return None
+        with self._lock:
+            if self.recent[name].count < LLM_HEDGE_MIN_SAMPLES:
+                return None
+            return self.recent[name].percentile(0.95)
+
+    def _over_slo(self, name: str) -> bool:
+        """최근 구간의 p95가 경로 SLO를 넘는지 (관측이 부족하면 False)"""
+        with self._lock:
+            if self.recent[name].count < GRADING_SLO_MIN_SAMPLES:
+                return False
+            return self.recent[name].percentile(0.95) > self.routes[name]['latency_slo']
+
+    def _record(self, name: str, latency: float, tokens: int):
+        with self._lock:
+            self.latency[name].observe(latency)
+            self.recent[name].observe(latency)
+            self.cost[name].observe(tokens / 1000 * self.routes[name]['cost_per_1k_tokens'])
+
+    def _escalated(self):
+        with self._lock:
+            self.escalations += 1
+
+    def stats(self) -> Dict:
+        """경로별 지연/비용 히스토그램 요약"""
+        with self._lock:
+            return {
+                'routes': {
+                    name: {
+                        'model': self.routes[name]['model'],
+                        'latency': self.latency[name].to_dict(),
+                        'cost': self.cost[name].to_dict(),
+                        'recent_p95': self.recent[name].percentile(0.95)
+                    }
+                    for name in self.routes
+                },
+                'escalations': self.escalations
+            }
+
+
+# 모든 세션이 공유하는 라우터 (히스토그램 누적)
+grading_router = GradingRouter()
@@ -0,0 +1,169 @@
+# json_stream.py
+"""
+스트리밍 응답용 점진적(incremental) JSON 파서
+"""
+
+import json
+import re
+from typing import Any, Dict, Optional
+
+
+# 잘린 이스케이프 시퀀스 (예: "\\", "\\u00") 제거용
+_TRAILING_ESCAPE = re.compile(r'\\(u[0-9a-fA-F]{0,3})?$')
+
+
+class IncrementalJSONParser:
+    """토큰 단위로 도착하는 JSON 객체를 누적하며 최상위 필드를 즉시 추출
+
+    - 완성된 최상위 값은 `fields`에 바로 채워집니다 (예: pass_fail, score)
+    - 작성 중인 최상위 문자열 값은 `partial()`로 일부를 읽을 수 있습니다 (예: detail)
+    - 첫 '{' 이전의 텍스트(```json 코드펜스 등)는 무시합니다
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._expect = 'key'
+        self._token_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """텍스트 조각 추가 후 현재까지의 스냅샷 반환"""
+        if chunk:
+            self.buffer += chunk
+            self._scan()
+        return self.snapshot()
+
+    def _store(self, end: int):
+        """현재 키의 값을 buffer[token_start:end] 구간으로 확정"""
+        try:
+            self.fields[self._key] = json.loads(self.buffer[self._token_start:end])
+        except (ValueError, TypeError):
+            pass
+        self._token_start = None
+
+    def _scan(self):
+        buf = self.buffer
+        i = self._pos
+        n = len(buf)
+
+        while i < n and not self.done:
+            c = buf[i]
+
+            if self._start is None:
+                if c == '{':
+                    self._start = i
+                    self._depth = 1
+                    self._expect = 'key'
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect == 'key':
+                            try:
+                                self._key = json.loads(buf[self._token_start:i + 1])
+                            except ValueError:
+                                self._key = None
+                            self._token_start = None
+                            self._expect = 'colon'
+                        elif self._expect == 'value':
+                            self._store(i + 1)
+                            self._expect = 'comma'
+                i += 1
+                continue
+
+            if self._depth > 1:
+                if c == '"':
+                    self._in_string = True
+                elif c in '{[':
+                    self._depth += 1
+                elif c in '}]':
+                    self._depth -= 1
+                    if self._depth == 1:
+                        self._store(i + 1)
+                        self._expect = 'comma'
+                i += 1
+                continue
+
+            # 최상위 객체 내부 (depth == 1)
+            if self._expect == 'scalar' and (c in ',}' or c.isspace()):
+                self._store(i)
+                self._expect = 'comma'
+
+            if self._expect == 'key':
+                if c == '"':
+                    self._in_string = True
+                    self._token_start = i
+                elif c == '}':
+                    self._finish(i)
+            elif self._expect == 'colon':
+                if c == ':':
+                    self._expect = 'value'
+            elif self._expect == 'value':
+                if c == '"':
+                    self._in_string = True
+                    self._token_start = i
+                elif c in '{[':
+                    self._depth += 1
+                    self._token_start = i
+                elif not c.isspace():
+                    self._token_start = i
+                    self._expect = 'scalar'
+            elif self._expect == 'comma':
+                if c == ',':
+                    self._expect = 'key'
+                elif c == '}':
+                    self._finish(i)
+            i += 1
+
+        self._pos = i
+
+    def _finish(self, end: int):
+        self._depth = 0
+        self._end = end + 1
+        self.done = True
+
+    def partial(self, key: str) -> Optional[Any]:
+        """완성된 값 또는 작성 중인 최상위 문자열 값의 현재까지 내용"""
+        if key in self.fields:
+            return self.fields[key]
+        if (self._in_string and self._depth == 1 and self._expect == 'value'
+                and self._key == key and self._token_start is not None):
+            raw = _TRAILING_ESCAPE.sub('', self.buffer[self._token_start + 1:])
+            try:
+                return json.loads(f'"{raw}"')
+            except ValueError:
+                return raw
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """완성된 필드 + 작성 중인 문자열 필드"""
+        result = dict(self.fields)
+        if self._key is not None and self._key not in result:
+            value = self.partial(self._key)
+            if value is not None:
+                result[self._key] = value
+        return result
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """완성된 JSON 객체 (완료되지 않았거나 파싱 실패 시 None)"""
+        if not self.done:
+            return None
+        try:
+            return json.loads(self.buffer[self._start:self._end])
+        except ValueError:
+            return dict(self.fields)
@@ -0,0 +1,213 @@
+# llm_client.py
+"""
+OpenAI 호출 공통 유틸리티 (클라이언트 재사용, 스트리밍, 타임아웃/취소/헤지 요청)
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.config import OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODEL, LLM_CALL_DEADLINE
+from src.services.json_stream import IncrementalJSONParser
+
+_client = None
+_client_lock = threading.Lock()
+
+# LLM 호출 전용 실행기 (Streamlit 스크립트 스레드가 응답 대기에 묶이지 않도록 분리)
+_llm_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-call")
+
+
+class LLMTimeoutError(Exception):
+    """LLM 호출이 마감 시간을 넘김"""
+
+
+class LLMCancelledError(Exception):
+    """LLM 호출이 취소됨 (사용자 이동/재실행 등)"""
+
+
+class CancelToken:
+    """협력적 취소 토큰 (부모가 취소되면 자식도 취소된 것으로 간주)"""
+
+    def __init__(self, parent: 'CancelToken' = None):
+        self._event = threading.Event()
+        self._parent = parent
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or (self._parent is not None and self._parent.cancelled)
+
+    def child(self) -> 'CancelToken':
+        return CancelToken(parent=self)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise LLMCancelledError("LLM 호출이 취소되었습니다.")
+
+
+def get_openai_client():
+    """OpenAI 클라이언트 반환 (프로세스 단위로 1회 생성)"""
+    global _client
+    with _client_lock:
+        if _client is None and OPENAI_API_KEY:
+            from openai import OpenAI
+            options = {"base_url": OPENAI_BASE_URL} if OPENAI_BASE_URL else {}
+            _client = OpenAI(api_key=OPENAI_API_KEY, timeout=LLM_CALL_DEADLINE, max_retries=1, **options)
+    return _client
+
+
+def usage_dict(usage) -> Dict[str, int]:
+    """OpenAI usage 객체를 토큰 수 딕셔너리로 변환"""
+    return {
+        "prompt_tokens": getattr(usage, 'prompt_tokens', 0) or 0,
+        "completion_tokens": getattr(usage, 'completion_tokens', 0) or 0,
+        "total_tokens": getattr(usage, 'total_tokens', 0) or 0
+    }
+
+
+def run_with_deadline(
+    attempt: Callable[[CancelToken, Callable[[Any], None]], Any],
+    deadline: float = LLM_CALL_DEADLINE,
+    cancel_token: Optional[CancelToken] = None,
+    hedge_after: Optional[float] = None,
+    on_partial: Optional[Callable[[Any], None]] = None,
+    heartbeat: Optional[Callable[[float], None]] = None,
+    poll_interval: float = 0.1
+) -> Any:
+    """LLM 호출을 별도 스레드에서 실행하고 마감/취소/헤지를 관리
+
+    Args:
+        attempt: attempt(token, emit) 형태의 호출 함수. token이 취소되면 가능한 빨리 중단하고,
+            부분 결과는 emit(snapshot)으로 전달합니다.
+        deadline: 전체 마감 시간(초). 넘기면 LLMTimeoutError
+        cancel_token: 외부 취소 토큰. 취소되면 LLMCancelledError
+        hedge_after: 이 시간(초)이 지나도 응답이 없으면 두 번째 시도를 보내고, 먼저 끝난 결과를 사용
+        on_partial: 부분 결과 콜백. 호출한 스레드(예: Streamlit 스크립트 스레드)에서 실행됩니다
+        heartbeat: 대기 중 주기적으로 경과 시간(초)과 함께 호출 (UI 갱신 등)
+    """
+    token = cancel_token or CancelToken()
+    partials: "queue.Queue" = queue.Queue()
+    attempts: Dict[Future, CancelToken] = {}
+    leader: List[Optional[int]] = [None]
+    last_error: Optional[BaseException] = None
+    start = time.monotonic()
+
+    def launch():
+        index = len(attempts)
+        child = token.child()
+
+        def emit(snapshot):
+            partials.put((index, snapshot))
+
+        attempts[_llm_executor.submit(attempt, child, emit)] = child
+
+    def drain():
+        while True:
+            try:
+                index, snapshot = partials.get_nowait()
+            except queue.Empty:
+                return
+            # 헤지 시 먼저 출력을 내기 시작한 시도의 부분 결과만 전달
+            if leader[0] is None:
+                leader[0] = index
+            if index == leader[0] and on_partial is not None:
+                on_partial(snapshot)
+
+    launch()
+    pending = set(attempts)
+    try:
+        while True:
+            drain()
+            token.raise_if_cancelled()
+
+            elapsed = time.monotonic() - start
+            if elapsed >= deadline:
+                raise LLMTimeoutError(f"LLM 응답이 {deadline:g}초 안에 도착하지 않았습니다.")
+
+            if hedge_after is not None and len(attempts) == 1 and elapsed >= hedge_after:
+                launch()
+                pending = {f for f in attempts if not f.done()}
+
+            if heartbeat is not None:
+                heartbeat(elapsed)
+
+            done, pending = wait(pending, timeout=min(poll_interval, deadline - elapsed),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    drain()
+                    return future.result()
+                last_error = error
+
+            if not pending:
+                # 모든 시도가 실패: 헤지가 가능하면 즉시 재시도, 아니면 마지막 오류 전달
+                if hedge_after is not None and len(attempts) == 1:
+                    launch()
+                    pending = {f for f in attempts if not f.done()}
+                else:
+                    raise last_error
+    finally:
+        # 끝났거나(승자 외) 중단된 시도는 모두 취소
+        for child in attempts.values():
+            child.cancel()
+
+
+def stream_chat_completion(
+    messages: List[Dict[str, str]],
+    on_partial: Optional[Callable[[Dict], None]] = None,
+    model: str = OPENAI_MODEL,
+    client=None,
+    timeout: Optional[float] = None,
+    cancel_token: Optional[CancelToken] = None,
+    response_format: Optional[Dict] = None
+) -> Tuple[str, IncrementalJSONParser, Dict[str, int]]:
+    """스트리밍으로 채팅 완성 호출
+
+    도착하는 토큰을 IncrementalJSONParser에 흘려 넣고, 파싱된 필드가 바뀔 때마다
+    `on_partial(snapshot)`을 호출합니다. cancel_token이 취소되면 스트림을 닫고 중단합니다.
+
+    Returns:
+        (전체 응답 텍스트, 파서, 토큰 사용량 {prompt_tokens, completion_tokens, total_tokens})
+    """
+    client = client or get_openai_client()
+    parser = IncrementalJSONParser()
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+    options = {"timeout": timeout} if timeout else {}
+    if response_format:
+        options["response_format"] = response_format
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        stream=True,
+        stream_options={"include_usage": True},
+        **options
+    )
+
+    last_snapshot = None
+    try:
+        for chunk in stream:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if getattr(chunk, 'usage', None):
+                usage = usage_dict(chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            snapshot = parser.feed(delta)
+            if on_partial and snapshot and snapshot != last_snapshot:
+                on_partial(snapshot)
+                last_snapshot = snapshot
+    finally:
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+
+    return parser.buffer, parser, usage
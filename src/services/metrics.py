@@ -0,0 +1,84 @@
+# metrics.py
+"""
+지연시간/비용 집계용 히스토그램과 최근 관측 구간
+"""
+
+import bisect
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# 히스토그램 버킷 경계
+LATENCY_BUCKETS = [0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120]          # 초
+COST_BUCKETS = [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1]       # USD
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (분위수는 버킷 상한으로 근사)"""
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else float('inf')
+        return float('inf')
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'buckets': dict(zip([str(b) for b in self.bounds] + ['inf'], self.counts))
+        }
+
+
+class SlidingWindow:
+    """최근 관측값 구간 (최대 max_age초, 최대 max_samples개)
+
+    누적 히스토그램과 달리 오래된 관측은 빠지므로, 일시적인 지연 급증이 지나가면 분위수도 회복됩니다.
+    분위수는 버킷 근사가 아닌 원시 관측값의 선형 보간으로 계산합니다.
+    """
+
+    def __init__(self, max_age: float, max_samples: int = 200, clock=time.monotonic):
+        self.max_age = max_age
+        self.samples = deque(maxlen=max_samples)
+        self._clock = clock
+
+    def observe(self, value: float):
+        self.samples.append((self._clock(), value))
+
+    def _prune(self):
+        cutoff = self._clock() - self.max_age
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+
+    @property
+    def count(self) -> int:
+        self._prune()
+        return len(self.samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        self._prune()
+        if not self.samples:
+            return None
+        values = sorted(value for _, value in self.samples)
+        position = q * (len(values) - 1)
+        lo = int(position)
+        hi = min(lo + 1, len(values) - 1)
+        return values[lo] + (values[hi] - values[lo]) * (position - lo)
@@ -0,0 +1,229 @@
+# pre_grading.py
+"""
+사전 채점 필터 파이프라인 (LLM 호출 전 명백한 답변을 로컬에서 결정)
+"""
+
+import abc
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, deque
+from typing import Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from src.core.config import (
+    GRADING_CRITERIA,
+    PRE_GRADING_MIN_CHARS, PRE_GRADING_MAX_CHARS, PRE_GRADING_MIN_LETTER_RATIO,
+    PRE_GRADING_QUESTION_SIMILARITY, PRE_GRADING_DUPLICATE_SIMILARITY, PRE_GRADING_RECENT_PER_QUESTION
+)
+from src.models.grading import criteria_level
+
+_WHITESPACE = re.compile(r'\s+')
+_LETTER = re.compile(r'[A-Za-z가-힣ㄱ-ㅎㅏ-ㅣ]')
+
+
+def normalize_text(text: str) -> str:
+    """비교용 정규화 (NFKC, 소문자, 공백 축약)"""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text or '')).strip().lower()
+
+
+def shingles(text: str, size: int = 3) -> FrozenSet[str]:
+    """공백을 제거한 문자 n-gram 집합"""
+    compact = text.replace(' ', '')
+    if len(compact) <= size:
+        return frozenset([compact]) if compact else frozenset()
+    return frozenset(compact[i:i + size] for i in range(len(compact) - size + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def question_key(question: Dict) -> str:
+    return str(question.get('id') or question.get('question_text', question.get('question', '')))
+
+
+def rejected_result(level: str, reason: str, feedback: str, improvements: List[str]) -> Dict:
+    """LLM 없이 확정한 0점 결과 (grade_answer와 같은 구조)"""
+    criteria = GRADING_CRITERIA[criteria_level(level)]
+    return {
+        "total_score": 0,
+        "criteria_scores": {name: 0 for name in criteria},
+        "passed": False,
+        "strengths": [],
+        "improvements": improvements,
+        "feedback": feedback,
+        "time_taken": 0,
+        "tokens_used": 0,
+        "model": "pre_grading",
+        "pre_graded": reason
+    }
+
+
+class PreGradingContext:
+    """필터들이 공유하는 답변 정보 (정규화/shingle은 한 번만 계산)"""
+
+    def __init__(self, question: Dict, answer: str, level: str):
+        self.question = question
+        self.answer = answer or ''
+        self.level = level
+        self.normalized = normalize_text(self.answer)
+        self._shingles: Optional[FrozenSet[str]] = None
+
+    @property
+    def shingles(self) -> FrozenSet[str]:
+        if self._shingles is None:
+            self._shingles = shingles(self.normalized)
+        return self._shingles
+
+
+class PreGradingFilter(abc.ABC):
+    """사전 채점 필터 기본 클래스
+
+    check()가 결과 딕셔너리를 반환하면 파이프라인은 그 결과로 채점을 끝내고,
+    None을 반환하면 다음 필터로 넘어갑니다.
+    """
+
+    name = "filter"
+
+    @abc.abstractmethod
+    def check(self, ctx: PreGradingContext) -> Optional[Dict]:
+        """결정된 결과, 또는 다음 필터로 넘기려면 None"""
+
+    def remember(self, ctx: PreGradingContext, result: Dict):
+        """LLM 채점이 끝난 답변 통지 (필요한 필터만 구현)"""
+
+
+class LengthFilter(PreGradingFilter):
+    """빈 답변, 지나치게 짧거나 긴 답변"""
+
+    name = "length"
+
+    def __init__(self, min_chars: int = PRE_GRADING_MIN_CHARS, max_chars: int = PRE_GRADING_MAX_CHARS):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+
+    def check(self, ctx: PreGradingContext) -> Optional[Dict]:
+        length = len(ctx.normalized.replace(' ', ''))
+        if length == 0:
+            return rejected_result(ctx.level, "empty", "답변이 비어 있습니다.",
+                                   ["문제에 대한 답변을 작성해주세요"])
+        if length < self.min_chars:
+            return rejected_result(ctx.level, "too_short", f"답변이 너무 짧습니다 ({length}자).",
+                                   ["핵심 내용을 문장으로 설명해주세요"])
+        if len(ctx.answer) > self.max_chars:
+            return rejected_result(ctx.level, "too_long",
+                                   f"답변이 너무 깁니다 ({len(ctx.answer):,}자, 최대 {self.max_chars:,}자).",
+                                   ["핵심 위주로 간결하게 작성해주세요"])
+        return None
+
+
+class LanguageFilter(PreGradingFilter):
+    """한글/영문이 거의 없는 답변 (기호, 숫자, 무작위 키 입력 등)"""
+
+    name = "language"
+
+    def __init__(self, min_letter_ratio: float = PRE_GRADING_MIN_LETTER_RATIO):
+        self.min_letter_ratio = min_letter_ratio
+
+    def check(self, ctx: PreGradingContext) -> Optional[Dict]:
+        compact = ctx.normalized.replace(' ', '')
+        if not compact:
+            # 빈 답변은 LengthFilter가 판단 (이 필터만 단독으로 써도 0으로 나누지 않도록)
+            return None
+        letters = len(_LETTER.findall(compact))
+        if letters / len(compact) < self.min_letter_ratio:
+            return rejected_result(ctx.level, "not_language", "답변에서 의미 있는 문장을 찾을 수 없습니다.",
+                                   ["한국어 또는 영어 문장으로 답변해주세요"])
+        return None
+
+
+class QuestionEchoFilter(PreGradingFilter):
+    """문제 문장을 그대로 붙여넣은 답변"""
+
+    name = "question_echo"
+
+    def __init__(self, threshold: float = PRE_GRADING_QUESTION_SIMILARITY):
+        self.threshold = threshold
+
+    def check(self, ctx: PreGradingContext) -> Optional[Dict]:
+        question_text = normalize_text(ctx.question.get('question_text', ctx.question.get('question', '')))
+        if not question_text:
+            return None
+        if ctx.normalized in question_text or jaccard(ctx.shingles, shingles(question_text)) >= self.threshold:
+            return rejected_result(ctx.level, "question_echo", "답변이 문제 내용과 같습니다.",
+                                   ["문제를 옮겨 적지 말고 자신의 답변을 작성해주세요"])
+        return None
+
+
+class RecentAnswerFilter(PreGradingFilter):
+    """같은 문제에서 최근 채점한 답변과 (거의) 같은 답변은 그 결과를 재사용"""
+
+    name = "near_duplicate"
+
+    def __init__(self, threshold: float = PRE_GRADING_DUPLICATE_SIMILARITY,
+                 per_question: int = PRE_GRADING_RECENT_PER_QUESTION, max_questions: int = 1024):
+        self.threshold = threshold
+        self.per_question = per_question
+        self.max_questions = max_questions
+        self._recent: "OrderedDict[Tuple[str, str], Deque[Tuple[str, FrozenSet[str], Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, ctx: PreGradingContext) -> Optional[Dict]:
+        key = (question_key(ctx.question), ctx.level)
+        with self._lock:
+            entries = list(self._recent.get(key, ()))
+        for normalized, entry_shingles, result in reversed(entries):
+            if normalized == ctx.normalized or jaccard(ctx.shingles, entry_shingles) >= self.threshold:
+                reused = dict(result)
+                reused.update(time_taken=0, tokens_used=0, pre_graded="near_duplicate")
+                return reused
+        return None
+
+    def remember(self, ctx: PreGradingContext, result: Dict):
+        key = (question_key(ctx.question), ctx.level)
+        with self._lock:
+            if key not in self._recent:
+                self._recent[key] = deque(maxlen=self.per_question)
+                if len(self._recent) > self.max_questions:
+                    self._recent.popitem(last=False)
+            self._recent.move_to_end(key)
+            self._recent[key].append((ctx.normalized, ctx.shingles, result))
+
+
+class PreGradingPipeline:
+    """필터를 순서대로 적용해 LLM으로 보낼 필요가 없는 답변을 걸러내는 파이프라인"""
+
+    def __init__(self, filters: List[PreGradingFilter] = None):
+        self.filters = filters if filters is not None else default_filters()
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def run(self, question: Dict, answer: str, level: str) -> Optional[Dict]:
+        """로컬에서 결정된 결과, 또는 LLM 채점이 필요하면 None"""
+        ctx = PreGradingContext(question, answer, level)
+        for stage in self.filters:
+            result = stage.check(ctx)
+            if result is not None:
+                with self._lock:
+                    self.counts[stage.name] = self.counts.get(stage.name, 0) + 1
+                return result
+        return None
+
+    def remember(self, question: Dict, answer: str, level: str, result: Dict):
+        """LLM 채점 결과 등록 (오류 결과는 재사용하지 않음)"""
+        if result.get('tokens_used', 0) <= 0 or result.get('pre_graded'):
+            return
+        ctx = PreGradingContext(question, answer, level)
+        for stage in self.filters:
+            stage.remember(ctx, result)
+
+
+def default_filters() -> List[PreGradingFilter]:
+    """기본 필터 순서 (저렴한 검사 → 비싼 검사)"""
+    return [LengthFilter(), LanguageFilter(), QuestionEchoFilter(), RecentAnswerFilter()]
+
+
+# 모든 세션이 공유하는 파이프라인 (최근 채점 답변 공유)
+pre_grading_pipeline = PreGradingPipeline()
@@ -0,0 +1,106 @@
+# prompt_builder.py
+"""
+채점 프롬프트 구성 단계 (로컬 토큰 추정, 토큰 예산, 압축 직렬화)
+"""
+
+import json
+import logging
+from typing import Any, Dict, Tuple
+
+from src.core.config import PROMPT_TOKEN_BUDGET, PROMOTION_PROMPT_DROP_FIELDS
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARK = "…(생략)"
+
+
+def estimate_tokens(text: str) -> int:
+    """네트워크 없이 토큰 수를 근사 추정
+
+    영문/숫자/기호는 약 4자당 1토큰, 한글 등 비 ASCII 문자는 1자당 약 1토큰으로 계산합니다.
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return non_ascii + (ascii_chars + 3) // 4
+
+
+def compact_json(data: Any) -> str:
+    """공백 없는 JSON 직렬화 (한글은 이스케이프하지 않음)"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """추정 토큰 수가 max_tokens 이하가 되도록 앞부분만 남김"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return TRUNCATION_MARK
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) + estimate_tokens(TRUNCATION_MARK) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] + TRUNCATION_MARK
+
+
+def _log_savings(kind: str, original: str, compacted: str) -> Tuple[int, int]:
+    before = estimate_tokens(original)
+    after = estimate_tokens(compacted)
+    logger.info("%s 프롬프트 압축: %d → %d 토큰 (절약 %d)", kind, before, after, before - after)
+    return before, after
+
+
+def build_grading_prompt(question_text: str, answer: str, criteria: Dict,
+                         response_format: str, budget: int = None) -> str:
+    """AutoGrader용 사용자 프롬프트 구성
+
+    평가 기준은 압축 JSON으로 넣고, 예산을 넘으면 학생 답변을 잘라냅니다.
+    """
+    budget = budget or PROMPT_TOKEN_BUDGET["grading"]
+    template = "\n문제: {question}\n\n학생 답변: {answer}\n\n평가 기준:\n{criteria}\n\n{response_format}"
+
+    fixed = template.format(question=question_text, answer="", criteria=compact_json(criteria),
+                            response_format=response_format)
+    prompt = template.format(question=question_text,
+                             answer=truncate_to_tokens(answer, budget - estimate_tokens(fixed)),
+                             criteria=compact_json(criteria), response_format=response_format)
+
+    original = template.format(question=question_text, answer=answer,
+                               criteria=json.dumps(criteria, indent=2), response_format=response_format)
+    _log_savings("grading", original, prompt)
+    return prompt
+
+
+def compact_promotion_submission(submission_data: Dict, budget: int = None) -> Dict:
+    """승급 시험 제출 데이터에서 채점에 쓰이지 않는 필드를 제거하고 예산에 맞춤"""
+    budget = budget or PROMPT_TOKEN_BUDGET["promotion"]
+    problem = {
+        key: value for key, value in submission_data.get('problem', {}).items()
+        if key not in PROMOTION_PROMPT_DROP_FIELDS
+    }
+    compacted = dict(submission_data)
+    compacted['problem'] = problem
+
+    # 예산 초과 시 가장 긴 자유 텍스트인 시나리오를 줄임 (추정 오차를 고려해 최대 3회)
+    for _ in range(3):
+        overflow = estimate_tokens(compact_json(compacted)) - budget
+        scenario = problem.get('scenario')
+        if overflow <= 0 or not scenario or scenario == TRUNCATION_MARK:
+            break
+        problem['scenario'] = truncate_to_tokens(scenario, max(0, estimate_tokens(scenario) - overflow))
+
+    return compacted
+
+
+def build_promotion_prompt(submission_data: Dict, budget: int = None) -> str:
+    """call_ai_with_prompt용 사용자 프롬프트 구성"""
+    template = "\n다음 데이터를 분석해주세요:\n\n{data}\n\n위 데이터를 바탕으로 분석 결과를 JSON 형태로 제공해주세요.\n"
+
+    prompt = template.format(data=compact_json(compact_promotion_submission(submission_data, budget)))
+    original = template.format(data=json.dumps(submission_data, ensure_ascii=False, indent=2))
+    _log_savings("promotion", original, prompt)
+    return prompt
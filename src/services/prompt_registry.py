@@ -0,0 +1,121 @@
+# prompt_registry.py
+"""
+버전 관리되는 프롬프트 레지스트리 (세션 간 공유 캐시)
+"""
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from src.core.config import PROMPT_REGISTRY, PROMPT_CACHE_TTL
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """캐시된 프롬프트 한 버전"""
+    name: str
+    version: str
+    text: str
+    etag: str
+
+    @property
+    def key(self) -> str:
+        """캐시 키 등에 사용하는 'name@version' 식별자"""
+        return f"{self.name}@{self.version}"
+
+
+def compute_etag(text: str) -> str:
+    """프롬프트 본문의 내용 해시 (ETag 역할)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+class PromptRegistry:
+    """prompts 테이블의 프롬프트를 이름/버전으로 제공하는 레지스트리
+
+    - 프롬프트는 최초 1회만 로드하고 모든 세션이 공유합니다
+    - TTL이 지나면 다시 조회해 ETag(내용 해시)를 비교하며, 바뀌지 않았으면 버전을 유지합니다
+    - 버전은 prompts.version 컬럼이 있으면 그 값을, 없으면 ETag를 사용합니다
+    """
+
+    def __init__(self, db, registry: Dict[str, str] = None, ttl: int = PROMPT_CACHE_TTL):
+        self.db = db
+        self.registry = dict(registry or PROMPT_REGISTRY)
+        self.ttl = ttl
+        self._current: Dict[str, PromptTemplate] = {}
+        self._versions: Dict[str, PromptTemplate] = {}
+        self._validated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, version: Optional[str] = None) -> Optional[PromptTemplate]:
+        """이름(과 선택적 버전)으로 프롬프트 조회
+
+        version을 지정하면 이 프로세스에서 본 적 있는 해당 버전을 반환합니다.
+        """
+        if version is not None:
+            template = self._versions.get(f"{name}@{version}")
+            if template is not None:
+                return template
+
+        template = self._current.get(name)
+        if template is None or time.monotonic() - self._validated_at.get(name, 0) > self.ttl:
+            template = self._revalidate(name) or template
+
+        if version is not None and (template is None or template.version != version):
+            return self._versions.get(f"{name}@{version}")
+        return template
+
+    def get_text(self, name: str) -> Optional[str]:
+        template = self.get(name)
+        return template.text if template else None
+
+    def invalidate(self, name: str = None):
+        """다음 조회 시 강제로 재검증"""
+        with self._lock:
+            if name is None:
+                self._validated_at.clear()
+            else:
+                self._validated_at.pop(name, None)
+
+    def _revalidate(self, name: str) -> Optional[PromptTemplate]:
+        prompt_id = self.registry.get(name)
+        if prompt_id is None:
+            return None
+
+        with self._lock:
+            # 다른 세션이 먼저 재검증했으면 그 결과 사용
+            cached = self._current.get(name)
+            if cached is not None and time.monotonic() - self._validated_at.get(name, 0) <= self.ttl:
+                return cached
+
+            record = self.db.get_prompt_record(prompt_id)
+            if not record or not record.get('prompt_text'):
+                # 조회 실패 시 기존 캐시를 계속 사용
+                return cached
+
+            text = record['prompt_text']
+            etag = compute_etag(text)
+            if cached is not None and cached.etag == etag:
+                template = cached
+            else:
+                version = str(record.get('version') or etag)
+                template = PromptTemplate(name=name, version=version, text=text, etag=etag)
+                self._versions[template.key] = template
+
+            self._current[name] = template
+            self._validated_at[name] = time.monotonic()
+            return template
+
+
+_prompt_registry: Optional[PromptRegistry] = None
+_prompt_registry_lock = threading.Lock()
+
+
+def get_prompt_registry(db) -> PromptRegistry:
+    """프로세스 전역 프롬프트 레지스트리"""
+    global _prompt_registry
+    with _prompt_registry_lock:
+        if _prompt_registry is None:
+            _prompt_registry = PromptRegistry(db)
+    return _prompt_registry
@@ -0,0 +1,402 @@
+# question_dedup.py
+"""
+문제 은행 유사 중복 탐지 (MinHash/LSH, 한글 문자 n-gram, 오프라인/증분)
+
+- 시나리오 + 단계 질문/선택지 텍스트를 정규화한 뒤 문자 n-gram 집합의 MinHash 서명을 만듭니다
+- 서명은 LSH 밴드로 버킷팅하고, 후보 쌍은 서명 일치율(추정 Jaccard)로 다시 확인합니다
+- 서명 계산과 일괄 스캔은 numpy로 벡터화되어 있어 10만 문항도 수 초 안에 처리합니다
+
+일괄 스캔:
+    python -m src.services.question_dedup                  # DB 전체 스캔
+    python -m src.services.question_dedup --json dump.json # 내보낸 questions 행 스캔
+    python -m src.services.question_dedup --synthetic 100000
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.config import (
+    NEAR_DUP_THRESHOLD, NEAR_DUP_NUM_PERM, NEAR_DUP_BANDS, NEAR_DUP_NGRAM, NEAR_DUP_INDEX_PATH
+)
+
+logger = logging.getLogger(__name__)
+
+_FNV_PRIME = np.uint64(0x100000001B3)
+_PAIR_CHUNK = 1 << 16       # 후보 쌍 검증 단위
+
+
+def question_text(question: Dict) -> str:
+    """중복 판정에 쓰는 문제 텍스트 (시나리오 + 단계 질문 + 선택지)"""
+    steps = question.get('steps') or []
+    if isinstance(steps, str):
+        try:
+            steps = json.loads(steps)
+        except ValueError:
+            steps = []
+
+    parts = [str(question.get('scenario') or '')]
+    for step in steps if isinstance(steps, list) else []:
+        if not isinstance(step, dict):
+            continue
+        parts.append(str(step.get('question') or ''))
+        parts.extend(str(option.get('text') or '') for option in step.get('options') or []
+                     if isinstance(option, dict))
+    return ' '.join(parts)
+
+
+def _drop_table() -> np.ndarray:
+    """BMP 코드포인트별 제거 여부 (공백/문장부호/기호/제어 문자)"""
+    categories = (unicodedata.category(chr(code))[0] for code in range(0x10000))
+    return np.fromiter((c in 'ZPSC' for c in categories), dtype=bool, count=0x10000)
+
+
+_DROP = _drop_table()
+
+
+def normalized_codes(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """NFKC + 소문자 후 글자/숫자만 남긴 (이어 붙인 코드포인트, 문서별 길이)
+
+    띄어쓰기/문장부호 차이는 중복 판정에 영향을 주지 않습니다.
+    """
+    docs = [unicodedata.normalize('NFKC', text or '').lower() for text in texts]
+    lengths = np.fromiter((len(doc) for doc in docs), dtype=np.int64, count=len(docs))
+    codes = np.frombuffer(''.join(docs).encode('utf-32-le'), dtype=np.uint32)
+    keep = (codes < 0x10000) & ~_DROP[np.minimum(codes, 0xFFFF)]
+    doc_of_char = np.repeat(np.arange(len(docs)), lengths)
+    return codes[keep], np.bincount(doc_of_char[keep], minlength=len(docs))
+
+
+class MinHasher:
+    """문자 n-gram MinHash (one permutation hashing + 회전 densification)
+
+    n-gram마다 해시를 한 번만 계산해 num_perm개 구간 중 하나에 넣고 구간별 최솟값을 서명으로 씁니다.
+    n-gram 수에 선형이라 해시 함수 num_perm개를 모두 적용하는 방식보다 num_perm배 빠르며,
+    빈 구간은 오른쪽 이웃 구간 값으로 채워 서로 다른 문서 사이에서도 일관되게 비교됩니다.
+    """
+
+    def __init__(self, num_perm: int = NEAR_DUP_NUM_PERM, ngram: int = NEAR_DUP_NGRAM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self.seed = seed
+        self._a, self._b = rng.integers(1, 2 ** 63, 2, dtype=np.uint64) | np.uint64(1)
+        self._offset = np.uint32(rng.integers(1, 2 ** 31) | 1)
+
+    def signatures(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(서명 (n, num_perm) uint32, 유효 여부 (n,) bool) — 정규화 후 빈 텍스트는 유효하지 않음"""
+        n = self.ngram
+        empty = np.uint32(np.iinfo(np.uint32).max)
+        codes, lengths = normalized_codes(texts)
+        valid = lengths > 0
+        sigs = np.full((len(lengths), self.num_perm), empty, dtype=np.uint32)
+        if not valid.any():
+            return sigs, valid
+
+        # 문서마다 뒤에 n-1개의 0을 붙여 이어 붙이고, 문서 경계를 넘지 않는 n-gram만 해시
+        # (n보다 짧은 문서도 0으로 채운 n-gram 1개를 가짐)
+        doc_of_char = np.repeat(np.arange(len(lengths)), lengths)
+        padded = np.zeros(codes.size + (n - 1) * len(lengths), dtype=np.uint64)
+        padded[np.arange(codes.size) + doc_of_char * (n - 1)] = codes
+        counts = np.where(valid, np.maximum(lengths - n + 1, 1), 0)
+        start = np.cumsum(lengths + n - 1) - (lengths + n - 1)
+        doc_of_shingle = np.repeat(np.arange(len(lengths)), counts)
+        positions = start[doc_of_shingle] + np.arange(counts.sum()) - (np.cumsum(counts) - counts)[doc_of_shingle]
+        hashed = padded[positions]
+        for j in range(1, n):
+            hashed = (hashed * _FNV_PRIME) ^ padded[positions + j]
+        hashed = hashed * self._a + self._b
+        hashed ^= hashed >> np.uint64(31)
+
+        # (문서, 구간)별 최솟값
+        cells = doc_of_shingle * self.num_perm + (hashed >> np.uint64(32)).astype(np.int64) % self.num_perm
+        values = (hashed & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        values[values == empty] -= np.uint32(1)
+        np.minimum.at(sigs.reshape(-1), cells, values)
+
+        # 빈 구간 densification: 오른쪽(순환) 첫 비어 있지 않은 구간 값 + 거리별 오프셋
+        rows = np.flatnonzero(valid & (sigs == empty).any(axis=1))
+        if rows.size:
+            block = sigs[rows]
+            for _ in range(self.num_perm - 1):
+                holes = block == empty
+                if not holes.any():
+                    break
+                shifted = np.roll(block, -1, axis=1)
+                fill = holes & (shifted != empty)
+                block[fill] = shifted[fill] + self._offset
+            sigs[rows] = block
+        return sigs, valid
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        sigs, valid = self.signatures([text])
+        return sigs[0] if valid[0] else None
+
+
+class NearDuplicateIndex:
+    """증분 MinHash/LSH 인덱스
+
+    - add/add_many로 문제를 추가하고 query로 저장 전 유사 문제를 찾습니다
+    - find_duplicates는 버킷 딕셔너리 없이 밴드별 정렬로 전체 후보 쌍을 한 번에 구합니다
+    - save/load로 서명을 파일에 보관해 다음 실행에서는 새 문제만 추가합니다
+    """
+
+    def __init__(self, num_perm: int = NEAR_DUP_NUM_PERM, bands: int = NEAR_DUP_BANDS,
+                 threshold: float = NEAR_DUP_THRESHOLD, ngram: int = NEAR_DUP_NGRAM, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands의 배수여야 합니다")
+        self.hasher = MinHasher(num_perm, ngram, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.keys: List[str] = []
+        self._key_set = set()
+        self._sigs = np.empty((0, num_perm), dtype=np.uint32)
+        self._buckets: Optional[List[Dict[int, List[int]]]] = None
+        self._row_mult = np.random.default_rng(seed + 1).integers(1, 2 ** 63, self.rows, dtype=np.uint64) | np.uint64(1)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_set
+
+    def add(self, key: str, text: str) -> bool:
+        return self.add_many([key], [text]) == 1
+
+    def add_many(self, keys: Sequence[str], texts: Sequence[str]) -> int:
+        """문제 추가 (이미 있는 키와 빈 텍스트는 건너뜀), 추가된 개수 반환"""
+        sigs, valid = self.hasher.signatures(texts)
+        with self._lock:
+            fresh = [i for i, key in enumerate(keys) if valid[i] and key not in self._key_set]
+            fresh = list({keys[i]: i for i in fresh}.values())
+            if not fresh:
+                return 0
+            base = len(self.keys)
+            self._sigs = np.concatenate([self._sigs, sigs[fresh]])
+            for i in fresh:
+                self.keys.append(keys[i])
+                self._key_set.add(keys[i])
+            if self._buckets is not None:
+                self._bucket(base, self._band_keys(sigs[fresh]))
+        return len(fresh)
+
+    def query(self, text: str, threshold: float = None) -> List[Tuple[str, float]]:
+        """text와 추정 유사도가 threshold 이상인 (키, 유사도) 목록 (유사도 내림차순)"""
+        threshold = self.threshold if threshold is None else threshold
+        sig = self.hasher.signature(text)
+        if sig is None:
+            return []
+        with self._lock:
+            self._ensure_buckets()
+            candidates = set()
+            for band, band_key in enumerate(self._band_keys(sig[None, :])[0]):
+                candidates.update(self._buckets[band].get(int(band_key), ()))
+            if not candidates:
+                return []
+            idx = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            sims = (self._sigs[idx] == sig).mean(axis=1)
+            keys = [self.keys[i] for i in idx]
+        matches = [(key, float(sim)) for key, sim in zip(keys, sims) if sim >= threshold]
+        return sorted(matches, key=lambda m: -m[1])
+
+    def find_duplicates(self, threshold: float = None) -> List[Tuple[str, str, float]]:
+        """인덱스 전체의 유사 중복 쌍 (키 a, 키 b, 추정 유사도)"""
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            sigs = self._sigs
+            keys = list(self.keys)
+        if len(keys) < 2:
+            return []
+
+        band_keys = self._band_keys(sigs)
+        pair_codes = []
+        for band in range(self.bands):
+            order = np.argsort(band_keys[:, band], kind='stable')
+            ordered = band_keys[order, band]
+            same = ordered[1:] == ordered[:-1]
+            if not same.any():
+                continue
+            # 같은 버킷 안에서 이웃한 쌍 + 버킷 첫 원소와의 쌍 (버킷 크기에 선형)
+            run_first = np.maximum.accumulate(np.where(np.concatenate(([True], ~same)), np.arange(len(order)), 0))
+            members = np.flatnonzero(same) + 1
+            for a, b in ((order[members - 1], order[members]), (order[run_first[members]], order[members])):
+                pair_codes.append(np.minimum(a, b).astype(np.int64) * len(keys) + np.maximum(a, b))
+        if not pair_codes:
+            return []
+
+        pairs = np.unique(np.concatenate(pair_codes))
+        left, right = pairs // len(keys), pairs % len(keys)
+        left, right = left[left != right], right[left != right]
+
+        duplicates = []
+        for lo in range(0, left.size, _PAIR_CHUNK):
+            a, b = left[lo:lo + _PAIR_CHUNK], right[lo:lo + _PAIR_CHUNK]
+            sims = (sigs[a] == sigs[b]).mean(axis=1)
+            hit = np.flatnonzero(sims >= threshold)
+            duplicates.extend((keys[a[i]], keys[b[i]], float(sims[i])) for i in hit)
+        return duplicates
+
+    def save(self, path: str):
+        with self._lock:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = path + ".tmp.npz"
+            np.savez_compressed(tmp_path, keys=np.array(self.keys, dtype=str), signatures=self._sigs,
+                                params=np.array([self.hasher.num_perm, self.bands, self.hasher.ngram, self.hasher.seed]))
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, threshold: float = NEAR_DUP_THRESHOLD) -> "NearDuplicateIndex":
+        with np.load(path) as data:
+            num_perm, bands, ngram, seed = (int(v) for v in data['params'])
+            index = cls(num_perm, bands, threshold, ngram, seed)
+            index.keys = [str(key) for key in data['keys']]
+            index._key_set = set(index.keys)
+            index._sigs = data['signatures'].astype(np.uint32)
+        return index
+
+    def _band_keys(self, sigs: np.ndarray) -> np.ndarray:
+        """서명 → 밴드별 64비트 버킷 키 (n, bands)"""
+        rows = sigs.reshape(len(sigs), self.bands, self.rows).astype(np.uint64)
+        return (rows * self._row_mult).sum(axis=2, dtype=np.uint64)
+
+    def _ensure_buckets(self):
+        if self._buckets is None:
+            self._buckets = [{} for _ in range(self.bands)]
+            self._bucket(0, self._band_keys(self._sigs))
+
+    def _bucket(self, base: int, band_keys: np.ndarray):
+        for offset, row in enumerate(band_keys.tolist()):
+            for band, band_key in enumerate(row):
+                self._buckets[band].setdefault(band_key, []).append(base + offset)
+
+
+def duplicate_clusters(pairs: Iterable[Tuple[str, str, float]]) -> List[List[str]]:
+    """중복 쌍을 연결 요소로 묶기 (각 묶음은 정렬된 키 목록, 큰 묶음부터)"""
+    parent: Dict[str, str] = {}
+
+    def find(key: str) -> str:
+        parent.setdefault(key, key)
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for a, b, _ in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    clusters: Dict[str, List[str]] = {}
+    for key in parent:
+        clusters.setdefault(find(key), []).append(key)
+    return sorted((sorted(members) for members in clusters.values()), key=lambda c: (-len(c), c[0]))
+
+
+_question_index: Optional[NearDuplicateIndex] = None
+_question_index_lock = threading.Lock()
+
+
+def get_question_index(db=None, path: str = NEAR_DUP_INDEX_PATH) -> NearDuplicateIndex:
+    """프로세스 전역 문제 인덱스
+
+    저장된 인덱스 파일이 있으면 불러온 뒤 DB에서 아직 없는 문제만 추가하고 다시 저장합니다.
+    """
+    global _question_index
+    with _question_index_lock:
+        if _question_index is None:
+            index = None
+            if path and os.path.exists(path):
+                try:
+                    index = NearDuplicateIndex.load(path)
+                except Exception as e:
+                    logger.warning("문제 인덱스 로드 실패, 새로 만듭니다: %s", e)
+            index = index or NearDuplicateIndex()
+            if db is not None:
+                rows = [row for row in db.get_question_bank() if str(row.get('id')) not in index]
+                if index.add_many([str(row.get('id')) for row in rows], [question_text(row) for row in rows]) and path:
+                    index.save(path)
+            _question_index = index
+    return _question_index
+
+
+def _synthetic_questions(count: int, duplicate_ratio: float, seed: int) -> Tuple[List[str], List[str], int]:
+    """무작위 한글 시나리오와 일부 글자만 바꾼 사본 (심어 둔 중복 수 반환)"""
+    rng = random.Random(seed)
+    syllables = [chr(code) for code in range(0xAC00, 0xAC00 + 2000)]
+    vocabulary = [''.join(rng.choices(syllables, k=rng.randint(1, 4))) for _ in range(20000)]
+    texts = []
+    planted = 0
+    for _ in range(count):
+        if texts and rng.random() < duplicate_ratio:
+            chars = list(texts[rng.randrange(len(texts))])
+            for _ in range(max(1, len(chars) // 100)):
+                chars[rng.randrange(len(chars))] = rng.choice(syllables)
+            texts.append(''.join(chars))
+            planted += 1
+        else:
+            texts.append(' '.join(rng.choices(vocabulary, k=rng.randint(60, 120))))
+    return [f"q{i}" for i in range(count)], texts, planted
+
+
+def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(description="문제 은행 유사 중복 일괄 스캔")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--json", help="questions 행 목록(JSON 배열) 파일")
+    source.add_argument("--synthetic", type=int, help="무작위 문항 N개로 성능 측정")
+    parser.add_argument("--threshold", type=float, default=NEAR_DUP_THRESHOLD)
+    parser.add_argument("--save", help="스캔한 인덱스를 저장할 경로 (앱의 저장 시점 검사가 재사용)")
+    parser.add_argument("--show", type=int, default=20, help="출력할 중복 묶음 수")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.synthetic:
+        keys, texts, planted = _synthetic_questions(args.synthetic, 0.05, seed=0)
+    else:
+        if args.json:
+            with open(args.json, encoding='utf-8') as f:
+                rows = json.load(f)
+        else:
+            from src.core.database import GameDatabase
+            rows = GameDatabase().get_question_bank()
+        keys = [str(row.get('id')) for row in rows]
+        texts = [question_text(row) for row in rows]
+        planted = None
+    loaded = time.perf_counter()
+
+    index = NearDuplicateIndex(threshold=args.threshold)
+    index.add_many(keys, texts)
+    indexed = time.perf_counter()
+    pairs = index.find_duplicates()
+    clusters = duplicate_clusters(pairs)
+    scanned = time.perf_counter()
+
+    print(f"문항 {len(keys):,}개 | 로드 {loaded - started:.2f}s | 서명 {indexed - loaded:.2f}s | "
+          f"스캔 {scanned - indexed:.2f}s")
+    print(f"중복 쌍 {len(pairs):,}개 | 중복 묶음 {len(clusters):,}개 "
+          f"(제거 가능 {sum(len(c) - 1 for c in clusters):,}개)")
+    if planted is not None:
+        print(f"심어 둔 중복 {planted:,}개")
+    else:
+        text_by_key = dict(zip(keys, texts))
+        for cluster in clusters[:args.show]:
+            print(f"- {', '.join(cluster)} | {text_by_key[cluster[0]][:60]}")
+
+    if args.save:
+        index.save(args.save)
+        print(f"인덱스 저장: {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# question_pool.py
+"""
+연습 문제 사전 생성 풀 (백그라운드에서 목표 개수만큼 미리 생성)
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from src.core.config import QUESTION_POOL_TARGET_DEPTH, QUESTION_POOL_REFILL_INTERVAL
+from src.services.ai_services import QuestionGenerator
+from src.services.question_dedup import NearDuplicateIndex, get_question_index, question_text
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, int]
+
+
+class QuestionPool:
+    """(난이도, 레벨)별 생성 문제 풀
+
+    - take()는 준비된 문제를 즉시 꺼내며 LLM을 기다리지 않습니다 (비어 있으면 None)
+    - 한 번이라도 요청된 (난이도, 레벨)은 백그라운드 작업이 target_depth까지 채웁니다
+    - 생성된 문제는 검증 후 DB 문제와 같은 형식으로 변환되고, save가 주어지면 저장된 행(id 포함)이 풀에 들어갑니다
+    - load_index가 주어지면 문제 은행과 유사 중복인 생성 문제는 저장하지 않고 버립니다
+    """
+
+    def __init__(self, generate: Callable[[str, int], Optional[Dict]] = None,
+                 save: Callable[[Dict], Optional[Dict]] = None,
+                 target_depth: int = QUESTION_POOL_TARGET_DEPTH,
+                 refill_interval: float = QUESTION_POOL_REFILL_INTERVAL,
+                 load_index: Callable[[], NearDuplicateIndex] = None):
+        self.generate = generate or QuestionGenerator.generate_practice_question
+        self.save = save
+        self.target_depth = max(1, target_depth)
+        self.refill_interval = refill_interval
+        self.load_index = load_index
+        self._index: Optional[NearDuplicateIndex] = None
+        self._pools: Dict[PoolKey, Deque[Dict]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.generated = 0
+        self.failed = 0
+        self.duplicates = 0
+
+    def take(self, difficulty: str, level: int) -> Optional[Dict]:
+        """준비된 문제 1개 꺼내기 (대기 없음) 후 보충 요청"""
+        key = (difficulty, level)
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            question = pool.popleft() if pool else None
+        self._ensure_worker()
+        self._wake.set()
+        return question
+
+    def warm(self, difficulty: str, level: int):
+        """미리 채울 (난이도, 레벨) 등록"""
+        with self._lock:
+            self._pools.setdefault((difficulty, level), deque())
+        self._ensure_worker()
+        self._wake.set()
+
+    def depth(self, difficulty: str, level: int) -> int:
+        with self._lock:
+            return len(self._pools.get((difficulty, level), ()))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'pools': {f"{difficulty}/L{level}": len(pool) for (difficulty, level), pool in self._pools.items()},
+                'generated': self.generated,
+                'failed': self.failed,
+                'duplicates': self.duplicates
+            }
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="question-pool", daemon=True)
+                self._worker.start()
+
+    def _next_key(self) -> Optional[PoolKey]:
+        """가장 비어 있는 풀"""
+        with self._lock:
+            short = [(len(pool), key) for key, pool in self._pools.items() if len(pool) < self.target_depth]
+        return min(short)[1] if short else None
+
+    def _run(self):
+        while True:
+            key = self._next_key()
+            if key is None:
+                self._wake.wait(self.refill_interval)
+                self._wake.clear()
+                continue
+            if not self._produce(*key):
+                # 생성 실패 시 LLM을 연속으로 두드리지 않도록 다음 주기까지 대기
+                self._wake.wait(self.refill_interval)
+                self._wake.clear()
+
+    def _dedup_index(self) -> Optional[NearDuplicateIndex]:
+        """중복 탐지 인덱스 (작업 스레드에서 처음 사용할 때 로드)"""
+        if self._index is None and self.load_index is not None:
+            try:
+                self._index = self.load_index()
+            except Exception as e:
+                logger.warning("문제 중복 인덱스 로드 실패, 중복 검사 없이 진행: %s", e)
+                self.load_index = None
+        return self._index
+
+    def _produce(self, difficulty: str, level: int) -> bool:
+        try:
+            question = self.generate(difficulty, level)
+            index = self._dedup_index() if question is not None else None
+            if index is not None and index.query(question_text(question)):
+                with self._lock:
+                    self.duplicates += 1
+                return False
+            if question is not None and self.save is not None:
+                question = self.save(question)
+                if question is not None and index is not None:
+                    index.add(str(question.get('id')), question_text(question))
+        except Exception as e:
+            logger.warning("문제 사전 생성 실패 (%s, L%d): %s", difficulty, level, e)
+            question = None
+
+        with self._lock:
+            if question is None:
+                self.failed += 1
+                return False
+            question['source'] = 'generated'
+            self._pools.setdefault((difficulty, level), deque()).append(question)
+            self.generated += 1
+        return True
+
+
+_question_pool: Optional[QuestionPool] = None
+_question_pool_lock = threading.Lock()
+
+
+def get_question_pool(db=None) -> QuestionPool:
+    """프로세스 전역 문제 풀
+
+    생성 문제는 db에 저장해 답안 기록이 문제 ID를 참조할 수 있게 하고, 저장 전에 문제 은행과의 유사 중복을 검사합니다.
+    """
+    global _question_pool
+    with _question_pool_lock:
+        if _question_pool is None:
+            if db is not None:
+                _question_pool = QuestionPool(save=db.save_generated_question, load_index=lambda: get_question_index(db))
+            else:
+                _question_pool = QuestionPool()
+    return _question_pool
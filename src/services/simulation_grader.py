@@ -0,0 +1,76 @@
+# simulation_grader.py
+"""
+시드 고정 시뮬레이션 채점기 (OpenAI 호출 없음)
+"""
+
+import hashlib
+import random
+import time
+from typing import Dict, List
+
+from src.core.config import (
+    GRADE_PASS_SCORE, GRADING_CRITERIA, GRADING_SIMULATION_SEED, SIMULATION_SCORE_PROFILES
+)
+from src.models.grading import criteria_level
+
+
+class SimulationGrader:
+    """재현 가능한 시뮬레이션 채점기
+
+    같은 시드와 같은 (문제, 답변, 난이도)에는 항상 같은 점수를 반환합니다.
+    채점마다 입력에서 파생한 난수 생성기를 쓰므로 스레드 실행 순서와 무관하게 결과가 같고,
+    점수는 난이도별 SIMULATION_SCORE_PROFILES(평균, 표준편차) 분포를 따릅니다.
+    """
+
+    def __init__(self, seed: int = GRADING_SIMULATION_SEED, profiles: Dict = None):
+        self.seed = seed
+        self.profiles = profiles or SIMULATION_SCORE_PROFILES
+
+    def _rng(self, question: Dict, answer: str, level: str) -> random.Random:
+        question_key = question.get('id') or question.get('question_text', question.get('question', ''))
+        digest = hashlib.blake2b(
+            f"{self.seed}\x1f{level}\x1f{question_key}\x1f{answer}".encode('utf-8'),
+            digest_size=8
+        ).digest()
+        return random.Random(int.from_bytes(digest, 'big'))
+
+    def grade(self, question: Dict, answer: str, level: str, start_time: float = None) -> Dict:
+        """답변 1개 시뮬레이션 채점"""
+        start_time = start_time or time.time()
+        rng = self._rng(question, answer, level)
+        criteria_key = criteria_level(level)
+        mean, stddev = self.profiles.get(criteria_key, self.profiles["basic"])
+
+        answer_length = len(answer.strip())
+        score = rng.gauss(mean, stddev)
+        if answer_length < 20:
+            # 지나치게 짧은 답변은 감점
+            score -= (20 - answer_length) * 2
+        final_score = round(min(100.0, max(0.0, score)), 1)
+        passed = final_score >= GRADE_PASS_SCORE
+
+        criteria = GRADING_CRITERIA[criteria_key]
+        time_taken = int(time.time() - start_time)
+
+        return {
+            "total_score": final_score,
+            "criteria_scores": {name: round(final_score * weight, 1) for name, weight in criteria.items()},
+            "passed": passed,
+            "strengths": ["답변을 제출했습니다", "문제에 대한 시도를 했습니다"] if answer_length > 10 else [],
+            "improvements": ["더 구체적인 답변을 작성해보세요", "실제 사례를 포함해보세요"] if not passed else [],
+            "feedback": (
+                f"시뮬레이션 모드에서 채점되었습니다.\n\n"
+                f"점수: {final_score:.1f}점\n"
+                f"결과: {'통과' if passed else '실패'}\n\n"
+                f"답변 길이: {answer_length}자\n"
+                f"소요 시간: {time_taken}초"
+            ),
+            "time_taken": time_taken,
+            "tokens_used": 0,
+            "model": "simulation"
+        }
+
+    def grade_batch(self, items: List[Dict]) -> List[Dict]:
+        """여러 답변 시뮬레이션 채점 ({"question", "answer", "level"} 목록)"""
+        start_time = time.time()
+        return [self.grade(item['question'], item['answer'], item['level'], start_time) for item in items]
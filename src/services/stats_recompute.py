@@ -0,0 +1,209 @@
+# stats_recompute.py
+"""
+user_answers 기반 사용자 통계 일괄 재계산 (관리자 배치 작업)
+
+XP_REWARDS / DIFFICULTY_MULTIPLIER / LEVEL_REQUIREMENTS를 바꾼 뒤 모든 사용자의
+experience_points, level, total_questions_solved, correct_answers, current_streak, best_streak를 다시 계산합니다.
+
+- user_answers를 (user_id, id) 키셋 페이지로 스트리밍하고, 페이지마다 pandas/numpy로 한 번에 계산합니다
+- 연속 정답은 사용자별 시간순 정답 여부의 run-length를 벡터 연산으로 구합니다
+- 답변 외 XP(업적 보상, 승급 보상)와 승급 레벨은 xp_events에서 더합니다
+- 결과는 bulk_update_user_stats RPC로 배치 단위로 반영하고, XP 스냅샷 기준점(snapshot_event_id)도 함께 맞춥니다
+- 작업 중 들어오는 답변은 중복/누락될 수 있으므로 점검 시간에 실행합니다
+
+실행 (프로젝트 루트에서):
+    python -m src.services.stats_recompute --dry-run
+    python -m src.services.stats_recompute --csv user_answers.csv --questions questions.csv --dry-run
+"""
+
+import argparse
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.config import GRADE_PASS_SCORE, LEVEL_REQUIREMENTS, STATS_RECOMPUTE_PAGE_SIZE
+from src.services.game_engine import GameEngine
+
+logger = logging.getLogger(__name__)
+
+STAT_COLUMNS = ['experience_points', 'level', 'total_questions_solved', 'correct_answers',
+                'current_streak', 'best_streak']
+_LEVELS = np.array([requirement[0] for requirement in LEVEL_REQUIREMENTS])
+_LEVEL_XP = np.array([requirement[1] for requirement in LEVEL_REQUIREMENTS])
+_engine = GameEngine(db=None)
+
+
+def levels_for_xp(xp: np.ndarray) -> np.ndarray:
+    """경험치 배열 → 레벨 배열 (필요 XP를 넘은 가장 높은 레벨)"""
+    return _LEVELS[np.maximum(np.searchsorted(_LEVEL_XP, xp, side='right') - 1, 0)]
+
+
+def answer_xp(answers: pd.DataFrame) -> pd.DataFrame:
+    """답변별 정답 여부와 XP (GameEngine의 배열 XP 계산 사용)
+
+    result(PASS/FAIL)가 기록된 답변은 단순 정답 모드, 없는 답변은 AI 채점 모드로 계산합니다.
+    """
+    score = answers['score'].to_numpy(dtype=float)
+    simple = answers['result'].notna().to_numpy()
+    correct = np.where(simple, answers['result'].eq('PASS').to_numpy(), score >= GRADE_PASS_SCORE)
+
+    xp = np.where(
+        simple,
+        _engine.calculate_simple_xp_rewards(correct, answers['difficulty']),
+        _engine.calculate_xp_rewards(score, answers['time_taken'].to_numpy(dtype=float),
+                                     answers['tokens_used'].to_numpy(dtype=float), answers['difficulty'])
+    )
+    return answers.assign(correct=correct, xp=xp)
+
+
+def streak_lengths(user_ids: np.ndarray, correct: np.ndarray) -> np.ndarray:
+    """사용자별 시간순으로 정렬된 답변의 각 시점 연속 정답 수 (오답이면 0)
+
+    연속 구간 시작 위치 = 사용자 첫 답변 위치 또는 직전 오답 다음 위치의 누적 최댓값
+    """
+    n = len(correct)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    idx = np.arange(n)
+    user_start = np.ones(n, dtype=bool)
+    user_start[1:] = user_ids[1:] != user_ids[:-1]
+    run_start = np.maximum.accumulate(np.where(~correct, idx + 1, np.where(user_start, idx, 0)))
+    return np.where(correct, idx - run_start + 1, 0)
+
+
+def aggregate_answers(answers: pd.DataFrame) -> pd.DataFrame:
+    """한 묶음(사용자 단위로 완결된 답변들) → 사용자별 답변 통계"""
+    answers = answer_xp(answers.sort_values(['user_id', 'created_at', 'id'], kind='stable'))
+    answers['streak'] = streak_lengths(answers['user_id'].to_numpy(), answers['correct'].to_numpy())
+    grouped = answers.groupby('user_id', sort=False)
+    return pd.DataFrame({
+        'experience_points': grouped['xp'].sum(),
+        'total_questions_solved': grouped.size(),
+        'correct_answers': grouped['correct'].sum(),
+        'current_streak': grouped['streak'].last(),
+        'best_streak': grouped['streak'].max()
+    })
+
+
+def recompute(pages: Iterable[List[Dict]], difficulties: Dict[str, str],
+              extra_events: Optional[pd.DataFrame] = None,
+              on_progress: Callable[[int], None] = None) -> pd.DataFrame:
+    """답변 페이지 스트림 → 사용자별 최종 통계 (index: user_id, 열: STAT_COLUMNS)
+
+    페이지는 user_id 순이어야 하며, 페이지 경계에 걸친 마지막 사용자의 답변은 다음 페이지와 합쳐 계산합니다.
+    extra_events는 답변 외 XP 이벤트 (user_id, xp, level)입니다.
+    """
+    results = []
+    carry = None
+    processed = 0
+    for page in pages:
+        frame = pd.DataFrame.from_records(page)
+        if frame.empty:
+            continue
+        frame['difficulty'] = frame['question_id'].map(difficulties)
+        if carry is not None:
+            frame = pd.concat([carry, frame], ignore_index=True)
+        last_user = frame['user_id'].iat[-1]
+        tail = frame['user_id'].to_numpy() == last_user
+        carry = frame[tail]
+        if (~tail).any():
+            results.append(aggregate_answers(frame[~tail]))
+        processed += len(page)
+        if on_progress:
+            on_progress(processed)
+    if carry is not None and not carry.empty:
+        results.append(aggregate_answers(carry))
+
+    stats = pd.concat(results) if results else pd.DataFrame(columns=STAT_COLUMNS[:1] + STAT_COLUMNS[2:])
+    stats = stats.groupby(level=0).agg({
+        'experience_points': 'sum', 'total_questions_solved': 'sum', 'correct_answers': 'sum',
+        'current_streak': 'last', 'best_streak': 'max'
+    }) if stats.index.has_duplicates else stats
+
+    promoted = pd.Series(dtype=np.int64)
+    if extra_events is not None and not extra_events.empty:
+        extra = extra_events.groupby('user_id').agg(bonus_xp=('xp', 'sum'), promoted_level=('level', 'max'))
+        stats = stats.reindex(stats.index.union(extra.index), fill_value=0)
+        stats['experience_points'] += extra['bonus_xp'].reindex(stats.index, fill_value=0)
+        promoted = extra['promoted_level']
+
+    stats = stats.astype(np.int64)
+    stats['level'] = levels_for_xp(stats['experience_points'].to_numpy())
+    if not promoted.empty:
+        promoted = promoted.reindex(stats.index).fillna(0).to_numpy(dtype=np.int64)
+        stats['level'] = np.maximum(stats['level'].to_numpy(), promoted)
+    return stats[STAT_COLUMNS]
+
+
+class StatsRecomputeJob:
+    """DB 전체 재계산 후 배치 반영"""
+
+    def __init__(self, db, page_size: int = STATS_RECOMPUTE_PAGE_SIZE):
+        self.db = db
+        self.page_size = page_size
+
+    def run(self, dry_run: bool = False, on_progress: Callable[[int], None] = None) -> Dict:
+        started = time.perf_counter()
+        snapshot_event_id = self.db.get_max_xp_event_id()
+        difficulties = self.db.get_question_difficulties()
+        extra_events = pd.DataFrame.from_records(list(self.db.iter_bonus_xp_events(self.page_size)),
+                                                 columns=['user_id', 'xp', 'level'])
+        stats = recompute(self.db.iter_user_answers(self.page_size), difficulties, extra_events, on_progress)
+        computed = time.perf_counter()
+
+        updated = 0
+        if not dry_run:
+            rows = stats.assign(snapshot_event_id=snapshot_event_id).reset_index().rename(columns={'index': 'user_id'})
+            records = rows.to_dict('records')
+            for lo in range(0, len(records), self.page_size):
+                updated += self.db.bulk_update_user_stats(records[lo:lo + self.page_size])
+
+        return {
+            'users': len(stats),
+            'updated': updated,
+            'answers': int(stats['total_questions_solved'].sum()) if len(stats) else 0,
+            'compute_seconds': computed - started,
+            'write_seconds': time.perf_counter() - computed,
+            'stats': stats
+        }
+
+
+def _csv_pages(path: str, page_size: int) -> Iterable[List[Dict]]:
+    """user_answers CSV 내보내기 → 페이지 (user_id 순으로 정렬된 파일이어야 함)"""
+    for chunk in pd.read_csv(path, chunksize=page_size, dtype={'user_id': str, 'question_id': str}):
+        yield chunk.to_dict('records')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="user_answers 기반 사용자 통계 일괄 재계산")
+    parser.add_argument("--csv", help="user_answers CSV (user_id 순 정렬, 지정 시 DB 대신 사용하며 반영하지 않음)")
+    parser.add_argument("--questions", help="questions CSV (id, difficulty)")
+    parser.add_argument("--dry-run", action="store_true", help="계산만 하고 DB에 반영하지 않음")
+    parser.add_argument("--page-size", type=int, default=STATS_RECOMPUTE_PAGE_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.csv:
+        started = time.perf_counter()
+        difficulties = {}
+        if args.questions:
+            questions = pd.read_csv(args.questions, dtype={'id': str})
+            difficulties = dict(zip(questions['id'], questions['difficulty']))
+        stats = recompute(_csv_pages(args.csv, args.page_size), difficulties)
+        summary = {'users': len(stats), 'updated': 0, 'answers': int(stats['total_questions_solved'].sum()),
+                   'compute_seconds': time.perf_counter() - started, 'write_seconds': 0.0, 'stats': stats}
+    else:
+        from src.core.database import GameDatabase
+        summary = StatsRecomputeJob(GameDatabase(), args.page_size).run(
+            dry_run=args.dry_run, on_progress=lambda n: print(f"\r답변 {n:,}건 처리", end="", flush=True))
+        print()
+
+    print(f"사용자 {summary['users']:,}명 | 답변 {summary['answers']:,}건 | 계산 {summary['compute_seconds']:.1f}s | "
+          f"반영 {summary['updated']:,}명 ({summary['write_seconds']:.1f}s)")
+    print(summary['stats'].head(20).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# usage_ledger.py
+"""
+LLM 사용량 원장 (호출별 모델/프롬프트 버전/토큰/지연/캐시 적중/결과 기록)
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from src.core.config import (
+    USAGE_LEDGER_PATH, USAGE_LEDGER_FLUSH_SIZE, USAGE_LEDGER_FLUSH_INTERVAL
+)
+from src.services.metrics import COST_BUCKETS, LATENCY_BUCKETS, Histogram
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_usage (
+    ts REAL NOT NULL,
+    purpose TEXT NOT NULL,
+    route TEXT,
+    model TEXT,
+    prompt_version TEXT,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    latency REAL NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    cache_hit INTEGER NOT NULL DEFAULT 0,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_ts ON llm_usage (ts);
+"""
+
+_COLUMNS = ("ts", "purpose", "route", "model", "prompt_version", "prompt_tokens",
+            "completion_tokens", "latency", "cost", "cache_hit", "outcome")
+
+
+@dataclass
+class UsageRecord:
+    """LLM 호출 1건"""
+    purpose: str                        # grading | grading_batch | promotion | commentary
+    outcome: str                        # ok | escalated | invalid | error | timeout | cancelled | cache_hit
+    model: Optional[str] = None
+    route: Optional[str] = None
+    prompt_version: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    cost: float = 0.0
+    cache_hit: bool = False
+    ts: float = field(default_factory=time.time)
+
+    def to_row(self) -> Tuple:
+        values = asdict(self)
+        values['cache_hit'] = int(self.cache_hit)
+        return tuple(values[column] for column in _COLUMNS)
+
+
+class _Aggregate:
+    """(용도, 모델)별 메모리 집계"""
+
+    def __init__(self):
+        self.calls = 0
+        self.outcomes: Dict[str, int] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.cost_per_call = Histogram(COST_BUCKETS)
+
+    def add(self, record: UsageRecord):
+        self.calls += 1
+        self.outcomes[record.outcome] = self.outcomes.get(record.outcome, 0) + 1
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.cost += record.cost
+        if not record.cache_hit:
+            self.latency.observe(record.latency)
+            self.cost_per_call.observe(record.cost)
+
+    def to_dict(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'outcomes': dict(self.outcomes),
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'cost': self.cost,
+            'latency': self.latency.to_dict(),
+            'cost_per_call': self.cost_per_call.to_dict()
+        }
+
+
+class UsageLedger:
+    """LLM 호출 기록을 메모리에 집계하고 로컬 SQLite에 배치로 저장
+
+    record()는 버퍼에 추가만 하므로 호출 경로에 I/O가 생기지 않습니다.
+    버퍼는 flush_size에 도달하거나 flush_interval마다 백그라운드 스레드에서 저장됩니다.
+    저장에 실패해도 메모리 집계는 유지되고, 실패한 배치는 로그만 남기고 버립니다.
+    """
+
+    def __init__(self, path: str = USAGE_LEDGER_PATH, flush_size: int = USAGE_LEDGER_FLUSH_SIZE,
+                 flush_interval: float = USAGE_LEDGER_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self.started_at = time.time()
+        self._buffer: List[UsageRecord] = []
+        self._aggregates: Dict[Tuple[str, str], _Aggregate] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._schema_ready = False
+
+    def record(self, purpose: str, outcome: str, **fields) -> UsageRecord:
+        """호출 1건 기록 (fields는 UsageRecord 필드)"""
+        record = UsageRecord(purpose=purpose, outcome=outcome, **fields)
+        with self._lock:
+            key = (record.purpose, record.model or '-')
+            if key not in self._aggregates:
+                self._aggregates[key] = _Aggregate()
+            self._aggregates[key].add(record)
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.flush_size
+        self._ensure_worker()
+        if full:
+            self._wake.set()
+        return record
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="usage-ledger", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._schema_ready:
+            conn.executescript(_SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def flush(self) -> int:
+        """버퍼의 기록을 한 번의 트랜잭션으로 저장하고 저장한 건수 반환"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+
+        with self._flush_lock:
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.executemany(
+                            f"INSERT INTO llm_usage ({', '.join(_COLUMNS)}) "
+                            f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                            [record.to_row() for record in batch]
+                        )
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.warning("사용량 원장 저장 실패 (%d건 버림): %s", len(batch), e)
+                return 0
+        return len(batch)
+
+    def summary(self) -> Dict:
+        """프로세스 시작 이후 (용도, 모델)별 메모리 집계"""
+        with self._lock:
+            return {
+                'since': self.started_at,
+                'pending': len(self._buffer),
+                'groups': {
+                    f"{purpose}/{model}": aggregate.to_dict()
+                    for (purpose, model), aggregate in sorted(self._aggregates.items())
+                }
+            }
+
+    def history(self, days: int = 14) -> List[Dict]:
+        """저장된 기록의 일별 (용도, 모델) 집계 (비용/지연 회귀 추적용)"""
+        self.flush()
+        since = time.time() - days * 86400
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    """
+                    SELECT date(ts, 'unixepoch', 'localtime') AS day, purpose, COALESCE(model, '-'),
+                           COUNT(*), SUM(prompt_tokens), SUM(completion_tokens), SUM(cost),
+                           AVG(CASE WHEN cache_hit = 0 THEN latency END),
+                           MAX(CASE WHEN cache_hit = 0 THEN latency END),
+                           SUM(cache_hit), SUM(outcome IN ('error', 'timeout', 'invalid'))
+                    FROM llm_usage
+                    WHERE ts >= ?
+                    GROUP BY day, purpose, model
+                    ORDER BY day, purpose, model
+                    """,
+                    (since,)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning("사용량 원장 조회 실패: %s", e)
+            return []
+
+        return [
+            {
+                'day': day, 'purpose': purpose, 'model': model, 'calls': calls,
+                'prompt_tokens': prompt_tokens or 0, 'completion_tokens': completion_tokens or 0,
+                'cost': cost or 0.0, 'avg_latency': avg_latency or 0.0, 'max_latency': max_latency or 0.0,
+                'cache_hits': cache_hits or 0, 'failures': failures or 0
+            }
+            for (day, purpose, model, calls, prompt_tokens, completion_tokens, cost,
+                 avg_latency, max_latency, cache_hits, failures) in rows
+        ]
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """최근 기록 (저장된 것 + 아직 버퍼에 있는 것)"""
+        self.flush()
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM llm_usage ORDER BY ts DESC LIMIT ?", (limit,)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning("사용량 원장 조회 실패: %s", e)
+            return []
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+
+# 모든 세션이 공유하는 원장
+usage_ledger = UsageLedger()
+atexit.register(usage_ledger.flush)
@@ -0,0 +1,178 @@
+# xp_ledger.py
+"""
+XP 원장 (추가 전용 xp_events + 사용자별 스냅샷 압축)
+
+- 답변/보상/승급은 users 행을 읽고 고쳐 쓰지 않고 xp_events에 한 줄씩 추가만 합니다 (경합/유실 없음)
+- users 행은 snapshot_event_id까지의 이벤트를 접은 스냅샷이며, 백그라운드 압축이 주기적으로 앞당깁니다
+- 조회는 스냅샷만 읽고, 이 프로세스에서 추가했지만 아직 압축되지 않은 이벤트만 메모리에서 덧붙입니다
+- 스냅샷 갱신은 snapshot_event_id가 읽은 값과 같을 때만 적용되어 여러 프로세스가 동시에 압축해도 안전합니다
+- id는 커밋 순서가 아니므로, 압축은 XP_COMPACTION_GRACE보다 오래된 이벤트의 id 순 앞부분까지만 접습니다
+  (먼저 id를 받고 늦게 커밋된 이벤트를 스냅샷 기준점이 건너뛰지 않도록)
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.core.config import XP_COMPACTION_GRACE, XP_SNAPSHOT_INTERVAL
+from src.core.database import GameDatabase
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FIELDS = ('experience_points', 'level', 'total_questions_solved', 'correct_answers',
+                   'current_streak', 'best_streak', 'snapshot_event_id')
+
+
+def fold_events(snapshot: Dict, events: Iterable[Dict]) -> Dict:
+    """스냅샷에 이벤트를 id 순서대로 적용한 새 스냅샷 (이미 반영된 id 이하 이벤트는 무시)
+
+    - correct가 있는 이벤트는 답변 1건 (누적 문제 수, 정답 수, 연속 정답 갱신)
+    - level이 있는 이벤트는 승급 (레벨은 내려가지 않음)
+    """
+    state = {field: snapshot.get(field) or 0 for field in SNAPSHOT_FIELDS}
+    state['level'] = state['level'] or 1
+    for event in sorted(events, key=lambda e: e['id']):
+        if event['id'] <= state['snapshot_event_id']:
+            continue
+        state['experience_points'] += event.get('xp') or 0
+        if event.get('correct') is not None:
+            state['total_questions_solved'] += 1
+            if event['correct']:
+                state['correct_answers'] += 1
+                state['current_streak'] += 1
+                state['best_streak'] = max(state['best_streak'], state['current_streak'])
+            else:
+                state['current_streak'] = 0
+        if event.get('level'):
+            state['level'] = max(state['level'], event['level'])
+        state['level'] = max(state['level'], GameDatabase._calculate_level(state['experience_points']))
+        state['snapshot_event_id'] = event['id']
+    return state
+
+
+def settled_prefix(events: List[Dict], cutoff: datetime) -> List[Dict]:
+    """id 순 이벤트 중 cutoff 이전에 생성된 앞부분 (created_at이 없는 이벤트는 확정으로 취급)
+
+    cutoff 이후 이벤트가 하나라도 나오면 거기서 멈춥니다. 그보다 뒤의 id는 아직 보이지 않는
+    더 낮은 id(커밋 대기 중)가 있을 수 있으므로 기준점을 넘기지 않습니다.
+    """
+    settled = []
+    for event in sorted(events, key=lambda e: e['id']):
+        created_at = event.get('created_at')
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        if created_at is not None and created_at >= cutoff:
+            break
+        settled.append(event)
+    return settled
+
+
+class XpLedger:
+    """xp_events 추가 + 프로세스 내 미압축 이벤트 오버레이 + 주기적 스냅샷 압축"""
+
+    def __init__(self, db, interval: float = XP_SNAPSHOT_INTERVAL, grace: float = XP_COMPACTION_GRACE,
+                 clock: Callable[[], float] = time.time):
+        self.db = db
+        self.interval = interval
+        self.grace = grace
+        self._clock = clock
+        self._pending: Dict[str, List[Dict]] = {}
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self.compactions = 0
+        self.conflicts = 0
+
+    def append(self, user_id: str, xp: int = 0, kind: str = 'answer', correct: bool = None,
+               question_id: str = None, level: int = None) -> bool:
+        """이벤트 1건 추가 (INSERT만 수행)"""
+        event = self.db.insert_xp_event({
+            'user_id': user_id, 'kind': kind, 'xp': int(xp), 'correct': correct,
+            'question_id': question_id, 'level': level
+        })
+        if event is None:
+            return False
+        self.record(user_id, event)
+        return True
+
+    def record(self, user_id: str, event: Dict):
+        """다른 경로(예: process_promotion RPC)로 이미 저장된 이벤트를 미압축 이벤트로 등록"""
+        with self._lock:
+            self._pending.setdefault(user_id, []).append(event)
+        self._ensure_worker()
+
+    def apply_pending(self, profile: Optional[Dict]) -> Optional[Dict]:
+        """스냅샷(users 행)에 이 프로세스의 미압축 이벤트를 덧붙인 프로필"""
+        if not profile:
+            return profile
+        with self._lock:
+            events = list(self._pending.get(profile.get('user_id'), ()))
+        if events:
+            profile.update(fold_events(profile, events))
+        return profile
+
+    def compact(self, user_id: str) -> bool:
+        """사용자 1명의 스냅샷 압축 (다른 프로세스가 먼저 압축했으면 다음 주기에 재시도)
+
+        유예 시간 안의 이벤트와 그 뒤 id는 다음 주기로 미루며, 미룬 이벤트는 오버레이에 남습니다.
+        """
+        snapshot = self.db.get_xp_snapshot(user_id)
+        if snapshot is None:
+            return False
+        cutoff = datetime.fromtimestamp(self._clock() - self.grace, timezone.utc)
+        events = settled_prefix(self.db.get_xp_events(user_id, after_id=snapshot.get('snapshot_event_id') or 0),
+                                cutoff)
+        if events:
+            folded = fold_events(snapshot, events)
+            if not self.db.update_xp_snapshot(user_id, snapshot.get('snapshot_event_id') or 0, folded):
+                self.conflicts += 1
+                return False
+            self.compactions += 1
+            snapshot = folded
+
+        with self._lock:
+            remaining = [e for e in self._pending.get(user_id, ()) if e['id'] > snapshot['snapshot_event_id']]
+            if remaining:
+                self._pending[user_id] = remaining
+            else:
+                self._pending.pop(user_id, None)
+        return True
+
+    def flush(self):
+        """미압축 이벤트가 있는 모든 사용자 압축"""
+        with self._lock:
+            user_ids = list(self._pending)
+        for user_id in user_ids:
+            try:
+                self.compact(user_id)
+            except Exception as e:
+                logger.warning("XP 스냅샷 압축 실패 (%s): %s", user_id, e)
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="xp-ledger", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+
+_xp_ledger: Optional[XpLedger] = None
+_xp_ledger_lock = threading.Lock()
+
+
+def get_xp_ledger(db) -> XpLedger:
+    """프로세스 전역 XP 원장 (미압축 이벤트 오버레이를 모든 세션이 공유)"""
+    global _xp_ledger
+    with _xp_ledger_lock:
+        if _xp_ledger is None:
+            _xp_ledger = XpLedger(db)
+            atexit.register(_xp_ledger.flush)
+    return _xp_ledger
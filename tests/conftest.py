@@ -0,0 +1,9 @@
+# conftest.py
+"""
+테스트 공통 설정 (프로젝트 루트를 import 경로에 추가)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,60 @@
+# test_achievement_engine.py
+"""
+업적 엔진 테스트 (엔진 도입 전 업적 유지)
+"""
+
+from typing import Dict, List
+
+from src.services.achievement_engine import AchievementEngine
+
+LEGACY_BADGES = {'first_question', 'level_5', 'level_10', 'streak_5', 'streak_10', 'accuracy_80'}
+
+
+class FakeAchievementDatabase:
+    def __init__(self):
+        self.unlocked: Dict[str, Dict[str, str]] = {}
+
+    def get_unlocked_achievements(self, user_id: str) -> List[Dict]:
+        return [{'achievement_id': a, 'unlocked_at': at} for a, at in self.unlocked.get(user_id, {}).items()]
+
+    def unlock_achievements(self, user_id: str, achievement_ids: List[str]) -> List[Dict]:
+        unlocked = self.unlocked.setdefault(user_id, {})
+        rows = []
+        for achievement_id in achievement_ids:
+            if achievement_id not in unlocked:
+                unlocked[achievement_id] = 'now'
+                rows.append({'achievement_id': achievement_id, 'unlocked_at': 'now'})
+        return rows
+
+    def get_failed_question_ids(self, user_id: str) -> List[str]:
+        return []
+
+
+def _profile(**stats) -> Dict:
+    profile = {'level': 1, 'experience_points': 0, 'total_questions_solved': 0, 'correct_answers': 0,
+               'current_streak': 0, 'best_streak': 0}
+    profile.update(stats)
+    return profile
+
+
+def test_legacy_badges_backfilled_from_profile():
+    engine = AchievementEngine(FakeAchievementDatabase())
+    profile = _profile(level=10, total_questions_solved=50, correct_answers=45, best_streak=12)
+    unlocked = {a['achievement_id'] for a in engine.get('u1', profile)}
+    assert LEGACY_BADGES <= unlocked
+
+
+def test_legacy_badges_unlock_on_answer():
+    engine = AchievementEngine(FakeAchievementDatabase())
+    profile = _profile(level=5, total_questions_solved=1, correct_answers=1, current_streak=1, best_streak=1)
+    unlocked = {a['achievement_id'] for a in engine.on_answer('u1', profile, 'q1', True)}
+    assert {'first_question', 'level_5', 'accuracy_80'} <= unlocked
+    assert 'level_10' not in unlocked
+
+
+def test_accuracy_badge_needs_80_percent():
+    engine = AchievementEngine(FakeAchievementDatabase())
+    profile = _profile(total_questions_solved=10, correct_answers=7)
+    unlocked = {a['achievement_id'] for a in engine.get('u1', profile)}
+    assert 'accuracy_80' not in unlocked
+    assert 'first_question' in unlocked
@@ -0,0 +1,66 @@
+# test_avatar_store.py
+"""
+아바타 저장소 테스트 (버킷 원본 + 로컬 캐시)
+"""
+
+import io
+import shutil
+
+from PIL import Image
+
+from src.services.avatar_store import AvatarStore, is_avatar_key, to_data_url
+
+
+class FakeBucket:
+    def __init__(self, fail: bool = False):
+        self.objects = {}
+        self.fail = fail
+
+    def upload(self, path, data, file_options=None):
+        if self.fail:
+            raise RuntimeError("storage unavailable")
+        self.objects[path] = data
+
+    def download(self, path):
+        if path not in self.objects:
+            raise RuntimeError("not found")
+        return self.objects[path]
+
+
+def _image(fmt: str = 'PNG', size: int = 200) -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (size, size), '#4CAF50').save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def test_save_stores_short_key_and_refills_cache_from_bucket(tmp_path):
+    bucket = FakeBucket()
+    store = AvatarStore(root=str(tmp_path / 'avatars'), url_prefix='app/static/avatars', sizes=[32, 64],
+                        bucket=bucket)
+    key = store.save({200: _image(), 32: _image(size=32)}, 'png')
+    assert is_avatar_key(key)
+    assert set(bucket.objects) == {key, store.variant_key(key, 32)}
+
+    # 재시작으로 로컬 캐시가 비어도 버킷에서 다시 받음
+    shutil.rmtree(tmp_path / 'avatars')
+    assert store.resolve(key, 32).startswith(f"app/static/avatars/{store.variant_key(key, 32)}")
+    assert store.exists(key)
+
+
+def test_save_falls_back_to_data_url_when_upload_fails(tmp_path):
+    store = AvatarStore(root=str(tmp_path), sizes=[32], bucket=FakeBucket(fail=True))
+    value = store.save({200: _image()}, 'png')
+    assert value.startswith('data:image/png;base64,')
+
+
+def test_migrate_keeps_original_extension(tmp_path):
+    bucket = FakeBucket()
+    store = AvatarStore(root=str(tmp_path), sizes=[32, 64], bucket=bucket)
+    key = store.migrate(to_data_url(_image('JPEG'), 'jpeg'))
+    assert key.endswith('.jpeg')
+    assert store.variant_key(key, 64) in bucket.objects
+
+
+def test_missing_key_resolves_empty(tmp_path):
+    store = AvatarStore(root=str(tmp_path), bucket=FakeBucket())
+    assert store.resolve('0' * 32 + '.webp') == ''
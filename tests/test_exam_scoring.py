@@ -0,0 +1,51 @@
+# test_exam_scoring.py
+"""
+승급 시험 로컬 채점 테스트 (LLM 채점과 같은 총점 척도인지 확인)
+"""
+
+import pytest
+
+from src.core.config import PROMOTION_MAX_SCORE
+from src.models.grading import normalize_promotion_result
+from src.services.exam_scoring import grade_promotion_locally
+
+PROBLEM = {
+    "answer_key": ["A", "B", "C"],
+    "weights_map": [{"A": 1.0, "B": 0.5, "C": 0.2}, {"A": 0.3, "B": 1.0, "C": 0.5}, {"A": 0.2, "B": 0.5, "C": 1.0}]
+}
+
+
+def submission(*selected):
+    return {"problem": PROBLEM, "sessions": [{"selected_option_id": s} for s in selected]}
+
+
+def llm_response(local):
+    """같은 정량/정성 점수를 매긴 LLM 응답 (total 없이 보내는 경우)"""
+    score = local['score']
+    return {
+        "score": {
+            "quantitative": {"aggregate": score['quantitative']['aggregate']},
+            "qualitative": {"overall": score['qualitative']['overall']}
+        }
+    }
+
+
+@pytest.mark.parametrize("selected", [("A", "B", "C"), ("A", "C", "C"), ("B", "C", "A"), ("C", "A", "B")])
+def test_local_and_llm_paths_agree(selected):
+    local = grade_promotion_locally(submission(*selected), with_detail=False)
+    llm = normalize_promotion_result(llm_response(local))
+    assert llm['score']['total'] == local['score']['total']
+    assert llm['pass_fail'] == local['pass_fail']
+
+
+def test_reference_answers_score_full_marks():
+    local = grade_promotion_locally(submission("A", "B", "C"), with_detail=False)
+    assert local['score']['total'] == PROMOTION_MAX_SCORE
+    assert local['pass_fail'] == 'PASS'
+
+
+def test_half_weighted_answers_do_not_pass():
+    # 모든 단계에서 가중치 0.5 선택지: 예전 환산식(가중치 평균 × 2)으로는 정확히 통과선(100)이었음
+    local = grade_promotion_locally(submission("B", "C", "B"), with_detail=False)
+    assert local['score']['total'] == 50.0
+    assert local['pass_fail'] == 'FAIL'
@@ -0,0 +1,39 @@
+# test_grading_router.py
+"""
+채점 라우팅 테스트 (앱 난이도 표기 → 채점 기준 키 → fast/strong 경로)
+"""
+
+from src.models.grading import criteria_level
+from src.services import ai_services
+from src.services.grading_router import GradingRouter
+
+
+def test_app_difficulty_labels_map_to_criteria():
+    assert criteria_level("아주 쉬움") == "basic"
+    assert criteria_level("보통") == "intermediate"
+    assert criteria_level("아주 어려움") == "advanced"
+    assert criteria_level("advanced") == "advanced"
+    assert criteria_level(None) == "basic"
+
+
+def test_easy_app_difficulty_plans_fast_route():
+    router = GradingRouter()
+    assert router.plan(criteria_level("아주 쉬움")) == ['fast', 'strong']
+    assert router.plan(criteria_level("어려움")) == ['strong']
+
+
+def test_grade_answer_routes_on_criteria_key(monkeypatch):
+    calls = []
+
+    def fake_grade(messages, level, **kwargs):
+        calls.append(level)
+        return '{}', {'total_score': 90, 'passed': True}, 120, 'fast-model'
+
+    monkeypatch.setattr(ai_services, 'client', object())
+    monkeypatch.setattr(ai_services.grading_router, 'grade', fake_grade)
+    grader = ai_services.AutoGrader(mode='llm')
+
+    question = {'id': 'q-route', 'question_text': '프롬프트 엔지니어링의 핵심 원칙을 설명하세요.'}
+    result = grader.grade_answer(question, "역할, 맥락, 출력 형식을 명확히 지정하고 예시를 함께 제공합니다.", "아주 쉬움")
+    assert calls == ['basic']
+    assert result['model'] == 'fast-model'
@@ -0,0 +1,84 @@
+# test_xp_ledger.py
+"""
+XP 원장 압축 테스트 (id 순서와 커밋 순서가 다른 이벤트)
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from src.core.database import GameDatabase
+from src.services.xp_ledger import XpLedger, fold_events
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeXpDatabase:
+    """커밋된 이벤트만 보이는 xp_events + users 스냅샷"""
+
+    def __init__(self):
+        self.snapshot = {'user_id': 'u1', 'experience_points': 0, 'level': 1, 'total_questions_solved': 0,
+                         'correct_answers': 0, 'current_streak': 0, 'best_streak': 0, 'snapshot_event_id': 0}
+        self.committed: List[Dict] = []
+
+    def commit(self, event_id: int, xp: int, created_seconds: float):
+        self.committed.append({'id': event_id, 'xp': xp, 'correct': True, 'level': None,
+                               'created_at': (T0 + timedelta(seconds=created_seconds)).isoformat()})
+
+    def get_xp_snapshot(self, user_id):
+        return dict(self.snapshot)
+
+    def get_xp_events(self, user_id, after_id=0):
+        return sorted((dict(e) for e in self.committed if e['id'] > after_id), key=lambda e: e['id'])
+
+    def update_xp_snapshot(self, user_id, expected_event_id, snapshot):
+        if self.snapshot['snapshot_event_id'] != expected_event_id:
+            return False
+        self.snapshot.update(snapshot)
+        return True
+
+
+def _ledger(db, now: List[float], grace: float) -> XpLedger:
+    return XpLedger(db, grace=grace, clock=lambda: T0.timestamp() + now[0])
+
+
+def test_compaction_waits_for_lower_id_committed_late():
+    db = FakeXpDatabase()
+    now = [0.0]
+    ledger = _ledger(db, now, grace=30)
+
+    # id 10이 먼저 발급되었지만 id 11이 먼저 커밋됨
+    db.commit(11, 20, created_seconds=1.0)
+    now[0] = 2.0
+    assert ledger.compact('u1')
+    assert db.snapshot['snapshot_event_id'] == 0
+
+    db.commit(10, 30, created_seconds=0.5)
+    now[0] = 60.0
+    assert ledger.compact('u1')
+    assert db.snapshot['snapshot_event_id'] == 11
+    assert db.snapshot['experience_points'] == 50
+    assert db.snapshot['total_questions_solved'] == 2
+
+
+def test_compaction_stops_at_first_recent_event():
+    db = FakeXpDatabase()
+    now = [100.0]
+    ledger = _ledger(db, now, grace=30)
+
+    db.commit(1, 10, created_seconds=10.0)
+    db.commit(2, 10, created_seconds=90.0)     # 유예 시간 안
+    db.commit(3, 10, created_seconds=20.0)     # 오래되었지만 id 2 뒤라서 미룸
+    assert ledger.compact('u1')
+    assert db.snapshot['snapshot_event_id'] == 1
+    assert db.snapshot['experience_points'] == 10
+
+    now[0] = 200.0
+    assert ledger.compact('u1')
+    assert db.snapshot['snapshot_event_id'] == 3
+    assert db.snapshot['experience_points'] == 30
+
+
+def test_fold_events_uses_database_level_formula():
+    for xp in (0, 499, 500, 1499, 3000, 10**6):
+        folded = fold_events({'snapshot_event_id': 0}, [{'id': 1, 'xp': xp, 'correct': None, 'level': None}])
+        assert folded['level'] == GameDatabase._calculate_level(xp)
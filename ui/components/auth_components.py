@@ -3,9 +3,13 @@
 인증 관련 UI 컴포넌트
 """
 
+import html
+
 import streamlit as st
 from typing import Callable
 
+from src.services.avatar_store import avatar_store
+
 
 def render_google_login_only(on_google_login: Callable[[], None]):
     """Google 로그인만 렌더링"""
@@ -74,7 +78,7 @@ def render_user_sidebar(profile: dict, on_logout: Callable[[], None]):
         
         # 프로필 이미지
         if profile.get("profile_image"):
-            st.markdown(f'<img src="{profile["profile_image"]}" width="150">', unsafe_allow_html=True)
+            st.markdown(f'<img src="{html.escape(avatar_store.resolve(profile["profile_image"], 150))}" width="150">', unsafe_allow_html=True)
         
         # 게임 제목
         st.markdown("### AI Master Quest")
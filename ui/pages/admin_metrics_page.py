@@ -0,0 +1,121 @@
+# ui/pages/admin_metrics_page.py
+"""
+관리자 메트릭 페이지 (LLM 사용량/비용/지연 추적)
+"""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import datetime
+
+from src.services.grading_router import grading_router
+from src.services.usage_ledger import usage_ledger
+
+
+def render_admin_metrics():
+    """LLM 사용량 원장 요약 렌더링"""
+
+    try:
+        summary = usage_ledger.summary()
+        groups = summary['groups']
+
+        st.subheader("🧮 LLM 사용량 (현재 프로세스)")
+        st.caption(f"집계 시작: {datetime.fromtimestamp(summary['since']):%Y-%m-%d %H:%M:%S} · "
+                   f"저장 대기: {summary['pending']}건")
+
+        total_calls = sum(g['calls'] for g in groups.values())
+        total_tokens = sum(g['prompt_tokens'] + g['completion_tokens'] for g in groups.values())
+        total_cost = sum(g['cost'] for g in groups.values())
+        cache_hits = sum(g['outcomes'].get('cache_hit', 0) for g in groups.values())
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("호출 수", f"{total_calls:,}")
+        with col2:
+            st.metric("토큰", f"{total_tokens:,}")
+        with col3:
+            st.metric("비용 (USD)", f"${total_cost:.4f}")
+        with col4:
+            st.metric("캐시 적중", f"{cache_hits:,}")
+
+        if groups:
+            rows = []
+            for key, g in groups.items():
+                purpose, model = key.split('/', 1)
+                rows.append({
+                    '용도': purpose,
+                    '모델': model,
+                    '호출': g['calls'],
+                    '입력 토큰': g['prompt_tokens'],
+                    '출력 토큰': g['completion_tokens'],
+                    '비용 (USD)': round(g['cost'], 4),
+                    'p50 지연(초)': g['latency']['p50'],
+                    'p95 지연(초)': g['latency']['p95'],
+                    '결과': ', '.join(f"{k}:{v}" for k, v in sorted(g['outcomes'].items()))
+                })
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        else:
+            st.info("아직 기록된 LLM 호출이 없습니다.")
+
+        st.caption(f"🔀 fast → strong 에스컬레이션: {grading_router.stats()['escalations']}회")
+
+        # 일별 추이 (저장된 원장 기준)
+        st.subheader("📈 일별 비용/지연 추이")
+        days = st.selectbox("기간", [7, 14, 30], index=1, format_func=lambda d: f"최근 {d}일")
+        history = usage_ledger.history(days)
+
+        if history:
+            df = pd.DataFrame(history)
+            df['series'] = df['purpose'] + '/' + df['model']
+
+            fig_cost = px.bar(df, x='day', y='cost', color='series', title="일별 비용 (USD)")
+            st.plotly_chart(fig_cost, use_container_width=True)
+
+            fig_latency = px.line(df, x='day', y='avg_latency', color='series', markers=True,
+                                  title="일별 평균 지연 (초, 캐시 적중 제외)")
+            st.plotly_chart(fig_latency, use_container_width=True)
+        else:
+            st.info("저장된 사용량 기록이 없습니다.")
+
+        with st.expander("🧾 최근 호출 기록"):
+            recent = usage_ledger.recent(50)
+            if recent:
+                df_recent = pd.DataFrame(recent)
+                df_recent['ts'] = pd.to_datetime(df_recent['ts'], unit='s')
+                st.dataframe(df_recent, use_container_width=True, hide_index=True)
+            else:
+                st.caption("기록 없음")
+
+    except Exception as e:
+        st.error(f"메트릭 조회 중 오류가 발생했습니다: {str(e)}")
+
+
+def render_stats_recompute(db):
+    """사용자 통계 일괄 재계산 (XP/난이도/레벨 설정 변경 후 실행)"""
+
+    st.subheader("♻️ 사용자 통계 재계산")
+    st.caption("user_answers 전체로 XP, 레벨, 연속 정답을 다시 계산합니다. 작업 중 들어오는 답변은 어긋날 수 있으니 점검 시간에 실행하세요.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        dry_run = st.button("계산만 해보기", use_container_width=True)
+    with col2:
+        apply = st.button("재계산 후 반영", type="primary", use_container_width=True)
+    if not (dry_run or apply):
+        return
+
+    try:
+        from src.services.stats_recompute import StatsRecomputeJob
+
+        progress = st.empty()
+        summary = StatsRecomputeJob(db).run(
+            dry_run=not apply, on_progress=lambda n: progress.caption(f"답변 {n:,}건 처리 중...")
+        )
+        progress.empty()
+
+        st.success(f"사용자 {summary['users']:,}명 · 답변 {summary['answers']:,}건 계산 "
+                   f"({summary['compute_seconds']:.1f}초)"
+                   + (f" · {summary['updated']:,}명 반영 ({summary['write_seconds']:.1f}초)" if apply else ""))
+        st.dataframe(summary['stats'].head(100), use_container_width=True)
+    except Exception as e:
+        st.error(f"통계 재계산 중 오류가 발생했습니다: {str(e)}")
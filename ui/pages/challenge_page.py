@@ -5,8 +5,11 @@
 
 import streamlit as st
 import json
+import time
 from typing import Dict, Callable
+from src.core.config import QUESTION_POOL_ENABLED
 from src.core.database import GameDatabase
+from src.services.question_pool import get_question_pool
 
 
 def render_challenge_tab(profile: Dict, on_submit_answer: Callable):
@@ -100,7 +103,7 @@ def render_challenge_tab(profile: Dict, on_submit_answer: Callable):
                     st.session_state.user_answers = []
                     st.session_state.last_difficulty = difficulty  # 난이도 저장
                     st.session_state.last_question_type = selected_type  # 문제 유형 저장
-                    st.session_state.question_start_time = st.session_state.get('question_start_time', 0)
+                    st.session_state.question_start_time = time.time()
                     st.session_state.answer_submitted = False  # 제출 상태 초기화
                     st.rerun()
                 else:
@@ -134,7 +137,7 @@ def render_challenge_tab(profile: Dict, on_submit_answer: Callable):
                         st.session_state.user_answers = []
                         st.session_state.last_difficulty = difficulty  # 난이도 저장
                         st.session_state.last_question_type = selected_type  # 문제 유형 저장
-                        st.session_state.question_start_time = st.session_state.get('question_start_time', 0)
+                        st.session_state.question_start_time = time.time()
                         st.session_state.answer_submitted = False  # 제출 상태 초기화
                         st.rerun()
                         break
@@ -145,9 +148,28 @@ def render_challenge_tab(profile: Dict, on_submit_answer: Callable):
                             st.session_state.user_answers = []
                             st.session_state.last_difficulty = difficulty
                             st.session_state.last_question_type = selected_type  # 문제 유형 저장
-                            st.session_state.question_start_time = st.session_state.get('question_start_time', 0)
+                            st.session_state.question_start_time = time.time()
                             st.session_state.answer_submitted = False  # 제출 상태 초기화
                             st.rerun()
+        
+        # AI 생성 문제 (백그라운드에서 미리 생성된 문제를 대기 없이 제공)
+        if QUESTION_POOL_ENABLED:
+            question_pool = get_question_pool(db)
+            question_pool.warm(difficulty, profile['level'])
+            ready = question_pool.depth(difficulty, profile['level'])
+            if st.button(f"✨ AI 생성 문제 ({ready}개 준비됨)", use_container_width=True, disabled=ready == 0):
+                question = question_pool.take(difficulty, profile['level'])
+                if question:
+                    st.session_state.current_question = question
+                    st.session_state.current_step = 0
+                    st.session_state.user_answers = []
+                    st.session_state.last_difficulty = difficulty
+                    st.session_state.last_question_type = question['type']
+                    st.session_state.question_start_time = time.time()
+                    st.session_state.answer_submitted = False
+                    st.rerun()
+                else:
+                    st.info("AI 문제를 준비 중입니다. 잠시 후 다시 시도해주세요.")
     
     with col2:
         # 현재 문제 표시
@@ -404,13 +426,16 @@ def submit_answers(question: Dict, user_answers: list, on_submit_answer: Callabl
         # 2. 제출 상태 설정
         st.session_state.answer_submitted = True
         
-        # 3. on_submit_answer 콜백 호출하여 통계 업데이트 포함
+        # 3. on_submit_answer 콜백 호출하여 통계 업데이트 포함 (문제를 받은 뒤 걸린 시간을 함께 전달)
+        started = st.session_state.get('question_start_time')
+        time_taken = int(time.time() - started) if started else None
         st.write(f"🔍 답안 제출 시작: user_id={user_id}, pass_fail={pass_fail}")
         result = on_submit_answer(
             user_id=user_id,
             question=question,
             answer="",  # answer는 비워둠
-            pass_fail=pass_fail
+            pass_fail=pass_fail,
+            time_taken=time_taken
         )
         st.write(f"🔍 답안 제출 결과: {result}")
         
@@ -423,6 +448,9 @@ def submit_answers(question: Dict, user_answers: list, on_submit_answer: Callabl
                     st.info(f"✨ 경험치 +{xp_earned} 획득!")
             else:
                 st.warning(f"❌ 실패. 일부 단계에서 오답을 선택했습니다.")
+            for achievement in result.get('achievements_unlocked', []):
+                reward = f" (+{achievement['xp']} XP)" if achievement['xp'] else ""
+                st.success(f"{achievement['icon']} 업적 달성: **{achievement['name']}**{reward}")
             
             # 세션 정리하지 않고 결과 화면 유지
             # 문제 정보는 유지하되, 단계와 답안만 초기화
@@ -465,7 +493,7 @@ def submit_answers(question: Dict, user_answers: list, on_submit_answer: Callabl
                             st.session_state.current_question = new_question
                             st.session_state.current_step = 0
                             st.session_state.user_answers = []
-                            st.session_state.question_start_time = st.session_state.get('question_start_time', 0)
+                            st.session_state.question_start_time = time.time()
                             st.session_state.answer_submitted = False  # 제출 상태 초기화
                             # 결과 화면 관련 세션 정리
                             st.rerun()
@@ -475,7 +503,7 @@ def submit_answers(question: Dict, user_answers: list, on_submit_answer: Callabl
                                 st.session_state.current_question = new_question
                                 st.session_state.current_step = 0
                                 st.session_state.user_answers = []
-                                st.session_state.question_start_time = st.session_state.get('question_start_time', 0)
+                                st.session_state.question_start_time = time.time()
                                 st.session_state.answer_submitted = False  # 제출 상태 초기화
                                 # 결과 화면 관련 세션 정리
                                 st.rerun()
@@ -3,10 +3,14 @@
 리더보드 페이지 컴포넌트 (Supabase 기반)
 """
 
+import html
+
 import streamlit as st
 import pandas as pd
 from typing import Dict
 
+from src.services.avatar_store import avatar_store
+
 
 def render_leaderboard(db, current_username: str):
     """리더보드 렌더링"""
@@ -33,7 +37,10 @@ def render_leaderboard(db, current_username: str):
                     st.markdown(f"### {medal} {rank}")
                 
                 with col2:
-                    st.markdown(f"**{row['username']}**")
+                    avatar = avatar_store.resolve(row.get('profile_image'), 32)
+                    # 사용자 입력(이름, 이미지 값)은 HTML로 해석되지 않도록 이스케이프
+                    avatar_html = f'<img src="{html.escape(avatar)}" width="32" style="border-radius:50%; vertical-align:middle"> ' if avatar else ''
+                    st.markdown(f"{avatar_html}**{html.escape(str(row['username']))}**", unsafe_allow_html=True)
                     st.caption(f"레벨 {row['level']}")
                 
                 with col3:
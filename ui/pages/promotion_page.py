@@ -7,15 +7,27 @@
 import streamlit as st
 import json
 import time
-from typing import Dict, Callable
+from typing import Dict, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from src.core.config import PROMOTION_GRADING_MODE, PROMOTION_MAX_SCORE, PROMOTION_PASS_SCORE
 from src.core.database import GameDatabase
+from src.models.grading import COMMENTARY_RESPONSE, PROMOTION_RESPONSE, PromotionResult, ResponseSchema
+from src.services.exam_scoring import grade_promotion_locally
+from src.services.game_engine import GameEngine
+from src.services.grading_cache import grading_cache, grading_cache_key
+from src.services.llm_client import CancelToken, LLMCancelledError, LLMTimeoutError
+from src.services.prompt_registry import get_prompt_registry
+from src.services.usage_ledger import usage_ledger
+
+# hybrid 채점 모드에서 AI 코멘트를 생성하는 백그라운드 실행기
+_commentary_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="promotion-detail")
 
 
 def render_promotion_exam(profile: Dict, game_engine, db, user_id: str):
     """승급 시험 렌더링"""
     
     # 승급 자격 확인
-    can_promote, promotion_info = game_engine.check_promotion_eligibility(user_id)
+    can_promote, promotion_info = game_engine.check_promotion_eligibility(user_id, profile)
     
     if can_promote and promotion_info and 'next_level' in promotion_info:
         st.success(f"🎯 레벨 {promotion_info['next_level']} 승급 시험에 도전할 수 있습니다!")
@@ -223,21 +235,37 @@ def submit_promotion_exam(exam: Dict, db: GameDatabase, user_id: str):
         # 1. 답안을 JSON 구조로 변환
         submission_data = create_promotion_submission_json(exam['question'], exam['user_answers'])
         
-        # 2. Supabase에서 프롬프트 가져오기
-        prompt = db.get_prompt_by_id("1afe1512-9a7a-4eee-b316-1734b9c81f3a")
+        exam.pop('ai_response', None)
+        exam.pop('detail_future', None)
+        exam['submission_data'] = submission_data
+        
+        # 2. 로컬/hybrid 모드: 점수와 PASS/FAIL은 LLM 없이 즉시 확정
+        if PROMOTION_GRADING_MODE in ('local', 'hybrid'):
+            exam['ai_response'] = grade_promotion_locally(submission_data)
+            exam['exam_submitted'] = True
+            
+            if PROMOTION_GRADING_MODE == 'hybrid':
+                # LLM은 정성적 코멘트만 백그라운드에서 생성 (프롬프트가 없으면 생략)
+                prompt = get_prompt_registry(db).get("promotion_grader")
+                if prompt:
+                    exam['detail_future'] = _commentary_executor.submit(
+                        request_detail_commentary, prompt.text, submission_data, exam['ai_response'],
+                        prompt.key
+                    )
+            st.rerun()
+        
+        # 3. 프롬프트 레지스트리에서 프롬프트 가져오기 (세션 간 캐시, TTL 재검증)
+        prompt = get_prompt_registry(db).get("promotion_grader")
         
         if not prompt:
             st.error("❌ 프롬프트를 찾을 수 없습니다.")
             return
         
-        # 3. 프롬프트 호출 및 답변 받기
-        ai_response = call_ai_with_prompt(prompt, submission_data)
-        
-        # 4. AI 응답을 세션에 저장
-        exam['ai_response'] = ai_response
-        exam['submission_data'] = submission_data
+        exam['system_prompt'] = prompt.text
+        exam['prompt_key'] = prompt.key
         exam['exam_submitted'] = True
         
+        # 4. "llm" 모드는 결과 화면에서 스트리밍으로 채점 (첫 결과까지의 체감 지연 단축)
         st.rerun()
         
     except Exception as e:
@@ -249,67 +277,72 @@ def render_promotion_result(exam: Dict, game_engine, user_id: str):
     
     st.subheader("🎯 승급 시험 결과")
     
+    # 아직 채점 전이면 스트리밍으로 채점하며 부분 결과를 먼저 표시
+    if 'ai_response' not in exam:
+        # 같은 프롬프트 버전으로 같은 답안을 채점한 결과가 있으면 재사용
+        cache_key = grading_cache_key(exam.get('prompt_key', ''), exam.get('submission_data', {}))
+        cached = grading_cache.get(cache_key)
+        if cached is not None:
+            exam['ai_response'] = cached
+            usage_ledger.record("promotion", "cache_hit", cache_hit=True,
+                                prompt_version=exam.get('prompt_key'))
+        else:
+            exam['ai_response'] = stream_promotion_grading(exam)
+            if not exam['ai_response'].get('error') and exam['ai_response'].get('parsed') is not False:
+                grading_cache.set(cache_key, exam['ai_response'])
+        
+        # LLM이 응답하지 않거나 해석할 수 없는 응답이면 로컬 채점으로 대체
+        if exam['ai_response'].get('error') or exam['ai_response'].get('parsed') is False:
+            fallback = grade_promotion_locally(exam.get('submission_data', {}))
+            fallback['llm_error'] = exam['ai_response'].get('error', 'AI 응답을 해석할 수 없습니다.')
+            exam['ai_response'] = fallback
+    
+    # hybrid 모드: 백그라운드에서 생성된 코멘트가 준비되었으면 반영
+    _merge_detail_commentary(exam)
+    
     ai_response = exam.get('ai_response', {})
     
     if ai_response and not ai_response.get('error'):
-        # AI 응답에서 결과 추출
-        pass_fail = ai_response.get('pass_fail', 'FAIL')
-        score_raw = ai_response.get('score', 0)
-        
-        # score가 딕셔너리인 경우 처리
-        if isinstance(score_raw, dict):
-            # 새로운 JSON 구조에서 total 값 추출
-            score = score_raw.get('total', 0)
-            # total이 없으면 quantitative.aggregate + qualitative.overall로 계산
-            if score == 0:
-                quant_score = score_raw.get('quantitative', {}).get('aggregate', 0)
-                qual_score = score_raw.get('qualitative', {}).get('overall', 0)
-                score = quant_score + qual_score
-        elif isinstance(score_raw, (int, float)):
-            score = score_raw
-        else:
-            score = 0
-        
+        # 응답은 수신 시 스키마로 정규화되어 있음 (로컬 채점 결과도 같은 구조)
+        result = PromotionResult.from_dict(ai_response)
+        pass_fail = result.pass_fail
+        score = result.total
+        
+        if ai_response.get('graded_by') == 'local':
+            st.caption("⚡ 점수는 답안 가중치(weights_map)로 즉시 계산되었습니다.")
+            if ai_response.get('llm_error'):
+                st.caption(f"AI 채점을 사용할 수 없어 로컬 채점 결과를 표시합니다. ({ai_response['llm_error']})")
         st.info(f"🤖 AI 평가 결과: {pass_fail}")
         st.info(f"📊 총점: {score}")
         
-        # 디버깅: 점수 계산 과정 표시
-        if isinstance(score_raw, dict):
-            st.info(f"🔍 점수 계산 과정:")
-            st.info(f"- total 필드: {score_raw.get('total', '없음')}")
-            if score_raw.get('total', 0) == 0:
-                quant_score = score_raw.get('quantitative', {}).get('aggregate', 0)
-                qual_score = score_raw.get('qualitative', {}).get('overall', 0)
-                st.info(f"- 정량적 점수: {quant_score}")
-                st.info(f"- 정성적 점수: {qual_score}")
-                st.info(f"- 계산된 총점: {quant_score + qual_score}")
-        
-        # 상세 점수 정보 표시 (딕셔너리인 경우)
-        if isinstance(score_raw, dict):
-            col1, col2 = st.columns(2)
-            with col1:
-                if 'quantitative' in score_raw:
-                    quant = score_raw['quantitative']
-                    st.metric("정량적 점수", f"{quant.get('aggregate', 0)}/100")
-            with col2:
-                if 'qualitative' in score_raw:
-                    qual = score_raw['qualitative']
-                    st.metric("정성적 점수", f"{qual.get('overall', 0)}/100")
+        # 상세 점수 정보 표시
+        col1, col2 = st.columns(2)
+        with col1:
+            if result.quantitative is not None:
+                st.metric("정량적 점수", f"{result.quantitative}/100")
+        with col2:
+            if result.qualitative is not None:
+                st.metric("정성적 점수", f"{result.qualitative}/100")
         
         # 상세 평가 결과 표시 (PASS/FAIL 모두)
         st.markdown("---")
         st.subheader("📋 상세 평가 결과")
         
         # detail 코멘트 표시 (마크다운 형태로 그대로 표시)
-        detail = ai_response.get('detail', '')
+        detail = result.detail
         if detail:
             st.markdown("#### 💬 AI 평가 코멘트")
             # 줄바꿈 문자를 HTML <br> 태그로 변환하여 표시
             formatted_detail = detail.replace('\n', '\n\n')
             st.markdown(formatted_detail)
         
+        if exam.get('detail_future') is not None:
+            st.caption("⏳ AI 코멘트를 생성 중입니다. 잠시 후 새로고침하면 표시됩니다.")
+            if st.button("🔄 코멘트 새로고침", key="promotion_detail_refresh"):
+                st.rerun()
+        
         # 승급 시험 통과 조건 확인 (200점 만점에서 100점 이상)
-        if pass_fail == "PASS" and score >= 100:
+        if result.passed and score >= PROMOTION_PASS_SCORE:
             st.success("🎊 축하합니다! 승급 시험에 통과했습니다!")
             st.balloons()
             
@@ -325,12 +358,15 @@ def render_promotion_result(exam: Dict, game_engine, user_id: str):
                             promotion_result = game_engine.process_promotion_result(
                                 user_id, 
                                 score, 
-                                int(time.time() - exam['start_time'])
+                                int(time.time() - exam['start_time']),
+                                next_level=exam['next_level']
                             )
                             
                             if promotion_result.get('success') and promotion_result.get('promoted'):
                                 st.success(f"🎉 레벨 {promotion_result.get('new_level')}로 승급 완료!")
                                 st.success(f"💎 획득 XP: {promotion_result.get('xp_reward', 0)}")
+                                for achievement in promotion_result.get('achievements_unlocked', []):
+                                    st.success(f"{achievement['icon']} 업적 달성: **{achievement['name']}**")
                                 exam['promotion_processed'] = True
                                 st.rerun()
                             else:
@@ -356,10 +392,10 @@ def render_promotion_result(exam: Dict, game_engine, user_id: str):
             
             # 실패 원인 상세 표시
             st.markdown("#### 📊 실패 원인 분석")
-            if pass_fail != "PASS":
+            if not result.passed:
                 st.warning(f"📝 평가 결과: {pass_fail} (PASS 필요)")
-            if score < 100:
-                st.warning(f"📊 점수 부족: {score}/200 (100점 이상 필요)")
+            if score < PROMOTION_PASS_SCORE:
+                st.warning(f"📊 점수 부족: {score}/{PROMOTION_MAX_SCORE} ({PROMOTION_PASS_SCORE}점 이상 필요)")
             
             # 개선 방향 제시
             st.info("💡 **개선 방향**:")
@@ -418,13 +454,12 @@ def render_promotion_result(exam: Dict, game_engine, user_id: str):
             st.write("---")
         
         # 점수 계산 상세 정보
-        if ai_response and isinstance(ai_response.get('score'), dict):
+        if ai_response and not ai_response.get('error'):
+            result = PromotionResult.from_dict(ai_response)
             st.markdown("#### 📈 점수 계산 상세")
-            score_data = ai_response['score']
-            st.write(f"- **Total 필드**: {score_data.get('total', '없음')}")
-            st.write(f"- **정량적 점수**: {score_data.get('quantitative', {}).get('aggregate', 0)}")
-            st.write(f"- **정성적 점수**: {score_data.get('qualitative', {}).get('overall', 0)}")
-            st.write(f"- **계산된 총점**: {score_data.get('quantitative', {}).get('aggregate', 0) + score_data.get('qualitative', {}).get('overall', 0)}")
+            st.write(f"- **총점**: {result.total}")
+            st.write(f"- **정량적 점수**: {result.quantitative if result.quantitative is not None else '없음'}")
+            st.write(f"- **정성적 점수**: {result.qualitative if result.qualitative is not None else '없음'}")
 
 
 def create_promotion_submission_json(question: Dict, user_answers: list) -> Dict:
@@ -541,48 +576,138 @@ def create_promotion_submission_json(question: Dict, user_answers: list) -> Dict
         return {}
 
 
-def call_ai_with_prompt(system_prompt: str, submission_data: Dict) -> Dict:
-    """프롬프트와 데이터를 사용하여 AI 호출 (도전하기와 동일)"""
+def request_detail_commentary(system_prompt: str, submission_data: Dict, local_result: Dict,
+                              prompt_version: Optional[str] = None) -> str:
+    """확정된 로컬 점수를 전달하고 LLM에게 정성적 코멘트(detail)만 요청
+
+    백그라운드 스레드에서 실행되므로 Streamlit API를 호출하지 않습니다.
+    """
+    commentary_data = dict(submission_data)
+    commentary_data['local_score'] = local_result.get('score', {})
+    commentary_data['instruction'] = (
+        "점수와 PASS/FAIL은 이미 확정되었습니다. "
+        "detail 필드에 들어갈 정성적 평가 코멘트만 작성해주세요."
+    )
+    response = call_ai_with_prompt(system_prompt, commentary_data, purpose="commentary",
+                                   prompt_version=prompt_version, schema=COMMENTARY_RESPONSE)
+    if response.get('error') or response.get('parsed') is False:
+        return ""
+    return response['detail']
+
+
+def _merge_detail_commentary(exam: Dict):
+    """완료된 백그라운드 코멘트 작업 결과를 ai_response에 반영"""
+    future = exam.get('detail_future')
+    if future is None or not future.done():
+        return
+    
+    exam['detail_future'] = None
     try:
-        # OpenAI 클라이언트 확인
-        from src.core.config import OPENAI_API_KEY
-        if not OPENAI_API_KEY:
-            return {"error": "OpenAI API 키가 설정되지 않았습니다."}
-        
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        # 사용자 프롬프트 생성 (제출 데이터 포함)
-        user_prompt = f"""
-다음 데이터를 분석해주세요:
+        detail = future.result()
+    except Exception:
+        detail = ""
+    if detail:
+        exam['ai_response']['detail'] = detail
 
-{json.dumps(submission_data, ensure_ascii=False, indent=2)}
 
-위 데이터를 바탕으로 분석 결과를 JSON 형태로 제공해주세요.
-"""
-        
-        # OpenAI API 호출
-        from src.core.config import OPENAI_MODEL
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
+def stream_promotion_grading(exam: Dict) -> Dict:
+    """승급 시험 채점을 스트리밍으로 수행하며 파싱된 결과를 즉시 표시"""
+    status = st.empty()
+    live = st.empty()
+    
+    # 이전 실행에서 남은 채점 호출은 취소하고 이번 실행 전용 토큰 사용
+    previous = st.session_state.get('promotion_cancel_token')
+    if previous is not None:
+        previous.cancel()
+    cancel_token = CancelToken()
+    st.session_state.promotion_cancel_token = cancel_token
+    
+    def heartbeat(elapsed: float):
+        # 대기 중에도 UI를 갱신해야 사용자가 이동/재실행할 때 Streamlit이 이 실행을 중단할 수 있음
+        status.caption(f"⏳ AI가 채점 중입니다... ({elapsed:.0f}초)")
+    
+    def on_partial(snapshot: Dict):
+        with live.container():
+            if 'pass_fail' in snapshot:
+                st.info(f"🤖 AI 평가 결과: {snapshot['pass_fail']}")
+            if 'score' in snapshot:
+                score = snapshot['score']
+                if isinstance(score, dict):
+                    score = score.get('total', score)
+                st.info(f"📊 총점: {score}")
+            detail = snapshot.get('detail')
+            if isinstance(detail, str) and detail:
+                st.markdown("#### 💬 AI 평가 코멘트")
+                st.markdown(detail.replace('\n', '\n\n'))
+    
+    try:
+        ai_response = call_ai_with_prompt(
+            exam.get('system_prompt', ''),
+            exam.get('submission_data', {}),
+            on_partial=on_partial,
+            cancel_token=cancel_token,
+            heartbeat=heartbeat,
+            prompt_version=exam.get('prompt_key')
         )
+    finally:
+        # 정상 종료든 중단(재실행/이동)이든 남은 호출은 모두 취소
+        cancel_token.cancel()
+    
+    # 최종 결과는 아래 일반 렌더링이 담당
+    status.empty()
+    live.empty()
+    return ai_response
+
+
+def call_ai_with_prompt(system_prompt: str, submission_data: Dict,
+                        on_partial: Optional[Callable[[Dict], None]] = None,
+                        cancel_token: Optional[CancelToken] = None,
+                        heartbeat: Optional[Callable[[float], None]] = None,
+                        purpose: str = "promotion",
+                        prompt_version: Optional[str] = None,
+                        schema: ResponseSchema = PROMOTION_RESPONSE) -> Dict:
+    """프롬프트와 데이터를 사용하여 AI 호출 (도전하기와 동일)
+
+    on_partial이 주어지면 스트리밍으로 호출하여 pass_fail, score, detail을
+    파싱되는 즉시 전달합니다. 호출은 LLM_CALL_DEADLINE 안에 끝나지 않으면 중단되고,
+    cancel_token이 취소되면 즉시 중단됩니다. 호출 기록은 purpose/prompt_version과 함께
+    사용량 원장에 남습니다. 응답은 schema로 구조화 출력을 요청하고 수신 시 정규화하므로,
+    반환된 결과는 스키마 구조를 따르거나 {"response", "parsed": False}입니다.
+    """
+    try:
+        # OpenAI 클라이언트 확인
+        from src.services.llm_client import get_openai_client
+        client = get_openai_client()
+        if client is None:
+            return {"error": "OpenAI API 키가 설정되지 않았습니다."}
         
-        # 응답 파싱
-        content = response.choices[0].message.content
+        # 사용자 프롬프트 생성 (채점에 쓰이지 않는 필드 제거, 압축 직렬화, 토큰 예산 적용)
+        from src.services.prompt_builder import build_promotion_prompt
+        user_prompt = build_promotion_prompt(submission_data)
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        # OpenAI API 호출 (승급 시험은 strong 경로로 라우팅, 지연/비용 기록)
+        from src.services.grading_router import grading_router
+        content, ai_response, _, _ = grading_router.grade(
+            messages, None, on_partial=on_partial, client=client,
+            cancel_token=cancel_token, heartbeat=heartbeat,
+            purpose=purpose, prompt_version=prompt_version, schema=schema
+        )
         
-        try:
-            # JSON 파싱 시도
-            ai_response = json.loads(content)
-        except Exception as parse_error:
-            # JSON 파싱 실패 시 텍스트로 반환
+        if ai_response is None:
+            # JSON 파싱/스키마 검증 실패 시 텍스트로 반환
             ai_response = {"response": content, "parsed": False}
         
         return ai_response
         
+    except LLMTimeoutError as e:
+        return {"error": f"AI 응답 시간 초과: {str(e)}"}
+    except LLMCancelledError:
+        return {"error": "AI 호출이 취소되었습니다."}
     except Exception as e:
         return {"error": f"AI 호출 중 오류: {str(e)}"}
 
@@ -595,9 +720,9 @@ def render_promotion_requirements(profile: Dict):
     current_level = profile.get('level', 1)
     current_xp = profile.get('experience_points', 0)
     
-    # 다음 레벨 요구사항 (간단한 계산)
+    # 다음 레벨 요구사항 (승급 자격 확인과 같은 기준표)
     next_level = current_level + 1
-    required_xp = next_level * 100  # 간단한 계산
+    required_xp = GameEngine.promotion_required_xp(current_level)
     
     col1, col2, col3 = st.columns(3)
     